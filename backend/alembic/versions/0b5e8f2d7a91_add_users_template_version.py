@@ -0,0 +1,28 @@
+"""add users template version
+
+Revision ID: 0b5e8f2d7a91
+Revises: f1a6d3b8c472
+Create Date: 2026-10-18 17:46:52.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b5e8f2d7a91'
+down_revision: Union[str, Sequence[str], None] = 'f1a6d3b8c472'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('template_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'template_version')
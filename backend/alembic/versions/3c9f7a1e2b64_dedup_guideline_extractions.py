@@ -0,0 +1,97 @@
+"""dedup guideline extractions
+
+Moves extracted guideline text out of funding_program_documents into
+guideline_extractions, one row per (content_hash, extractor_version).
+Existing documents are pointed at the deduplicated rows.
+
+Revision ID: 3c9f7a1e2b64
+Revises: b5e1c2d8a4f7
+Create Date: 2026-10-18 11:47:09.584312
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9f7a1e2b64'
+down_revision: Union[str, Sequence[str], None] = 'b5e1c2d8a4f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Version of the extractor that produced all existing rows (pypdf pinned in
+# requirements.txt; EXTRACTOR_VERSION in app/extraction/pdf_text.py)
+LEGACY_EXTRACTOR_VERSION = 'pypdf-4.3.1-r1'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('guideline_extractions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.Text(), nullable=False),
+    sa.Column('extractor_version', sa.String(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('content_hash', 'extractor_version', name='uq_guideline_extractions_hash_version')
+    )
+    op.create_index(op.f('ix_guideline_extractions_id'), 'guideline_extractions', ['id'], unique=False)
+
+    op.add_column('funding_program_documents', sa.Column('extraction_id', sa.Integer(), nullable=True))
+
+    # One extraction per unique PDF (keep the oldest document's text)
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO guideline_extractions (content_hash, extractor_version, text)
+            SELECT DISTINCT ON (f.content_hash) f.content_hash, :version, d.extracted_text
+            FROM funding_program_documents d
+            JOIN files f ON f.id = d.file_id
+            ORDER BY f.content_hash, d.id
+            """
+        ).bindparams(version=LEGACY_EXTRACTOR_VERSION)
+    )
+    op.execute(
+        sa.text(
+            """
+            UPDATE funding_program_documents d
+            SET extraction_id = e.id
+            FROM files f, guideline_extractions e
+            WHERE f.id = d.file_id
+              AND e.content_hash = f.content_hash
+              AND e.extractor_version = :version
+            """
+        ).bindparams(version=LEGACY_EXTRACTOR_VERSION)
+    )
+
+    op.alter_column('funding_program_documents', 'extraction_id', nullable=False)
+    op.create_index(op.f('ix_funding_program_documents_extraction_id'), 'funding_program_documents', ['extraction_id'], unique=False)
+    op.create_foreign_key(
+        'funding_program_documents_extraction_id_fkey',
+        'funding_program_documents', 'guideline_extractions',
+        ['extraction_id'], ['id'],
+    )
+    op.drop_column('funding_program_documents', 'extracted_text')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('funding_program_documents', sa.Column('extracted_text', sa.Text(), nullable=True))
+    op.execute(
+        """
+        UPDATE funding_program_documents d
+        SET extracted_text = e.text
+        FROM guideline_extractions e
+        WHERE e.id = d.extraction_id
+        """
+    )
+    op.alter_column('funding_program_documents', 'extracted_text', nullable=False)
+
+    op.drop_constraint('funding_program_documents_extraction_id_fkey', 'funding_program_documents', type_='foreignkey')
+    op.drop_index(op.f('ix_funding_program_documents_extraction_id'), table_name='funding_program_documents')
+    op.drop_column('funding_program_documents', 'extraction_id')
+
+    op.drop_index(op.f('ix_guideline_extractions_id'), table_name='guideline_extractions')
+    op.drop_table('guideline_extractions')
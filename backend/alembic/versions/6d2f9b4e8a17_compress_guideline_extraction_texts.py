@@ -0,0 +1,123 @@
+"""compress guideline extraction texts
+
+Moves guideline_extractions.text into guideline_extraction_texts, compressed
+by app.extraction.text_store exactly as the app stores new texts (codec from
+GUIDELINE_TEXT_CODEC, recorded per row). search_vector stops being a
+generated column: the app writes it when it stores a text (keeps the existing
+values; DROP EXPRESSION needs Postgres 13+).
+
+Texts are compressed in Python, so this revision needs a live connection:
+it refuses to run in offline (--sql) mode.
+
+Revision ID: 6d2f9b4e8a17
+Revises: 0b5e8f2d7a91
+Create Date: 2026-10-18 19:12:40.527183
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.extraction.text_store import compress_text, decompress_text
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d2f9b4e8a17'
+down_revision: Union[str, Sequence[str], None] = '0b5e8f2d7a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 200
+
+texts_table = sa.table(
+    'guideline_extraction_texts',
+    sa.column('extraction_id', sa.Integer()),
+    sa.column('codec', sa.String()),
+    sa.column('raw_size', sa.Integer()),
+    sa.column('data', sa.LargeBinary()),
+)
+
+
+def _require_online() -> None:
+    if context.is_offline_mode():
+        raise RuntimeError('6d2f9b4e8a17 converts texts in Python; run it against a live database')
+
+
+def compress_existing_texts(connection) -> None:
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text('SELECT id, text FROM guideline_extractions WHERE id > :last_id ORDER BY id LIMIT :limit'),
+            {'last_id': last_id, 'limit': BATCH_SIZE},
+        ).all()
+        if not rows:
+            return
+        values = []
+        for extraction_id, text in rows:
+            codec, data = compress_text(text)
+            values.append({'extraction_id': extraction_id, 'codec': codec, 'raw_size': len(text.encode('utf-8')), 'data': data})
+        connection.execute(texts_table.insert(), values)
+        last_id = rows[-1][0]
+
+
+def restore_texts(connection) -> None:
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                'SELECT extraction_id, codec, data FROM guideline_extraction_texts '
+                'WHERE extraction_id > :last_id ORDER BY extraction_id LIMIT :limit'
+            ),
+            {'last_id': last_id, 'limit': BATCH_SIZE},
+        ).all()
+        if not rows:
+            return
+        connection.execute(
+            sa.text('UPDATE guideline_extractions SET text = :text WHERE id = :id'),
+            [{'id': extraction_id, 'text': decompress_text(codec, data)} for extraction_id, codec, data in rows],
+        )
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _require_online()
+    op.create_table('guideline_extraction_texts',
+    sa.Column('extraction_id', sa.Integer(), nullable=False),
+    sa.Column('codec', sa.String(), nullable=False),
+    sa.Column('raw_size', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['extraction_id'], ['guideline_extractions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('extraction_id')
+    )
+    op.execute('ALTER TABLE guideline_extractions ALTER COLUMN search_vector DROP EXPRESSION')
+    compress_existing_texts(op.get_bind())
+    op.drop_column('guideline_extractions', 'text')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _require_online()
+    op.add_column('guideline_extractions', sa.Column('text', sa.Text(), nullable=True))
+    restore_texts(op.get_bind())
+    op.alter_column('guideline_extractions', 'text', nullable=False)
+
+    op.drop_index('ix_guideline_extractions_search_vector', table_name='guideline_extractions')
+    op.drop_column('guideline_extractions', 'search_vector')
+    op.execute(
+        """
+        ALTER TABLE guideline_extractions
+        ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('german', text)) STORED
+        """
+    )
+    op.create_index(
+        'ix_guideline_extractions_search_vector',
+        'guideline_extractions',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+    op.drop_table('guideline_extraction_texts')
@@ -0,0 +1,42 @@
+"""add guideline fulltext search
+
+Revision ID: 8a4d2e6f1c93
+Revises: 3c9f7a1e2b64
+Create Date: 2026-10-18 13:05:52.170466
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4d2e6f1c93'
+down_revision: Union[str, Sequence[str], None] = '3c9f7a1e2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Not mapped on the model: queried with raw SQL in app/guideline_search.py
+    op.execute(
+        """
+        ALTER TABLE guideline_extractions
+        ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('german', text)) STORED
+        """
+    )
+    op.create_index(
+        'ix_guideline_extractions_search_vector',
+        'guideline_extractions',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_guideline_extractions_search_vector', table_name='guideline_extractions')
+    op.drop_column('guideline_extractions', 'search_vector')
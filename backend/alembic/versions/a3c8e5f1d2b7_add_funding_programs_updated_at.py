@@ -0,0 +1,32 @@
+"""add funding programs updated_at
+
+Revision ID: a3c8e5f1d2b7
+Revises: 6d2f9b4e8a17
+Create Date: 2026-10-18 21:04:27.301846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c8e5f1d2b7'
+down_revision: Union[str, Sequence[str], None] = '6d2f9b4e8a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('funding_programs', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.execute('UPDATE funding_programs SET updated_at = created_at')
+    op.alter_column('funding_programs', 'updated_at', nullable=False)
+    op.create_index('ix_funding_programs_updated_at', 'funding_programs', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_funding_programs_updated_at', table_name='funding_programs')
+    op.drop_column('funding_programs', 'updated_at')
@@ -0,0 +1,62 @@
+"""add guideline extraction jobs
+
+Revision ID: b5e1c2d8a4f7
+Revises: 7d822b08ffaa
+Create Date: 2026-10-18 09:12:41.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e1c2d8a4f7'
+down_revision: Union[str, Sequence[str], None] = '7d822b08ffaa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('guideline_extraction_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('funding_program_id', sa.Integer(), nullable=False),
+    sa.Column('file_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('document_id', sa.Integer(), nullable=True),
+    sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['funding_program_documents.id'], ),
+    sa.ForeignKeyConstraint(['file_id'], ['files.id'], ),
+    sa.ForeignKeyConstraint(['funding_program_id'], ['funding_programs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_guideline_extraction_jobs_funding_program_id'), 'guideline_extraction_jobs', ['funding_program_id'], unique=False)
+    op.create_index(op.f('ix_guideline_extraction_jobs_id'), 'guideline_extraction_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_guideline_extraction_jobs_status'), 'guideline_extraction_jobs', ['status'], unique=False)
+
+    # One document per (program, file), so a job run twice (requeued while
+    # still running) cannot attach its file twice. Drop existing duplicates
+    # first, keeping the oldest document.
+    op.execute(
+        'DELETE FROM funding_program_documents d '
+        'USING funding_program_documents keep '
+        'WHERE d.funding_program_id = keep.funding_program_id '
+        'AND d.file_id = keep.file_id AND d.id > keep.id'
+    )
+    op.create_unique_constraint('uq_funding_program_documents_program_file', 'funding_program_documents', ['funding_program_id', 'file_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_funding_program_documents_program_file', 'funding_program_documents', type_='unique')
+    op.drop_index(op.f('ix_guideline_extraction_jobs_status'), table_name='guideline_extraction_jobs')
+    op.drop_index(op.f('ix_guideline_extraction_jobs_id'), table_name='guideline_extraction_jobs')
+    op.drop_index(op.f('ix_guideline_extraction_jobs_funding_program_id'), table_name='guideline_extraction_jobs')
+    op.drop_table('guideline_extraction_jobs')
@@ -0,0 +1,40 @@
+"""add funding program section contexts
+
+Revision ID: e4b7c1a9d25f
+Revises: 8a4d2e6f1c93
+Create Date: 2026-10-18 14:03:27.552190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7c1a9d25f'
+down_revision: Union[str, Sequence[str], None] = '8a4d2e6f1c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('funding_program_section_contexts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('funding_program_id', sa.Integer(), nullable=False),
+    sa.Column('section_id', sa.String(), nullable=False),
+    sa.Column('passages', sa.Text(), nullable=False),
+    sa.Column('template_fingerprint', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['funding_program_id'], ['funding_programs.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('funding_program_id', 'section_id', name='uq_section_contexts_program_section')
+    )
+    op.create_index(op.f('ix_funding_program_section_contexts_id'), 'funding_program_section_contexts', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_funding_program_section_contexts_id'), table_name='funding_program_section_contexts')
+    op.drop_table('funding_program_section_contexts')
@@ -0,0 +1,27 @@
+"""add funding programs keyset index
+
+Revision ID: f1a6d3b8c472
+Revises: e4b7c1a9d25f
+Create Date: 2026-10-18 15:21:09.804413
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a6d3b8c472'
+down_revision: Union[str, Sequence[str], None] = 'e4b7c1a9d25f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_funding_programs_created_at_id', 'funding_programs', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_funding_programs_created_at_id', table_name='funding_programs')
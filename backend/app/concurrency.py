@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import functools
+from typing import Any, Callable, Optional, TypeVar
+
+from anyio import CapacityLimiter, to_thread
+
+from app.config import BLOCKING_IO_WORKERS
+
+T = TypeVar("T")
+
+_limiter: Optional[CapacityLimiter] = None
+
+
+def _get_limiter() -> CapacityLimiter:
+    # Created lazily: a CapacityLimiter binds to the running event loop
+    global _limiter
+    if _limiter is None:
+        _limiter = CapacityLimiter(BLOCKING_IO_WORKERS)
+    return _limiter
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking call (SQLAlchemy, hashing, storage upload, PDF parsing)
+    in a worker thread so async endpoints never stall the event loop.
+    At most BLOCKING_IO_WORKERS calls run at once; the rest wait their turn.
+    """
+    return await to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=_get_limiter())
@@ -12,6 +12,108 @@ def must_getenv(name: str) -> str:
 DATABASE_URL = must_getenv("DATABASE_URL")
 JWT_SECRET_KEY = must_getenv("JWT_SECRET_KEY")
 
+# Async driver URL for the request path; derived from DATABASE_URL when unset
+# (postgresql -> postgresql+asyncpg, sqlite -> sqlite+aiosqlite)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Connection pool per engine (sync and async each get one); ignored for SQLite
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Connections older than this are replaced (stay under server/proxy idle timeouts)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 SUPABASE_STORAGE_BUCKET = os.getenv("SUPABASE_STORAGE_BUCKET", "innovo-files")
+
+# Uploads are read, hashed and spooled to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+# Shared storage HTTP client (one per process, keep-alive pooled)
+STORAGE_HTTP_POOL_SIZE = int(os.getenv("STORAGE_HTTP_POOL_SIZE", "10"))
+STORAGE_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("STORAGE_HTTP_KEEPALIVE_EXPIRY", "30"))
+STORAGE_HTTP_TIMEOUT = float(os.getenv("STORAGE_HTTP_TIMEOUT", "60"))
+STORAGE_HTTP_CONNECT_TIMEOUT = float(os.getenv("STORAGE_HTTP_CONNECT_TIMEOUT", "5"))
+
+# Import storage and PDF libraries in a background thread once the app has
+# started, instead of on the first request that needs them (app/warmup.py)
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1").lower() in ("1", "true", "yes")
+
+# Where file bytes live: "supabase" | "local" | "memory"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase")
+# Root directory for the "local" backend
+LOCAL_STORAGE_ROOT = os.getenv("LOCAL_STORAGE_ROOT", "storage")
+
+# Upper bound on threads running blocking work (DB, hashing, storage, PDF parsing) for async endpoints
+BLOCKING_IO_WORKERS = int(os.getenv("BLOCKING_IO_WORKERS", "16"))
+
+# Guideline extraction job workers (0 = run no workers in this process)
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "2"))
+EXTRACTION_MAX_ATTEMPTS = int(os.getenv("EXTRACTION_MAX_ATTEMPTS", "3"))
+EXTRACTION_RETRY_BACKOFF_SECONDS = float(os.getenv("EXTRACTION_RETRY_BACKOFF_SECONDS", "10"))
+EXTRACTION_POLL_SECONDS = float(os.getenv("EXTRACTION_POLL_SECONDS", "5"))
+# "running" jobs older than this are assumed orphaned by a dead worker and
+# requeued, or failed if that was their last attempt
+EXTRACTION_STALE_SECONDS = float(os.getenv("EXTRACTION_STALE_SECONDS", "900"))
+
+# PDF text extraction: documents with at least this many pages are split
+# into page ranges and extracted in a process pool
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+PDF_EXTRACTION_PROCESSES = int(os.getenv("PDF_EXTRACTION_PROCESSES", str(os.cpu_count() or 1)))
+
+# Guideline upload batch limits (validated before anything is stored)
+GUIDELINE_MAX_FILES = int(os.getenv("GUIDELINE_MAX_FILES", "50"))
+GUIDELINE_MAX_BYTES = int(os.getenv("GUIDELINE_MAX_BYTES", str(100 * 1024 * 1024)))
+
+# Compression of stored extracted text: "zstd" (needs zstandard; falls back to zlib) or "zlib"
+GUIDELINE_TEXT_CODEC = os.getenv("GUIDELINE_TEXT_CODEC", "zstd")
+
+# BM25 passage indexes kept in memory (one per funding program, LRU)
+PASSAGE_INDEX_MAX_PROGRAMS = int(os.getenv("PASSAGE_INDEX_MAX_PROGRAMS", "64"))
+
+# Guideline passages stored per template section
+SECTION_CONTEXT_PASSAGES = int(os.getenv("SECTION_CONTEXT_PASSAGES", "3"))
+
+# Authenticated users cached by access token (skips the users lookup per request)
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+
+# bcrypt cost factor; stored hashes with a different cost are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Password hashing runs on its own bounded worker threads; requests beyond
+# workers + queue get 429 instead of waiting
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "16"))
+
+# Login throttling: attempts per client IP, failed attempts per email
+LOGIN_IP_MAX_ATTEMPTS = int(os.getenv("LOGIN_IP_MAX_ATTEMPTS", "30"))
+LOGIN_IP_WINDOW_SECONDS = float(os.getenv("LOGIN_IP_WINDOW_SECONDS", "60"))
+# Failures per email are free up to LOGIN_EMAIL_FREE_FAILURES; each further one
+# doubles the wait before the next attempt (capped), and they are forgotten
+# after LOGIN_EMAIL_WINDOW_SECONDS or a successful login
+LOGIN_EMAIL_FREE_FAILURES = int(os.getenv("LOGIN_EMAIL_FREE_FAILURES", "5"))
+LOGIN_EMAIL_BACKOFF_SECONDS = float(os.getenv("LOGIN_EMAIL_BACKOFF_SECONDS", "1"))
+LOGIN_EMAIL_MAX_BACKOFF_SECONDS = float(os.getenv("LOGIN_EMAIL_MAX_BACKOFF_SECONDS", "60"))
+LOGIN_EMAIL_WINDOW_SECONDS = float(os.getenv("LOGIN_EMAIL_WINDOW_SECONDS", "900"))
+
+# Reverse proxies in front of the app that append to X-Forwarded-For (Render: 1).
+# The login throttle counts per client IP: with 0 that is the socket peer, which
+# behind a proxy is the proxy itself and would put every user in one bucket.
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
+# Parsed user templates kept in memory
+USER_TEMPLATE_CACHE_SIZE = int(os.getenv("USER_TEMPLATE_CACHE_SIZE", "1024"))
+
+# /templates/list bodies cached per user; revalidated against the DB after this long
+TEMPLATE_LIST_CACHE_SECONDS = float(os.getenv("TEMPLATE_LIST_CACHE_SECONDS", "10"))
+TEMPLATE_LIST_CACHE_SIZE = int(os.getenv("TEMPLATE_LIST_CACHE_SIZE", "1024"))
+
+# Opt-in statement profiling (app/db_profiler.py): per-request counts, N+1 and slow query logs
+DB_PROFILING = os.getenv("DB_PROFILING", "0").lower() in ("1", "true", "yes")
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+DB_N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "5"))
+
+# Bearer token the scraper sends to GET /metrics; the endpoint is off while unset
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
@@ -1,12 +1,95 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config import (
+    ASYNC_DATABASE_URL,
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+)
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """
+    The same database through its asyncio driver.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for {backend}; set ASYNC_DATABASE_URL")
+
+    query = dict(parsed.query)
+    # asyncpg spells libpq's sslmode as ssl
+    if backend == "postgresql" and "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return str(parsed.set(drivername=ASYNC_DRIVERS[backend], query=query))
+
+
+def pool_options(url: str) -> Dict[str, Any]:
+    parsed = make_url(url)
+    options: Dict[str, Any] = {}
+    if parsed.get_backend_name() == "sqlite":
+        # SQLAlchemy 1.4 opens a new connection per checkout for file
+        # databases, which for aiosqlite also means a new thread; pool them
+        if parsed.get_driver_name() != "aiosqlite" or parsed.database in (None, "", ":memory:"):
+            return options
+        options["poolclass"] = AsyncAdaptedQueuePool
+    return {
+        **options,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
 
-from app.config import DATABASE_URL
 
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
+    **pool_options(DATABASE_URL),
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+# Request handlers await the database on the event loop instead of holding a
+# threadpool thread per request. Workers, migrations and CPU-bound endpoints
+# keep using the sync engine above.
+_async_url = ASYNC_DATABASE_URL or async_database_url(DATABASE_URL)
+async_engine = create_async_engine(
+    _async_url,
+    pool_pre_ping=True,
+    **pool_options(_async_url),
+)
+
+# Objects stay loaded after commit: an expired attribute would need I/O
+# outside the session's await points
+AsyncSessionLocal = sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+def insert_many_returning(db: Session, table, rows: List[Dict[str, Any]], returning: Sequence) -> List:
+    """
+    Insert rows with a single multi-VALUES INSERT ... RETURNING.
+    Dialects without RETURNING (SQLite on SQLAlchemy 1.4) fall back to one
+    INSERT per row in the same transaction.
+    """
+    if not rows:
+        return []
+
+    if db.bind.dialect.full_returning:
+        return db.execute(insert(table).values(rows).returning(*returning)).all()
+
+    results = []
+    for row in rows:
+        (pk,) = db.execute(insert(table).values(row)).inserted_primary_key
+        results.append(db.execute(table.select().with_only_columns(*returning).where(table.c.id == pk)).one())
+    return results
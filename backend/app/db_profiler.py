@@ -0,0 +1,204 @@
+"""
+Opt-in SQLAlchemy statement profiling.
+
+Hooks the engine's cursor events to count statements and DB time, spot
+statement shapes that repeat within one request (N+1) and log slow
+statements with the shape of their parameters (never the values).
+
+Per request (DB_PROFILING=1): QueryProfilerMiddleware adds X-DB-Statements
+and X-DB-Time-Ms headers and logs requests with repeated statement shapes.
+
+In tests and benchmarks, profile_queries() captures every statement the
+process runs inside the block, whatever thread runs it:
+
+    with profile_queries() as profile:
+        client.get("/templates/list")
+    assert profile.count <= 2, profile.report()
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import DB_N_PLUS_ONE_THRESHOLD, DB_SLOW_QUERY_MS
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+|\$\d+))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalized SQL: whitespace collapsed, IN lists of any length made equal.
+    """
+    return _IN_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """
+    Types of the bound parameters, e.g. "{email: str}" or "120 x (str, int)".
+    """
+    if executemany:
+        rows = list(parameters or [])
+        return f"{len(rows)} x {parameter_shape(rows[0]) if rows else '()'}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+@dataclass
+class QueryProfile:
+    count: int = 0
+    total_seconds: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+    slow: List[Tuple[float, str, str]] = field(default_factory=list)  # (seconds, shape, parameter shape)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, shape: str, elapsed: float, slow_params: Optional[str]) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_seconds += elapsed
+            self.shapes[shape] += 1
+            if slow_params is not None:
+                self.slow.append((elapsed, shape, slow_params))
+
+    def repeated(self, threshold: int = DB_N_PLUS_ONE_THRESHOLD) -> List[Tuple[str, int]]:
+        """
+        Statement shapes run at least `threshold` times: likely N+1 patterns.
+        """
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def count_matching(self, pattern: str) -> int:
+        """
+        Statements whose normalized SQL matches the regex, e.g. r"FROM users\\b".
+        """
+        regex = re.compile(pattern, re.IGNORECASE)
+        return sum(n for shape, n in self.shapes.items() if regex.search(shape))
+
+    def report(self) -> str:
+        lines = [f"{self.count} statements, {self.total_seconds * 1000:.1f} ms"]
+        lines += [f"  {n:4d} x {shape}" for shape, n in self.shapes.most_common()]
+        return "\n".join(lines)
+
+
+_request_profile: ContextVar[Optional[QueryProfile]] = ContextVar("request_query_profile", default=None)
+_global_profiles: List[QueryProfile] = []
+_global_lock = threading.Lock()
+_installed: set = set()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    shape = statement_shape(statement)
+
+    slow_params = None
+    if elapsed * 1000 >= DB_SLOW_QUERY_MS:
+        slow_params = parameter_shape(parameters, executemany)
+        logger.warning("Slow query (%.1f ms): %s params=%s", elapsed * 1000, shape, slow_params)
+
+    profile = _request_profile.get()
+    if profile is not None:
+        profile.record(shape, elapsed, slow_params)
+    if _global_profiles:
+        with _global_lock:
+            profiles = list(_global_profiles)
+        for profile in profiles:
+            profile.record(shape, elapsed, slow_params)
+
+
+def _app_engines() -> List[Engine]:
+    from app.database import async_engine, engine
+
+    # Async engine events fire on the sync engine it wraps
+    return [engine, async_engine.sync_engine]
+
+
+def install_query_profiler(engine: Engine) -> None:
+    """
+    Attach the cursor event hooks (once per engine).
+    """
+    if id(engine) in _installed:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    _installed.add(id(engine))
+
+
+@contextmanager
+def profile_queries(engine: Optional[Engine] = None) -> Iterator[QueryProfile]:
+    """
+    Profile every statement run in this process during the block.
+    """
+    for each in [engine] if engine is not None else _app_engines():
+        install_query_profiler(each)
+
+    profile = QueryProfile()
+    with _global_lock:
+        _global_profiles.append(profile)
+    try:
+        yield profile
+    finally:
+        with _global_lock:
+            _global_profiles.remove(profile)
+
+
+class QueryProfilerMiddleware:
+    """
+    Per-request statement counts (pure ASGI, like TimingMiddleware).
+    """
+
+    def __init__(self, app, engine: Optional[Engine] = None):
+        for each in [engine] if engine is not None else _app_engines():
+            install_query_profiler(each)
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = _request_profile.set(profile)
+
+        async def send_with_counts(message):
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": list(message.get("headers", [])) + [
+                        (b"x-db-statements", str(profile.count).encode()),
+                        (b"x-db-time-ms", f"{profile.total_seconds * 1000:.1f}".encode()),
+                    ],
+                }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_counts)
+        finally:
+            _request_profile.reset(token)
+            repeated = profile.repeated()
+            if repeated:
+                logger.warning(
+                    "%s %s ran %d statements; repeated shapes (possible N+1):\n%s",
+                    scope["method"],
+                    scope["path"],
+                    profile.count,
+                    "\n".join(f"  {n} x {shape}" for shape, n in repeated),
+                )
@@ -1,10 +1,12 @@
-from app.database import SessionLocal
+from app.database import AsyncSessionLocal, SessionLocal
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.jwt_utils import verify_token
 from app.models import User
-from typing import Generator
+from app.principal_cache import principal_cache
+from typing import AsyncGenerator, Generator
 security = HTTPBearer()
 
 
@@ -16,9 +18,14 @@ def get_db() -> Generator:
         db.close()
 
 
-def get_current_user(
+async def get_async_db() -> AsyncGenerator:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     token = credentials.credentials
     payload = verify_token(token)
@@ -29,11 +36,18 @@ def get_current_user(
             detail="Invalid or expired token",
         )
 
-    user = db.query(User).filter(User.email == payload["email"]).first()
+    user = principal_cache.get(token)
+    if user is not None:
+        return user
+
+    user = (await db.execute(select(User).where(User.email == payload["email"]))).scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
 
+    # Detached, with its columns loaded, so it can outlive this session
+    db.expunge(user)
+    principal_cache.put(token, user, payload.get("exp"))
     return user
@@ -0,0 +1,64 @@
+"""
+Content-addressed cache of extracted guideline text.
+
+One guideline_extractions row per (content_hash, extractor version), shared by
+every FundingProgramDocument that points at the same PDF.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.extraction.pdf_text import EXTRACTOR_VERSION, extract_text_from_pdf_bytes
+from app.guideline_search import index_extraction_text
+from app.metrics import stage
+from app.models import File, GuidelineExtraction
+from app.storage.backends import get_storage_backend
+
+
+class EmptyExtractionError(Exception):
+    """
+    The PDF has no extractable text (e.g. a scan without OCR).
+    """
+
+
+def find_extraction(db: Session, content_hash: str) -> Optional[GuidelineExtraction]:
+    return db.query(GuidelineExtraction).filter(
+        GuidelineExtraction.content_hash == content_hash,
+        GuidelineExtraction.extractor_version == EXTRACTOR_VERSION,
+    ).first()
+
+
+def get_or_create_extraction(db: Session, file_obj: File) -> GuidelineExtraction:
+    """
+    Return the cached extraction for this file's content, parsing the PDF
+    from storage only on a miss. The caller commits.
+    """
+    existing = find_extraction(db, file_obj.content_hash)
+    if existing:
+        return existing
+
+    with stage("storage_download"):
+        pdf_bytes = get_storage_backend().download(file_obj.storage_path)
+    text = extract_text_from_pdf_bytes(pdf_bytes)
+    if not text.strip():
+        raise EmptyExtractionError(f"Could not extract text from PDF: {file_obj.original_filename}")
+
+    extraction = GuidelineExtraction(
+        content_hash=file_obj.content_hash,
+        extractor_version=EXTRACTOR_VERSION,
+        text=text,
+    )
+    try:
+        with db.begin_nested():
+            db.add(extraction)
+            db.flush()
+            index_extraction_text(db, extraction.id, text)
+    except IntegrityError:
+        # Another worker extracted the same PDF concurrently; use its row
+        return find_extraction(db, file_obj.content_hash)
+
+    return extraction
@@ -0,0 +1,299 @@
+"""
+DB-backed job queue for guideline PDF text extraction.
+
+Jobs live in guideline_extraction_jobs; workers (app/extraction/worker.py)
+claim them with a conditional UPDATE, so any number of worker threads or
+processes can share the table without an outside broker.
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import EXTRACTION_MAX_ATTEMPTS, EXTRACTION_RETRY_BACKOFF_SECONDS, EXTRACTION_STALE_SECONDS
+from app.database import insert_many_returning
+from app.extraction.cache import EmptyExtractionError, get_or_create_extraction
+from app.extraction.pdf_text import EXTRACTOR_VERSION
+from app.models import File, FundingProgramDocument, GuidelineExtraction, GuidelineExtractionJob
+from app.retrieval.section_context import invalidate_section_contexts
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class PermanentJobError(Exception):
+    """
+    Extraction failed in a way a retry will not fix (e.g. a scanned PDF without text).
+    """
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def attach_guidelines(db: Session, funding_program_id: int, files: List[File]) -> List:
+    """
+    Queue extraction for a batch of guideline PDFs (one job per file, in order).
+    Files whose content was extracted before, or that the program already
+    has, get their document right away and a job that is born succeeded. Documents and jobs are each written with one
+    INSERT; the caller commits. Returns the inserted job rows.
+    """
+    if not files:
+        return []
+
+    now = _utcnow()
+    cached = dict(
+        db.query(GuidelineExtraction.content_hash, GuidelineExtraction.id).filter(
+            GuidelineExtraction.content_hash.in_({f.content_hash for f in files}),
+            GuidelineExtraction.extractor_version == EXTRACTOR_VERSION,
+        ).all()
+    )
+    # A file is attached to a program at most once; uploading it again
+    # (or twice in one batch) reuses the document
+    doc_ids: Dict[uuid.UUID, int] = dict(
+        db.query(FundingProgramDocument.file_id, FundingProgramDocument.id).filter(
+            FundingProgramDocument.funding_program_id == funding_program_id,
+            FundingProgramDocument.file_id.in_({f.id for f in files}),
+        ).all()
+    )
+
+    new_docs = {
+        f.id: {"funding_program_id": funding_program_id, "file_id": f.id, "extraction_id": cached[f.content_hash]}
+        for f in files
+        if f.content_hash in cached and f.id not in doc_ids
+    }
+    doc_rows = insert_many_returning(
+        db,
+        FundingProgramDocument.__table__,
+        list(new_docs.values()),
+        returning=[FundingProgramDocument.id, FundingProgramDocument.file_id],
+    )
+    if doc_rows:
+        # Core inserts skip the mapper events that normally drop these
+        invalidate_section_contexts(db.connection(), funding_program_id)
+    doc_ids.update((row.file_id, row.id) for row in doc_rows)
+
+    job_rows = []
+    for f in files:
+        job = {
+            "funding_program_id": funding_program_id,
+            "file_id": f.id,
+            "status": JOB_QUEUED,
+            "attempts": 0,
+            "error": None,
+            "document_id": None,
+            "available_at": now,
+            "finished_at": None,
+        }
+        if f.id in doc_ids:
+            job.update(status=JOB_SUCCEEDED, document_id=doc_ids[f.id], finished_at=now)
+        job_rows.append(job)
+
+    inserted = insert_many_returning(
+        db,
+        GuidelineExtractionJob.__table__,
+        job_rows,
+        returning=list(GuidelineExtractionJob.__table__.c),
+    )
+    return sorted(inserted, key=lambda r: r.id)
+
+
+def claim_next_job(db: Session) -> Optional[GuidelineExtractionJob]:
+    """
+    Atomically move the oldest available queued job to "running".
+    Returns None when nothing is ready.
+    """
+    while True:
+        now = _utcnow()
+        candidate_id = (
+            db.query(GuidelineExtractionJob.id)
+            .filter(
+                GuidelineExtractionJob.status == JOB_QUEUED,
+                GuidelineExtractionJob.available_at <= now,
+            )
+            .order_by(GuidelineExtractionJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar()
+        )
+        if candidate_id is None:
+            db.commit()
+            return None
+
+        # Conditional update: only one worker wins, even without row locks (SQLite)
+        claimed = db.execute(
+            update(GuidelineExtractionJob)
+            .where(
+                GuidelineExtractionJob.id == candidate_id,
+                GuidelineExtractionJob.status == JOB_QUEUED,
+            )
+            .values(
+                status=JOB_RUNNING,
+                attempts=GuidelineExtractionJob.attempts + 1,
+                started_at=now,
+                error=None,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+
+        if claimed:
+            job = db.query(GuidelineExtractionJob).filter(GuidelineExtractionJob.id == candidate_id).first()
+            # Held outside the mapped columns: a rollback expires the job, and
+            # reloading started_at would pick up a later claim's value
+            job.claimed_at = now
+            return job
+
+
+def _still_claimed(job: GuidelineExtractionJob):
+    # started_at doubles as the claim token: a job requeued as stale gets a
+    # new one when the next worker claims it, and the old claim is void
+    return (
+        GuidelineExtractionJob.id == job.id,
+        GuidelineExtractionJob.status == JOB_RUNNING,
+        GuidelineExtractionJob.started_at == job.claimed_at,
+    )
+
+
+def complete_job(db: Session, job: GuidelineExtractionJob, document: FundingProgramDocument) -> bool:
+    """
+    Mark the job succeeded and commit its document, if this worker's claim
+    still holds. Otherwise the job was requeued as stale and belongs to
+    another worker: everything is rolled back and False returned.
+    """
+    completed = db.execute(
+        update(GuidelineExtractionJob)
+        .where(*_still_claimed(job))
+        .values(status=JOB_SUCCEEDED, document_id=document.id, finished_at=_utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not completed:
+        db.rollback()
+        return False
+    db.commit()
+    return True
+
+
+def fail_job(db: Session, job: GuidelineExtractionJob, error: str, permanent: bool = False) -> bool:
+    """
+    Requeue with exponential backoff, or mark failed once attempts are used up.
+    Like complete_job, a no-op returning False once the claim is void.
+    """
+    where, attempts = _still_claimed(job), job.attempts
+    db.rollback()
+    if permanent or attempts >= EXTRACTION_MAX_ATTEMPTS:
+        values = {"status": JOB_FAILED, "finished_at": _utcnow()}
+    else:
+        backoff = EXTRACTION_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+        values = {"status": JOB_QUEUED, "available_at": _utcnow() + timedelta(seconds=backoff)}
+    failed = db.execute(
+        update(GuidelineExtractionJob)
+        .where(*where)
+        .values(error=error[:2000], **values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return bool(failed)
+
+
+def retry_job(db: Session, job: GuidelineExtractionJob) -> None:
+    """
+    Manual retry of a failed job: back to the queue with a fresh attempt budget.
+    """
+    job.status = JOB_QUEUED
+    job.attempts = 0
+    job.error = None
+    job.finished_at = None
+    job.available_at = _utcnow()
+    db.commit()
+
+
+def requeue_stale_jobs(db: Session) -> int:
+    """
+    Put "running" jobs whose worker died back in the queue. Jobs that have
+    used up their attempts fail instead, so a PDF that crashes or hangs the
+    worker is not claimed forever. Returns the number requeued.
+    """
+    now = _utcnow()
+    stale = (
+        GuidelineExtractionJob.status == JOB_RUNNING,
+        GuidelineExtractionJob.started_at < now - timedelta(seconds=EXTRACTION_STALE_SECONDS),
+    )
+    db.execute(
+        update(GuidelineExtractionJob)
+        .where(*stale, GuidelineExtractionJob.attempts >= EXTRACTION_MAX_ATTEMPTS)
+        .values(
+            status=JOB_FAILED,
+            finished_at=now,
+            error=f"Extraction did not finish within {EXTRACTION_STALE_SECONDS:g}s on the last attempt",
+        )
+        .execution_options(synchronize_session=False)
+    )
+    count = db.execute(
+        update(GuidelineExtractionJob)
+        .where(*stale, GuidelineExtractionJob.attempts < EXTRACTION_MAX_ATTEMPTS)
+        .values(status=JOB_QUEUED, available_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return count
+
+
+def _find_document(db: Session, funding_program_id: int, file_id: uuid.UUID) -> Optional[FundingProgramDocument]:
+    return db.query(FundingProgramDocument).filter(
+        FundingProgramDocument.funding_program_id == funding_program_id,
+        FundingProgramDocument.file_id == file_id,
+    ).first()
+
+
+def _add_document(
+    db: Session,
+    job: GuidelineExtractionJob,
+    extraction: GuidelineExtraction,
+) -> FundingProgramDocument:
+    """
+    The program's document for the job's file. Idempotent: a rerun of the
+    job, or another job for the same file, gets the existing row.
+    """
+    existing = _find_document(db, job.funding_program_id, job.file_id)
+    if existing:
+        return existing
+
+    doc = FundingProgramDocument(
+        funding_program_id=job.funding_program_id,
+        file_id=job.file_id,
+        extraction_id=extraction.id,
+    )
+    try:
+        with db.begin_nested():
+            db.add(doc)
+            db.flush()
+    except IntegrityError:
+        # Another job attached the same file concurrently; use its row
+        return _find_document(db, job.funding_program_id, job.file_id)
+    return doc
+
+
+def run_extraction_job(db: Session, job: GuidelineExtractionJob) -> FundingProgramDocument:
+    """
+    Attach the PDF's text to the funding program, extracting it only if
+    this content has not been extracted before.
+    """
+    file_obj = db.query(File).filter(File.id == job.file_id).first()
+    if not file_obj:
+        raise PermanentJobError(f"File {job.file_id} not found")
+
+    try:
+        extraction = get_or_create_extraction(db, file_obj)
+    except EmptyExtractionError as exc:
+        raise PermanentJobError(str(exc)) from exc
+
+    return _add_document(db, job, extraction)
@@ -1,23 +1,140 @@
 from __future__ import annotations
 
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from importlib.metadata import version
+from typing import TYPE_CHECKING, List, Optional, Tuple
 import io
+import logging
+import multiprocessing
+import threading
 
-from pypdf import PdfReader
+from app.config import PDF_EXTRACTION_PROCESSES, PDF_PARALLEL_MIN_PAGES
+from app.metrics import stage
 
+# pypdf is imported on first extraction, not at app startup; see app/warmup.py
+if TYPE_CHECKING:
+    from pypdf import PdfReader
 
-def extract_text_from_pdf_bytes(pdf_bytes: bytes) -> str:
-    """
-    Extract text from a PDF (bytes).
-    Returns a single combined string.
-    """
-    reader = PdfReader(io.BytesIO(pdf_bytes))
+logger = logging.getLogger(__name__)
+
+# Bump whenever a change in this module alters the extracted text
+EXTRACTOR_REVISION = 1
+
+# Identifies the extraction output format. Cached extractions
+# (guideline_extractions) are only reused for the same version: a pypdf
+# upgrade or a new EXTRACTOR_REVISION extracts again.
+EXTRACTOR_VERSION = f"pypdf-{version('pypdf')}-r{EXTRACTOR_REVISION}"
+
+# Each process task handles at least this many pages, so small ranges
+# don't spend more time re-parsing the PDF than extracting text.
+MIN_PAGES_PER_TASK = 8
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _extract_pages(reader: PdfReader, start: int, stop: int) -> List[str]:
     parts: list[str] = []
 
-    for page in reader.pages:
+    for page in reader.pages[start:stop]:
         text = page.extract_text() or ""
         text = text.strip()
         if text:
             parts.append(text)
 
+    return parts
+
+
+def _extract_page_range(pdf_bytes: bytes, start: int, stop: int) -> List[str]:
+    # Runs in a worker process
+    from pypdf import PdfReader
+
+    return _extract_pages(PdfReader(io.BytesIO(pdf_bytes)), start, stop)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the API process runs threads (workers, executors)
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACTION_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_extraction_pool() -> None:
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def split_page_ranges(page_count: int, processes: int) -> List[Tuple[int, int]]:
+    """
+    Split [0, page_count) into contiguous ranges, about two per process
+    so a slow range doesn't leave the other processes idle.
+    """
+    tasks = max(1, min(processes * 2, page_count // MIN_PAGES_PER_TASK))
+    size, extra = divmod(page_count, tasks)
+
+    ranges = []
+    start = 0
+    for i in range(tasks):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _extract_parallel(pdf_bytes: bytes, page_count: int) -> List[str]:
+    pool = _get_pool()
+    futures = [
+        pool.submit(_extract_page_range, pdf_bytes, start, stop)
+        for start, stop in split_page_ranges(page_count, PDF_EXTRACTION_PROCESSES)
+    ]
+
+    parts: list[str] = []
+    for future in futures:  # submission order == page order
+        parts.extend(future.result())
+    return parts
+
+
+def extract_text_from_pdf_bytes(pdf_bytes: bytes, parallel: Optional[bool] = None) -> str:
+    """
+    Extract text from a PDF (bytes).
+    Returns a single combined string.
+
+    Documents with PDF_PARALLEL_MIN_PAGES pages or more are extracted in a
+    process pool; smaller ones stay on the serial path. Pass parallel=True/False
+    to force either path.
+    """
+    with stage("pdf_extract"):
+        return _extract_text(pdf_bytes, parallel)
+
+
+def _extract_text(pdf_bytes: bytes, parallel: Optional[bool]) -> str:
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    page_count = len(reader.pages)
+
+    if parallel is None:
+        parallel = PDF_EXTRACTION_PROCESSES > 1 and page_count >= PDF_PARALLEL_MIN_PAGES
+
+    if parallel:
+        try:
+            parts = _extract_parallel(pdf_bytes, page_count)
+        except BrokenProcessPool:
+            logger.warning("PDF extraction pool broke; falling back to serial extraction")
+            shutdown_extraction_pool()
+            parts = _extract_pages(reader, 0, page_count)
+    else:
+        parts = _extract_pages(reader, 0, page_count)
+
     return "\n\n".join(parts).strip()
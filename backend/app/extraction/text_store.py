@@ -0,0 +1,85 @@
+"""
+Compression of extracted guideline text.
+
+Texts are stored in guideline_extraction_texts as compressed UTF-8: zstd when
+the zstandard package is installed, zlib otherwise. The codec is recorded per
+row, so rows written with either stay readable (zstd rows need zstandard).
+Readers decompress lazily: GuidelineExtraction.text on first access, and
+iter_decompressed() chunk by chunk for streaming.
+"""
+
+from __future__ import annotations
+
+import io
+import zlib
+from typing import Iterator, Optional, Tuple
+
+from app.config import GUIDELINE_TEXT_CODEC
+
+try:
+    import zstandard
+except ImportError:  # optional; zlib is always available
+    zstandard = None
+
+CODEC_ZSTD = "zstd"
+CODEC_ZLIB = "zlib"
+
+# Texts are written once and read many times: favour ratio over write speed
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 9
+
+
+def default_codec() -> str:
+    if GUIDELINE_TEXT_CODEC == CODEC_ZSTD and zstandard is None:
+        return CODEC_ZLIB
+    return GUIDELINE_TEXT_CODEC
+
+
+def compress_text(text: str, codec: Optional[str] = None) -> Tuple[str, bytes]:
+    """
+    (codec, compressed UTF-8 bytes) of the text.
+    """
+    codec = codec or default_codec()
+    raw = text.encode("utf-8")
+    if codec == CODEC_ZSTD:
+        return codec, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    if codec == CODEC_ZLIB:
+        return codec, zlib.compress(raw, ZLIB_LEVEL)
+    raise ValueError(f"Unknown text codec: {codec}")
+
+
+def decompress_text(codec: str, data: bytes) -> str:
+    if codec == CODEC_ZSTD:
+        return _zstd_decompressor().decompress(data).decode("utf-8")
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data).decode("utf-8")
+    raise ValueError(f"Unknown text codec: {codec}")
+
+
+def iter_decompressed(codec: str, data: bytes, chunk_size: int) -> Iterator[bytes]:
+    """
+    The UTF-8 text in chunks of at most chunk_size bytes, decompressed as
+    they are consumed (chunks may split multi-byte characters).
+    """
+    if codec == CODEC_ZSTD:
+        yield from _zstd_decompressor().read_to_iter(io.BytesIO(data), write_size=chunk_size)
+        return
+    if codec != CODEC_ZLIB:
+        raise ValueError(f"Unknown text codec: {codec}")
+
+    decompressor = zlib.decompressobj()
+    pending = data
+    while pending:
+        chunk = decompressor.decompress(pending, chunk_size)
+        pending = decompressor.unconsumed_tail
+        if chunk:
+            yield chunk
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+def _zstd_decompressor():
+    if zstandard is None:
+        raise RuntimeError("Text is zstd-compressed but the zstandard package is not installed")
+    return zstandard.ZstdDecompressor()
@@ -0,0 +1,143 @@
+"""
+Thread pool that drains the guideline extraction queue.
+
+Started from the app lifespan when EXTRACTION_WORKERS > 0. It can also run on
+its own (with EXTRACTION_WORKERS=0 on the web processes):
+
+    python -m app.extraction.worker
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import List, Optional
+
+from app.config import EXTRACTION_POLL_SECONDS, EXTRACTION_WORKERS
+from app.database import SessionLocal
+from app.extraction.jobs import (
+    PermanentJobError,
+    claim_next_job,
+    complete_job,
+    fail_job,
+    requeue_stale_jobs,
+    run_extraction_job,
+)
+from app.retrieval.bm25 import passage_indexes
+from app.retrieval.section_context import refresh_section_contexts
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionWorkerPool:
+    def __init__(self, workers: int = EXTRACTION_WORKERS, poll_seconds: float = EXTRACTION_POLL_SECONDS):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        db = SessionLocal()
+        try:
+            requeued = requeue_stale_jobs(db)
+            if requeued:
+                logger.info("Requeued %d stale extraction jobs", requeued)
+        finally:
+            db.close()
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"extraction-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def notify(self) -> None:
+        """
+        Wake idle workers right away instead of waiting for the next poll.
+        """
+        self._wakeup.set()
+
+    def run_once(self) -> bool:
+        """
+        Claim and run one job. Returns False if the queue had nothing ready.
+        """
+        db = SessionLocal()
+        try:
+            job = claim_next_job(db)
+            if job is None:
+                return False
+
+            try:
+                doc = run_extraction_job(db, job)
+                indexed = (doc.funding_program_id, doc.id, doc.extraction.text)
+                if not complete_job(db, job, doc):
+                    logger.warning("Extraction job %s was claimed again by another worker; dropped its result", job.id)
+                    return True
+                passage_indexes.add_document(*indexed)
+            except PermanentJobError as exc:
+                fail_job(db, job, str(exc), permanent=True)
+                return True
+            except Exception as exc:
+                logger.exception("Extraction job %s failed", job.id)
+                fail_job(db, job, f"{type(exc).__name__}: {exc}")
+                return True
+
+            try:
+                refresh_section_contexts(db, job.funding_program_id)
+            except Exception:
+                logger.exception("Refreshing section contexts for funding program %s failed", job.funding_program_id)
+                db.rollback()
+            return True
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            try:
+                if self.run_once():
+                    continue
+            except Exception:
+                logger.exception("Extraction worker loop error")
+
+            self._wakeup.wait(self.poll_seconds)
+
+
+_pool: Optional[ExtractionWorkerPool] = None
+
+
+def start_extraction_workers() -> None:
+    global _pool
+    if EXTRACTION_WORKERS <= 0 or _pool is not None:
+        return
+    _pool = ExtractionWorkerPool()
+    _pool.start()
+
+
+def stop_extraction_workers() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.stop()
+        _pool = None
+
+
+def notify_extraction_workers() -> None:
+    if _pool is not None:
+        _pool.notify()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    pool = ExtractionWorkerPool(workers=max(EXTRACTION_WORKERS, 1))
+    pool.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pool.stop()
@@ -0,0 +1,309 @@
+"""
+Full-text search over extracted guideline text.
+
+The text itself is stored compressed (guideline_extraction_texts), so the
+search indexes are written by the app when an extraction is stored
+(index_extraction_text). Searching is split in two: find_guidelines() runs
+the queries, with_snippets() decompresses the top hits and cuts snippets
+around the words the index matched; callers on the event loop run the
+second in a worker thread.
+
+Postgres: guideline_extractions.search_vector, a tsvector column using the
+'german' text search configuration, with a GIN index (see the Alembic
+migrations). The column is not mapped on the model; it only exists in
+Postgres.
+
+SQLite (local runs, benchmarks): a contentless FTS5 table, written with
+every stored extraction; the first search in a process indexes any text
+that is missing from it.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.extraction.text_store import decompress_text
+from app.models import GuidelineExtractionText
+
+_POSTGRES_SEARCH = text(
+    """
+    WITH query AS (
+        SELECT websearch_to_tsquery('german', :q) AS q
+    ),
+    hits AS (
+        SELECT e.id, ts_rank_cd(e.search_vector, query.q) AS rank
+        FROM guideline_extractions e, query
+        WHERE e.search_vector @@ query.q
+        ORDER BY rank DESC
+        LIMIT :limit
+    )
+    SELECT
+        fp.id AS funding_program_id,
+        fp.title AS funding_program_title,
+        d.id AS document_id,
+        d.file_id AS file_id,
+        f.original_filename AS original_filename,
+        hits.rank AS rank,
+        hits.id AS extraction_id
+    FROM hits
+    JOIN funding_program_documents d ON d.extraction_id = hits.id
+    JOIN funding_programs fp ON fp.id = d.funding_program_id
+    JOIN files f ON f.id = d.file_id
+    ORDER BY hits.rank DESC, d.id
+    """
+)
+
+_POSTGRES_INDEX = text("UPDATE guideline_extractions SET search_vector = to_tsvector('german', :text) WHERE id = :id")
+
+_SQLITE_SEARCH = text(
+    """
+    WITH hits AS (
+        SELECT rowid AS id, rank
+        FROM guideline_texts_fts
+        WHERE guideline_texts_fts MATCH :q
+        ORDER BY rank
+        LIMIT :limit
+    )
+    SELECT
+        fp.id AS funding_program_id,
+        fp.title AS funding_program_title,
+        d.id AS document_id,
+        d.file_id AS file_id,
+        f.original_filename AS original_filename,
+        -hits.rank AS rank,
+        hits.id AS extraction_id
+    FROM hits
+    JOIN funding_program_documents d ON d.extraction_id = hits.id
+    JOIN funding_programs fp ON fp.id = d.funding_program_id
+    JOIN files f ON f.id = d.file_id
+    ORDER BY hits.rank, d.id
+    """
+)
+
+_SQLITE_INDEX = text("INSERT INTO guideline_texts_fts(rowid, text) VALUES (:id, :text)")
+
+# Contentless: the index only, the text itself stays compressed
+_SQLITE_FTS_DDL = text(
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS guideline_texts_fts USING fts5(
+        text, content='', tokenize='unicode61 remove_diacritics 2'
+    )
+    """
+)
+
+_SQLITE_UNINDEXED = text(
+    """
+    SELECT t.extraction_id, t.codec, t.data
+    FROM guideline_extraction_texts t
+    WHERE NOT EXISTS (SELECT 1 FROM guideline_texts_fts f WHERE f.rowid = t.extraction_id)
+    """
+)
+
+# Lexemes of the query under the same configuration as search_vector
+_POSTGRES_QUERY_STEMS = text("SELECT tsvector_to_array(to_tsvector('german', :q))")
+
+# Words per snippet, and how many of them come before the first match
+SNIPPET_WORDS = 24
+SNIPPET_LEAD_WORDS = 6
+
+_WORD = re.compile(r"\S+")
+
+# Letters whose umlaut/ß spelling the search indexes fold away
+_FOLDED = {"a": "[aä]", "o": "[oö]", "u": "[uü]"}
+
+_sqlite_ready = False
+_sqlite_lock = threading.Lock()
+
+
+@dataclass
+class GuidelineSearchRow:
+    funding_program_id: int
+    funding_program_title: str
+    document_id: int
+    file_id: UUID
+    original_filename: str
+    rank: float
+    snippet: str
+
+
+@dataclass
+class GuidelineMatches:
+    """
+    Search hits before snippets: the rows, the compressed text of every
+    matching extraction, and a pattern for the words the index matched.
+    """
+
+    rows: List
+    texts: Dict[int, Tuple[str, bytes]]
+    terms: Optional[Pattern[str]]
+
+
+def ensure_sqlite_search_index(db: Session) -> None:
+    """
+    Create the FTS5 table once per process and index every stored text that
+    is not in it yet (rows written by migrations or before the table existed).
+    """
+    global _sqlite_ready
+
+    if _sqlite_ready:
+        return
+    with _sqlite_lock:
+        if _sqlite_ready:
+            return
+        db.execute(_SQLITE_FTS_DDL)
+        for extraction_id, codec, data in db.execute(_SQLITE_UNINDEXED).all():
+            db.execute(_SQLITE_INDEX, {"id": extraction_id, "text": decompress_text(codec, data)})
+        db.commit()
+        _sqlite_ready = True
+
+
+def index_extraction_text(db: Session, extraction_id: int, extracted_text: str) -> None:
+    """
+    Make a newly stored extraction searchable, in the caller's transaction.
+    """
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        db.execute(_POSTGRES_INDEX, {"id": extraction_id, "text": extracted_text})
+    elif dialect == "sqlite":
+        # Every process writes the index itself (workers included), so it is
+        # complete whichever process searches first
+        db.execute(_SQLITE_FTS_DDL)
+        db.execute(_SQLITE_INDEX, {"id": extraction_id, "text": extracted_text})
+
+
+def _fts5_query(q: str) -> str:
+    # Quote every word so user input can't be parsed as FTS5 syntax; words are ANDed
+    words = re.findall(r"\w+", q)
+    return " ".join(f'"{word}"' for word in words)
+
+
+def _fold(word: str) -> str:
+    # What the indexes compare: lower case, no diacritics, ß as ss
+    decomposed = unicodedata.normalize("NFKD", word.lower().replace("ß", "ss"))
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _term_regex(term: str) -> str:
+    # A folded term as a regex that also matches the umlaut and ß spellings
+    parts = []
+    for piece in re.split(r"(ss)", term):
+        if piece == "ss":
+            parts.append("(?:ss|ß)")
+        else:
+            parts.extend(_FOLDED.get(char, re.escape(char)) for char in piece)
+    return "".join(parts)
+
+
+def term_pattern(terms: Iterable[str], prefix: bool) -> Optional[Pattern[str]]:
+    """
+    Words matching any of the terms: starting with one of them (Postgres
+    stems), or equal to one (SQLite tokens), ignoring case and umlauts.
+    """
+    folded = sorted({_fold(term) for term in terms if term}, key=len, reverse=True)
+    if not folded:
+        return None
+    alternatives = "|".join(_term_regex(term) for term in folded)
+    return re.compile(rf"\b(?:{alternatives})" + (r"\w*" if prefix else r"\b"), re.IGNORECASE)
+
+
+def snippet(extracted_text: str, terms: Optional[Pattern[str]]) -> str:
+    """
+    SNIPPET_WORDS words around the first word matching `terms` (the start of
+    the text when none does), with matching words marked <b>...</b>.
+    """
+    match = terms.search(extracted_text) if terms is not None else None
+    first = match.start() if match else 0
+
+    # Only a window around the first match is tokenized, not the whole document
+    window_start = max(0, first - 400)
+    lead = list(_WORD.finditer(extracted_text, window_start, first))[-SNIPPET_LEAD_WORDS:]
+    start = lead[0].start() if lead else first
+    words = []
+    for word in _WORD.finditer(extracted_text, start, start + 2000):
+        words.append(word)
+        if len(words) == SNIPPET_WORDS:
+            break
+    if not words:
+        return ""
+
+    marked = " ".join(
+        f"<b>{word.group()}</b>"
+        if match and word.start() >= first and terms.search(word.group())
+        else word.group()
+        for word in words
+    )
+    if _WORD.search(extracted_text, 0, start):
+        marked = "…" + marked
+    if _WORD.search(extracted_text, words[-1].end()):
+        marked += "…"
+    return marked
+
+
+def find_guidelines(db: Session, q: str, limit: int = 20) -> GuidelineMatches:
+    """
+    Ranked guideline documents matching `q`, one row per (matching
+    extraction, document attached to it). Database work only: snippets are
+    cut by with_snippets().
+    """
+    if db.bind.dialect.name == "sqlite":
+        ensure_sqlite_search_index(db)
+        fts_query = _fts5_query(q)
+        if not fts_query:
+            return GuidelineMatches([], {}, None)
+        rows = db.execute(_SQLITE_SEARCH, {"q": fts_query, "limit": limit}).all()
+        # FTS5 matches whole tokens (unicode61, diacritics removed)
+        terms = term_pattern(re.findall(r"\w+", q), prefix=False) if rows else None
+    else:
+        rows = db.execute(_POSTGRES_SEARCH, {"q": q, "limit": limit}).all()
+        # search_vector holds german stems; words match when they start with one
+        stems = db.execute(_POSTGRES_QUERY_STEMS, {"q": q}).scalar() if rows else None
+        terms = term_pattern(stems or [], prefix=True)
+
+    texts: Dict[int, Tuple[str, bytes]] = {}
+    extraction_ids = {row.extraction_id for row in rows}
+    if extraction_ids:
+        stored = db.query(
+            GuidelineExtractionText.extraction_id,
+            GuidelineExtractionText.codec,
+            GuidelineExtractionText.data,
+        ).filter(GuidelineExtractionText.extraction_id.in_(extraction_ids))
+        texts = {extraction_id: (codec, data) for extraction_id, codec, data in stored}
+    return GuidelineMatches(rows, texts, terms)
+
+
+def with_snippets(matches: GuidelineMatches) -> List[GuidelineSearchRow]:
+    """
+    The hits with highlighted snippets. Decompresses every matching text
+    once, however many documents share it: CPU work for a worker thread.
+    """
+    snippets = {
+        extraction_id: snippet(decompress_text(codec, data), matches.terms)
+        for extraction_id, (codec, data) in matches.texts.items()
+    }
+    return [
+        GuidelineSearchRow(
+            funding_program_id=row.funding_program_id,
+            funding_program_title=row.funding_program_title,
+            document_id=row.document_id,
+            file_id=row.file_id,
+            original_filename=row.original_filename,
+            rank=row.rank,
+            snippet=snippets.get(row.extraction_id, ""),
+        )
+        for row in matches.rows
+    ]
+
+
+def search_guidelines(db: Session, q: str, limit: int = 20) -> List[GuidelineSearchRow]:
+    """
+    find_guidelines() and with_snippets() in one call, for sync callers.
+    """
+    return with_snippets(find_guidelines(db, q, limit))
@@ -0,0 +1,121 @@
+"""
+Login attempt limits: a sliding window per client IP, and an exponential
+backoff on repeated failures per email.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional
+
+from starlette.requests import Request
+
+from app.config import (
+    LOGIN_EMAIL_BACKOFF_SECONDS,
+    LOGIN_EMAIL_FREE_FAILURES,
+    LOGIN_EMAIL_MAX_BACKOFF_SECONDS,
+    LOGIN_EMAIL_WINDOW_SECONDS,
+    LOGIN_IP_MAX_ATTEMPTS,
+    LOGIN_IP_WINDOW_SECONDS,
+    TRUSTED_PROXY_HOPS,
+)
+
+# Keys tracked per limiter; the least recently used are forgotten first
+MAX_TRACKED_KEYS = 100_000
+
+
+class AttemptLimiter:
+    def __init__(self, max_attempts: int, window_seconds: float):
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self._attempts: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _recent(self, key: str, now: float) -> Deque[float]:
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            attempts = deque()
+            self._attempts[key] = attempts
+            while len(self._attempts) > MAX_TRACKED_KEYS:
+                self._attempts.popitem(last=False)
+        self._attempts.move_to_end(key)
+        while attempts and attempts[0] <= now - self.window_seconds:
+            attempts.popleft()
+        return attempts
+
+    def retry_after(self, key: str) -> Optional[float]:
+        """
+        Seconds until the next attempt is allowed, or None if allowed now.
+        """
+        now = time.monotonic()
+        with self._lock:
+            attempts = self._recent(key, now)
+            if len(attempts) < self.max_attempts:
+                return None
+            return attempts[0] + self.window_seconds - now
+
+    def record(self, key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._recent(key, now).append(now)
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._attempts.pop(key, None)
+
+
+class FailureBackoff(AttemptLimiter):
+    """
+    The first `max_attempts` failures in the window are free; after that the
+    next attempt waits base_seconds after the last failure, doubling with
+    every further failure up to max_seconds.
+    """
+
+    def __init__(self, max_attempts: int, window_seconds: float, base_seconds: float, max_seconds: float):
+        super().__init__(max_attempts, window_seconds)
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+
+    def retry_after(self, key: str) -> Optional[float]:
+        now = time.monotonic()
+        with self._lock:
+            attempts = self._recent(key, now)
+            excess = len(attempts) - self.max_attempts
+            if excess < 0:
+                return None
+            wait = attempts[-1] + min(self.max_seconds, self.base_seconds * 2**excess) - now
+        return wait if wait > 0 else None
+
+
+def _forwarded_for(request: Request) -> List[str]:
+    header = ",".join(request.headers.getlist("x-forwarded-for"))
+    return [host.strip() for host in header.split(",") if host.strip()]
+
+
+def client_ip(request: Request) -> str:
+    """
+    The address login attempts are counted against. Behind TRUSTED_PROXY_HOPS
+    proxies it is the X-Forwarded-For entry the outermost of them appended;
+    entries left of it come from the client and are ignored.
+    """
+    peer = request.client.host if request.client else "unknown"
+    if TRUSTED_PROXY_HOPS <= 0:
+        return peer
+    forwarded = _forwarded_for(request)
+    if not forwarded:
+        return peer
+    return forwarded[-min(TRUSTED_PROXY_HOPS, len(forwarded))]
+
+
+# Every attempt counts per IP. Only failures count per email, and they slow
+# further attempts down instead of locking the account, so guessing a
+# user's address and failing on purpose can't lock them out
+ip_attempts = AttemptLimiter(LOGIN_IP_MAX_ATTEMPTS, LOGIN_IP_WINDOW_SECONDS)
+email_failures = FailureBackoff(
+    LOGIN_EMAIL_FREE_FAILURES,
+    LOGIN_EMAIL_WINDOW_SECONDS,
+    LOGIN_EMAIL_BACKOFF_SECONDS,
+    LOGIN_EMAIL_MAX_BACKOFF_SECONDS,
+)
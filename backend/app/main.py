@@ -1,12 +1,43 @@
-from fastapi import FastAPI
+import hmac
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, Header, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+
+from app.config import DB_PROFILING, METRICS_TOKEN
 
+from app.database import async_engine
+from app.db_profiler import QueryProfilerMiddleware
+from app.metrics import TimingMiddleware, registry
+from app.extraction.pdf_text import shutdown_extraction_pool
+from app.extraction.worker import start_extraction_workers, stop_extraction_workers
 from app.routers import auth
 from app.routers.files import router as files_router
 from app.routers import funding_programs
 from app.routers import templates
+from app.storage.supabase_client import close_supabase_client
+from app.warmup import start_warmup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_extraction_workers()
+    # Storage client and PDF parser load in the background (app/warmup.py)
+    start_warmup()
+    yield
+    stop_extraction_workers()
+    shutdown_extraction_pool()
+    close_supabase_client()
+    await async_engine.dispose()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
+
+app.add_middleware(TimingMiddleware, routes=app.routes)
+if DB_PROFILING:
+    app.add_middleware(QueryProfilerMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,6 +49,7 @@ app.add_middleware(
     ],
     allow_credentials=True,
     allow_methods=["*"],
+    expose_headers=["ETag", "Server-Timing", "X-DB-Statements", "X-DB-Time-Ms", "X-Next-Cursor"],
     allow_headers=["*"],
 )
 
@@ -26,6 +58,19 @@ app.include_router(files_router)
 app.include_router(funding_programs.router)
 app.include_router(templates.router)
 
+@app.get("/metrics", include_in_schema=False)
+def metrics(authorization: Optional[str] = Header(None)):
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not hmac.compare_digest((authorization or "").encode(), f"Bearer {METRICS_TOKEN}".encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
@@ -0,0 +1,305 @@
+"""
+Request timing and process metrics.
+
+TimingMiddleware measures every request and sends a Server-Timing header
+listing the stages that ran while handling it. Code marks stages with
+
+    with stage("storage_upload"):
+        ...
+
+which works in async endpoints and in run_blocking threads alike (the
+per-request stage list travels in a context variable). GET /metrics renders
+everything in the Prometheus text format for scrapers holding METRICS_TOKEN.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from starlette.routing import Mount
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labels, values)} {value}" for values, value in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, collect: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation)
+        self._value = 0.0
+        self._collect = collect  # read the value at scrape time instead
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.inc(-amount)
+
+    def render(self) -> List[str]:
+        value = self._collect() if self._collect else self._value
+        return self.header() + [f"{self.name} {value}"]
+
+
+class CounterFunc(_Metric):
+    """
+    A counter kept elsewhere (e.g. cache hit counts), read at scrape time.
+    """
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, collect: Callable[[], float]):
+        super().__init__(name, documentation)
+        self._collect = collect
+
+    def render(self) -> List[str]:
+        return self.header() + [f"{self.name} {self._collect()}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        # label values -> (per-bucket counts incl. +Inf, sum)
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[label_values] = series
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((values, (list(counts), total[0])) for values, (counts, total) in self._series.items())
+
+        lines = self.header()
+        for values, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _format_labels(self.labels, values, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+request_duration = registry.register(Histogram(
+    "innovo_http_request_duration_seconds",
+    "Time to handle a request, by route template",
+    labels=("method", "route", "status"),
+))
+stage_duration = registry.register(Histogram(
+    "innovo_stage_duration_seconds",
+    "Time spent in instrumented stages (hashing, storage, extraction, DB)",
+    labels=("stage",),
+))
+requests_in_flight = registry.register(Gauge(
+    "innovo_http_requests_in_flight",
+    "Requests currently being handled",
+))
+bytes_ingested = registry.register(Counter(
+    "innovo_ingested_bytes_total",
+    "Bytes received in uploads, by endpoint kind",
+    labels=("kind",),
+))
+file_dedup = registry.register(Counter(
+    "innovo_file_dedup_total",
+    "Uploaded files by whether their content was already stored",
+    labels=("result",),
+))
+
+
+def _dedup_hit_ratio() -> float:
+    hits, misses = file_dedup.value("hit"), file_dedup.value("miss")
+    return hits / (hits + misses) if hits + misses else 0.0
+
+
+registry.register(Gauge(
+    "innovo_file_dedup_hit_ratio",
+    "Share of uploaded files whose content was already stored",
+    collect=_dedup_hit_ratio,
+))
+
+
+def record_dedup(reused: bool, count: int = 1) -> None:
+    file_dedup.inc(count, "hit" if reused else "miss")
+
+
+# Stages recorded for the current request: [(name, seconds), ...]
+_request_stages: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_stages", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        stage_duration.observe(elapsed, name)
+        stages = _request_stages.get()
+        if stages is not None:
+            stages.append((name, elapsed))
+
+
+def server_timing(stages: List[Tuple[str, float]], total: float) -> str:
+    """
+    Server-Timing header value; repeated stages are summed.
+    """
+    totals: Dict[str, float] = {}
+    for name, elapsed in stages:
+        totals[name] = totals.get(name, 0.0) + elapsed
+    entries = [f"{name};dur={elapsed * 1000:.1f}" for name, elapsed in totals.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def route_templates(routes: Sequence, prefix: str = "") -> Dict[int, str]:
+    """
+    Full path template of every route, e.g. "/funding-programs/{funding_program_id}",
+    keyed by id(route). Routes of mounted apps get the mount path in front.
+    """
+    templates: Dict[int, str] = {}
+    for route in routes:
+        if isinstance(route, Mount):
+            templates.update(route_templates(route.routes, prefix + route.path))
+        elif hasattr(route, "original_router"):
+            # Newer FastAPI keeps an included router as one node instead of
+            # copying its routes with the prefix applied
+            templates.update(route_templates(route.original_router.routes, prefix + route.include_context.prefix))
+        elif getattr(route, "path", None) is not None:
+            templates[id(route)] = prefix + route.path
+    return templates
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware (streaming responses and context variables pass
+    through untouched).
+    """
+
+    def __init__(self, app, routes: Sequence = ()):
+        self.app = app
+        # The app's live route list; routers are included after the
+        # middleware is added, so the map is built on the first request
+        self.routes = routes
+        self._templates: Optional[Dict[int, str]] = None
+
+    def _route_template(self, scope) -> str:
+        """
+        Templates keep the label set small; unmatched paths share one label.
+        """
+        route = scope.get("route")
+        if route is None:
+            return "unmatched"
+        if self._templates is None or id(route) not in self._templates:
+            self._templates = route_templates(self.routes)
+        return self._templates.get(id(route), getattr(route, "path", "unmatched"))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stages: List[Tuple[str, float]] = []
+        token = _request_stages.set(stages)
+        status = ["500"]
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+                header = server_timing(stages, time.perf_counter() - started)
+                message = {**message, "headers": list(message.get("headers", [])) + [(b"server-timing", header.encode())]}
+            await send(message)
+
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            requests_in_flight.dec()
+            _request_stages.reset(token)
+            route_label = self._route_template(scope)
+            request_duration.observe(time.perf_counter() - started, scope["method"], route_label, status[0])
@@ -2,11 +2,13 @@ from datetime import datetime
 from app.database import Base
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, LargeBinary, String, Text, DateTime, ForeignKey, Index, UniqueConstraint
 
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
+from app.extraction.text_store import compress_text, decompress_text
+
 class User(Base):
     __tablename__ = "users"
 
@@ -14,6 +16,9 @@ class User(Base):
     password_hash = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Bumped whenever one of the user's templates is created, updated or deleted
+    template_version = Column(Integer, nullable=False, default=0, server_default="0")
+
 class File(Base):
     __tablename__ = "files"
 
@@ -38,6 +43,12 @@ class File(Base):
 
 class FundingProgram(Base):
     __tablename__ = "funding_programs"
+    __table_args__ = (
+        # Keyset pagination of the listing (newest first)
+        Index("ix_funding_programs_created_at_id", "created_at", "id"),
+        # max(updated_at) is the listing's ETag validator
+        Index("ix_funding_programs_updated_at", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False, index=True)
@@ -49,25 +60,133 @@ class FundingProgram(Base):
     template_ref = Column(String, nullable=False)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     documents = relationship("FundingProgramDocument", back_populates="funding_program", cascade="all, delete-orphan")
+    extraction_jobs = relationship("GuidelineExtractionJob", back_populates="funding_program", cascade="all, delete-orphan")
+    section_contexts = relationship("FundingProgramSectionContext", cascade="all, delete-orphan")
 
 
 class FundingProgramDocument(Base):
     __tablename__ = "funding_program_documents"
+    __table_args__ = (
+        # A file is attached to a program once, however often it is uploaded or extracted
+        UniqueConstraint("funding_program_id", "file_id", name="uq_funding_program_documents_program_file"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
     funding_program_id = Column(Integer, ForeignKey("funding_programs.id"), nullable=False, index=True)
     file_id = Column(UUID(as_uuid=True), ForeignKey("files.id"), nullable=False, index=True)
 
-    # Extracted rules text (from the guideline PDF)
-    extracted_text = Column(Text, nullable=False)
+    # Extracted rules text (from the guideline PDF), shared by every document with the same content
+    extraction_id = Column(Integer, ForeignKey("guideline_extractions.id"), nullable=False, index=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     funding_program = relationship("FundingProgram", back_populates="documents")
     file = relationship("File")
+    extraction = relationship("GuidelineExtraction")
+
+
+class GuidelineExtraction(Base):
+    """
+    Text extracted from one unique PDF, keyed by File.content_hash and the
+    extractor version. Each unique PDF is parsed and stored once.
+    """
+    __tablename__ = "guideline_extractions"
+    __table_args__ = (
+        UniqueConstraint("content_hash", "extractor_version", name="uq_guideline_extractions_hash_version"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(Text, nullable=False)
+    extractor_version = Column(String, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Can be megabytes: stored compressed in its own table, loaded when accessed
+    stored_text = relationship("GuidelineExtractionText", uselist=False, cascade="all, delete-orphan")
+
+    @property
+    def text(self) -> str:
+        # Decompressed once per instance
+        if "_text" not in self.__dict__:
+            self.__dict__["_text"] = decompress_text(self.stored_text.codec, self.stored_text.data)
+        return self.__dict__["_text"]
+
+    @text.setter
+    def text(self, value: str) -> None:
+        codec, data = compress_text(value)
+        self.stored_text = GuidelineExtractionText(codec=codec, raw_size=len(value.encode("utf-8")), data=data)
+        self.__dict__["_text"] = value
+
+
+class GuidelineExtractionText(Base):
+    """
+    Compressed text of one GuidelineExtraction (see app/extraction/text_store.py).
+    """
+    __tablename__ = "guideline_extraction_texts"
+
+    extraction_id = Column(Integer, ForeignKey("guideline_extractions.id", ondelete="CASCADE"), primary_key=True)
+    codec = Column(String, nullable=False)
+    # Size of the UTF-8 text before compression
+    raw_size = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+
+class FundingProgramSectionContext(Base):
+    """
+    Most relevant guideline passages for one template section of a funding
+    program, materialized by app/retrieval/section_context.py.
+    """
+    __tablename__ = "funding_program_section_contexts"
+    __table_args__ = (
+        UniqueConstraint("funding_program_id", "section_id", name="uq_section_contexts_program_section"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    funding_program_id = Column(Integer, ForeignKey("funding_programs.id"), nullable=False)
+    section_id = Column(String, nullable=False)
+
+    # JSON list of {"document_id", "passage_index", "score", "text"}
+    passages = Column(Text, nullable=False)
+
+    # Hash of the section ids/titles the passages were scored against
+    template_fingerprint = Column(String, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class GuidelineExtractionJob(Base):
+    """
+    One queued text extraction for a guideline PDF attached to a funding program.
+    The table doubles as the job queue (see app/extraction/jobs.py).
+    """
+    __tablename__ = "guideline_extraction_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    funding_program_id = Column(Integer, ForeignKey("funding_programs.id"), nullable=False, index=True)
+    file_id = Column(UUID(as_uuid=True), ForeignKey("files.id"), nullable=False)
+
+    # "queued" | "running" | "succeeded" | "failed"
+    status = Column(String, nullable=False, default="queued", index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+
+    # Set once extraction succeeded
+    document_id = Column(Integer, ForeignKey("funding_program_documents.id"), nullable=True)
+
+    # Not picked up before this time (retry backoff)
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    funding_program = relationship("FundingProgram", back_populates="extraction_jobs")
+    file = relationship("File")
 
 
 class UserTemplate(Base):
@@ -0,0 +1,47 @@
+"""
+Dedicated, bounded capacity for bcrypt.
+
+Hashing runs in worker threads of its own (PASSWORD_HASH_WORKERS at a time),
+separate from the threadpool that serves sync endpoints, so a burst of logins
+cannot starve the rest of the API. At most PASSWORD_HASH_QUEUE_SIZE calls
+wait for a worker; beyond that callers are turned away immediately.
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import Any, Callable, Optional, TypeVar
+
+from anyio import CapacityLimiter, to_thread
+
+from app.config import PASSWORD_HASH_QUEUE_SIZE, PASSWORD_HASH_WORKERS
+
+T = TypeVar("T")
+
+_limiter: Optional[CapacityLimiter] = None
+_pending = 0  # running + waiting; only touched from the event loop
+
+
+class PasswordHashingBusy(Exception):
+    """
+    All hashing workers are busy and the wait queue is full.
+    """
+
+
+def _get_limiter() -> CapacityLimiter:
+    global _limiter
+    if _limiter is None:
+        _limiter = CapacityLimiter(PASSWORD_HASH_WORKERS)
+    return _limiter
+
+
+async def run_password_hashing(func: Callable[..., T], *args: Any) -> T:
+    global _pending
+    if _pending >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE:
+        raise PasswordHashingBusy()
+
+    _pending += 1
+    try:
+        return await to_thread.run_sync(functools.partial(func, *args), limiter=_get_limiter())
+    finally:
+        _pending -= 1
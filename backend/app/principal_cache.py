@@ -0,0 +1,98 @@
+"""
+Cache of authenticated users keyed by access token.
+
+get_current_user verifies the JWT on every request anyway; the cache only
+saves the users lookup that follows. Entries expire after
+PRINCIPAL_CACHE_TTL_SECONDS (never later than the token itself) and are
+dropped as soon as the user's password changes or the user is deleted.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import attributes
+
+from app.config import PRINCIPAL_CACHE_MAX_ENTRIES, PRINCIPAL_CACHE_TTL_SECONDS
+from app.metrics import CounterFunc, registry
+from app.models import User
+
+
+class PrincipalCache:
+    def __init__(self, max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES, ttl_seconds: float = PRINCIPAL_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()  # token -> (expires at, user)
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token: str, user: User, token_expires_at: Optional[float] = None) -> None:
+        """
+        token_expires_at is the token's "exp" claim (unix time).
+        """
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[token] = (time.monotonic() + ttl, user)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, email: str) -> None:
+        with self._lock:
+            for token in [t for t, (_, user) in self._entries.items() if user.email == email]:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+principal_cache = PrincipalCache()
+
+registry.register(CounterFunc(
+    "innovo_principal_cache_hits_total",
+    "Authenticated requests served without a users lookup",
+    lambda: principal_cache.hits,
+))
+registry.register(CounterFunc(
+    "innovo_principal_cache_misses_total",
+    "Authenticated requests that looked the user up",
+    lambda: principal_cache.misses,
+))
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target: User) -> None:
+    if attributes.get_history(target, "password_hash").has_changes():
+        principal_cache.invalidate_user(target.email)
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target: User) -> None:
+    principal_cache.invalidate_user(target.email)
@@ -0,0 +1,213 @@
+"""
+In-process BM25 passage index per funding program.
+
+Each funding program gets an inverted index over the passages of its
+guideline documents. Indexes are built on first query and kept up to date
+incrementally: new documents are added (by the extraction worker, or when a
+query notices them) without re-indexing the others.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import PASSAGE_INDEX_MAX_PROGRAMS
+from app.extraction.text_store import decompress_text
+from app.models import FundingProgramDocument, GuidelineExtractionText
+from app.retrieval.passages import split_passages
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Frequent German function words; they carry no signal for guideline retrieval
+STOPWORDS = frozenset(
+    """
+    aber als am an auch auf aus bei bis da dadurch daher damit dann das dass dem den der des die dies diese
+    dieser dieses doch dort durch ein eine einem einen einer eines es für gegen hat hier im in ist jedoch
+    kann kein keine mit muss nach nicht noch nur ob oder ohne sich sie sind so sowie über um und uns unter
+    vom von vor während was wenn werden wie wird wo zu zum zur zwischen
+    """.split()
+)
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    # Single digits are kept: section numbers like "2.3" are common queries
+    return [
+        word
+        for word in _WORD.findall(text.lower())
+        if (len(word) > 1 or word.isdigit()) and word not in STOPWORDS
+    ]
+
+
+@dataclass(frozen=True)
+class Passage:
+    document_id: int
+    ordinal: int  # position within the document
+    text: str
+    length: int  # number of tokens
+
+
+class PassageIndex:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._passages: Dict[int, Passage] = {}
+        self._postings: Dict[str, Dict[int, int]] = {}  # term -> {passage id: term frequency}
+        self._document_passages: Dict[int, List[int]] = {}
+        self._next_id = 0
+        self._total_length = 0
+        self._norms: Optional[Dict[int, float]] = None  # length normalisation, rebuilt after changes
+
+    @property
+    def document_ids(self) -> Set[int]:
+        with self._lock:
+            return set(self._document_passages)
+
+    def __len__(self) -> int:
+        return len(self._passages)
+
+    def add_document(self, document_id: int, text: str) -> None:
+        with self._lock:
+            if document_id in self._document_passages:
+                return
+
+            passage_ids = []
+            for ordinal, passage_text in enumerate(split_passages(text)):
+                tokens = tokenize(passage_text)
+                if not tokens:
+                    continue
+
+                passage_id = self._next_id
+                self._next_id += 1
+                self._passages[passage_id] = Passage(document_id, ordinal, passage_text, len(tokens))
+                self._total_length += len(tokens)
+                for term, tf in Counter(tokens).items():
+                    self._postings.setdefault(term, {})[passage_id] = tf
+                passage_ids.append(passage_id)
+
+            self._document_passages[document_id] = passage_ids
+            self._norms = None
+
+    def remove_document(self, document_id: int) -> None:
+        with self._lock:
+            for passage_id in self._document_passages.pop(document_id, []):
+                passage = self._passages.pop(passage_id)
+                self._total_length -= passage.length
+                for term in set(tokenize(passage.text)):
+                    postings = self._postings.get(term)
+                    if postings is not None:
+                        postings.pop(passage_id, None)
+                        if not postings:
+                            del self._postings[term]
+            self._norms = None
+
+    def _length_norms(self) -> Dict[int, float]:
+        if self._norms is None:
+            avg_length = self._total_length / len(self._passages)
+            self._norms = {
+                passage_id: BM25_K1 * (1 - BM25_B + BM25_B * passage.length / avg_length)
+                for passage_id, passage in self._passages.items()
+            }
+        return self._norms
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[float, Passage]]:
+        """
+        Top-k passages by BM25 score, best first.
+        """
+        with self._lock:
+            if not self._passages:
+                return []
+
+            norms = self._length_norms()
+            total = len(self._passages)
+            scores: Dict[int, float] = {}
+
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                weight = (BM25_K1 + 1) * math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                score_of = scores.get
+                for passage_id, tf in postings.items():
+                    scores[passage_id] = score_of(passage_id, 0.0) + weight * tf / (tf + norms[passage_id])
+
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [(score, self._passages[passage_id]) for passage_id, score in top]
+
+
+class PassageIndexRegistry:
+    """
+    One PassageIndex per funding program, least recently used evicted first.
+    """
+
+    def __init__(self, max_programs: int = PASSAGE_INDEX_MAX_PROGRAMS):
+        self.max_programs = max_programs
+        self._indexes: "OrderedDict[int, PassageIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, funding_program_id: int) -> PassageIndex:
+        with self._lock:
+            index = self._indexes.get(funding_program_id)
+            if index is None:
+                index = PassageIndex()
+                self._indexes[funding_program_id] = index
+                while len(self._indexes) > self.max_programs:
+                    self._indexes.popitem(last=False)
+            self._indexes.move_to_end(funding_program_id)
+            return index
+
+    def get_index(self, db: Session, funding_program_id: int) -> PassageIndex:
+        """
+        The program's index, synced with its current documents. Only the
+        document ids are queried when nothing changed; text is loaded for
+        new documents only.
+        """
+        index = self._get_or_create(funding_program_id)
+
+        current_ids = {
+            doc_id
+            for (doc_id,) in db.query(FundingProgramDocument.id).filter(
+                FundingProgramDocument.funding_program_id == funding_program_id
+            )
+        }
+        indexed_ids = index.document_ids
+
+        for removed_id in indexed_ids - current_ids:
+            index.remove_document(removed_id)
+
+        new_ids = current_ids - indexed_ids
+        if new_ids:
+            rows = (
+                db.query(FundingProgramDocument.id, GuidelineExtractionText.codec, GuidelineExtractionText.data)
+                .join(
+                    GuidelineExtractionText,
+                    GuidelineExtractionText.extraction_id == FundingProgramDocument.extraction_id,
+                )
+                .filter(FundingProgramDocument.id.in_(new_ids))
+                .order_by(FundingProgramDocument.id)
+            )
+            for doc_id, codec, data in rows:
+                index.add_document(doc_id, decompress_text(codec, data))
+
+        return index
+
+    def add_document(self, funding_program_id: int, document_id: int, text: str) -> None:
+        """
+        Index a newly ingested document, if its program's index is loaded.
+        """
+        with self._lock:
+            index = self._indexes.get(funding_program_id)
+        if index is not None:
+            index.add_document(document_id, text)
+
+
+passage_indexes = PassageIndexRegistry()
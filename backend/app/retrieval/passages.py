@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import re
+from typing import List
+
+PASSAGE_MAX_CHARS = 1200
+PASSAGE_MIN_CHARS = 200
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+")
+
+
+def _split_long(paragraph: str, max_chars: int) -> List[str]:
+    # Break an overlong paragraph at sentence ends, hard-wrapping run-on text
+    pieces: list[str] = []
+    current = ""
+    for sentence in _SENTENCE_END.split(paragraph):
+        while len(sentence) > max_chars:
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_passages(
+    text: str,
+    max_chars: int = PASSAGE_MAX_CHARS,
+    min_chars: int = PASSAGE_MIN_CHARS,
+) -> List[str]:
+    """
+    Split extracted guideline text into retrieval passages.
+    Paragraphs are kept together where possible; short ones (headings,
+    list items) are merged with what follows, long ones are split at
+    sentence boundaries.
+    """
+    passages: list[str] = []
+    current = ""
+
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+
+        for piece in _split_long(paragraph, max_chars):
+            if current and len(current) + 1 + len(piece) > max_chars:
+                passages.append(current)
+                current = piece
+            else:
+                current = f"{current}\n{piece}" if current else piece
+
+            if len(current) >= min_chars:
+                passages.append(current)
+                current = ""
+
+    if current:
+        passages.append(current)
+    return passages
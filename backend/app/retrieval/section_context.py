@@ -0,0 +1,149 @@
+"""
+Per-section guideline context for funding programs.
+
+For every section of a program's template, the best matching guideline
+passages (BM25 against the section title) are materialized into
+funding_program_section_contexts. The rows are dropped whenever a
+FundingProgramDocument is added or removed, and recomputed when the
+template's sections no longer match the stored fingerprint.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, event, insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import SECTION_CONTEXT_PASSAGES
+from app.models import FundingProgram, FundingProgramDocument, FundingProgramSectionContext
+from app.retrieval.bm25 import passage_indexes
+from app.template_resolver import resolve_template_for_funding_program
+
+_SECTION_NUMBER = re.compile(r"^\s*\d+(\.\d+)*\.?\s*")
+
+
+def template_fingerprint(template: Dict[str, Any]) -> str:
+    sections = [[section["id"], section["title"]] for section in template["sections"]]
+    return hashlib.sha256(json.dumps(sections).encode("utf-8")).hexdigest()
+
+
+def section_query(title: str) -> str:
+    # "2.3. Zielsetzung" -> "Zielsetzung"; the numbering only matches noise
+    return _SECTION_NUMBER.sub("", title)
+
+
+def invalidate_section_contexts(connection: Connection, funding_program_id: int) -> None:
+    connection.execute(
+        delete(FundingProgramSectionContext.__table__).where(
+            FundingProgramSectionContext.__table__.c.funding_program_id == funding_program_id
+        )
+    )
+
+
+@event.listens_for(FundingProgramDocument, "after_insert")
+@event.listens_for(FundingProgramDocument, "after_delete")
+def _document_changed(mapper, connection: Connection, target: FundingProgramDocument) -> None:
+    invalidate_section_contexts(connection, target.funding_program_id)
+
+
+def materialize_section_contexts(
+    db: Session,
+    funding_program: FundingProgram,
+    template: Dict[str, Any],
+) -> Dict[str, List[dict]]:
+    """
+    Score every section title against the program's passage index and
+    replace the stored contexts. Commits.
+    """
+    index = passage_indexes.get_index(db, funding_program.id)
+    contexts = {
+        section["id"]: [
+            {
+                "document_id": passage.document_id,
+                "passage_index": passage.ordinal,
+                "score": score,
+                "text": passage.text,
+            }
+            for score, passage in index.search(section_query(section["title"]), SECTION_CONTEXT_PASSAGES)
+        ]
+        for section in template["sections"]
+    }
+
+    fingerprint = template_fingerprint(template)
+    invalidate_section_contexts(db.connection(), funding_program.id)
+    if contexts:
+        db.execute(
+            insert(FundingProgramSectionContext.__table__),
+            [
+                {
+                    "funding_program_id": funding_program.id,
+                    "section_id": section_id,
+                    "passages": json.dumps(passages),
+                    "template_fingerprint": fingerprint,
+                }
+                for section_id, passages in contexts.items()
+            ],
+        )
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent materialization stored the same result first
+        db.rollback()
+    return contexts
+
+
+def refresh_section_contexts(db: Session, funding_program_id: int) -> None:
+    """
+    Rematerialize after the program's guidelines changed.
+    """
+    funding_program = db.query(FundingProgram).filter(FundingProgram.id == funding_program_id).first()
+    if funding_program:
+        template = resolve_template_for_funding_program(db, funding_program)
+        materialize_section_contexts(db, funding_program, template)
+
+
+def get_section_contexts(
+    db: Session,
+    funding_program: FundingProgram,
+    template: Dict[str, Any],
+) -> Dict[str, List[dict]]:
+    """
+    Stored contexts by section id, materialized first if missing or stale.
+    """
+    fingerprint = template_fingerprint(template)
+    rows = (
+        db.query(
+            FundingProgramSectionContext.section_id,
+            FundingProgramSectionContext.passages,
+            FundingProgramSectionContext.template_fingerprint,
+        )
+        .filter(FundingProgramSectionContext.funding_program_id == funding_program.id)
+        .all()
+    )
+    section_ids = {section["id"] for section in template["sections"]}
+    if {row.section_id for row in rows} != section_ids or any(row.template_fingerprint != fingerprint for row in rows):
+        return materialize_section_contexts(db, funding_program, template)
+
+    return {row.section_id: json.loads(row.passages) for row in rows}
+
+
+def resolve_template_with_context(db: Session, funding_program: FundingProgram) -> Dict[str, Any]:
+    """
+    The program's resolved template, each section carrying its
+    "guideline_context" passages.
+    """
+    template = resolve_template_for_funding_program(db, funding_program)
+    contexts = get_section_contexts(db, funding_program, template)
+    return {
+        **template,
+        "sections": [
+            {**section, "guideline_context": contexts.get(section["id"], [])}
+            for section in template["sections"]
+        ],
+    }
@@ -1,27 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas import UserLogin, UserCreate, TokenResponse
 from app.models import User
-from app.utils import hash_password, verify_password
+from app.utils import hash_password, password_needs_rehash, verify_password
 from app.jwt_utils import create_access_token
-from app.dependencies import get_db
+from app.dependencies import get_async_db
+from app.login_throttle import client_ip, email_failures, ip_attempts
+from app.password_hashing import PasswordHashingBusy, run_password_hashing
 
 router = APIRouter(tags=["auth"])
 
 
+def _too_many_requests(detail: str, retry_after: float = 1) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
 
 @router.post("/login", response_model=TokenResponse)
-def login(user: UserLogin, db: Session = Depends(get_db)):
+async def login(user: UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
     email = user.email.lower()
+    ip = client_ip(request)
+
+    for limiter, key in ((ip_attempts, ip), (email_failures, email)):
+        wait = limiter.retry_after(key)
+        if wait is not None:
+            raise _too_many_requests("Too many login attempts. Try again later.", wait)
+    ip_attempts.record(ip)
 
-    db_user = db.query(User).filter(User.email == email).first()
+    db_user = (await db.execute(select(User).where(User.email == email))).scalars().first()
 
-    if not db_user or not verify_password(user.password, db_user.password_hash):
+    try:
+        valid = db_user is not None and await run_password_hashing(
+            verify_password, user.password, db_user.password_hash
+        )
+    except PasswordHashingBusy:
+        raise _too_many_requests("Server busy. Try again shortly.")
+
+    if not valid:
+        email_failures.record(email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
+    email_failures.reset(email)
+
+    # BCRYPT_ROUNDS changed since this hash was made: upgrade it while we have the password
+    if password_needs_rehash(db_user.password_hash):
+        try:
+            db_user.password_hash = await run_password_hashing(hash_password, user.password)
+            await db.commit()
+        except PasswordHashingBusy:
+            pass  # upgraded on a later login
 
     access_token = create_access_token({"email": db_user.email})
 
@@ -34,7 +70,7 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/register")
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     email = user.email.lower()
 
     if not (email.endswith("@innovo-consulting.de") or email.endswith("@aiio.de")):
@@ -43,14 +79,17 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
             detail="Invalid email domain",
         )
 
-    existing_user = db.query(User).filter(User.email == email).first()
+    existing_user = (await db.execute(select(User).where(User.email == email))).scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User already exists",
         )
 
-    hashed_password = hash_password(user.password)
+    try:
+        hashed_password = await run_password_hashing(hash_password, user.password)
+    except PasswordHashingBusy:
+        raise _too_many_requests("Server busy. Try again shortly.")
 
     new_user = User(
         email=email,
@@ -58,6 +97,6 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_user)
-    db.commit()
+    await db.commit()
 
     return {"success": True, "message": "User registered successfully"}
@@ -1,31 +1,41 @@
-from fastapi import APIRouter, Depends, File, UploadFile
-from sqlalchemy.orm import Session
+import re
 
-from app.dependencies import get_db, get_current_user
-from app.models import User
-from app.schemas import FileUploadResponse
-from app.storage.file_service import get_or_create_file
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dependencies import get_async_db, get_current_user
+from app.metrics import bytes_ingested
+from app.models import File as FileModel, User
+from app.schemas import FileLookupMatch, FileLookupRequest, FileLookupResponse, FileUploadResponse
+from app.storage.file_service import get_or_create_file_from_stream_async
+from app.storage.upload_stream import spool_upload
 
 router = APIRouter(prefix="/files", tags=["files"])
 
+SHA256_HEX = re.compile(r"^[0-9a-f]{64}$")
+
 
 @router.post("/upload", response_model=FileUploadResponse)
 async def upload_file(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Protected global file upload endpoint.
+    The upload is streamed to a temp file, so memory stays flat for large recordings.
     """
-    file_bytes = await file.read()
-
-    file_obj, is_new = get_or_create_file(
-        db=db,
-        file_bytes=file_bytes,
-        mime_type=file.content_type or "application/octet-stream",
-        original_filename=file.filename,
-    )
+    with await spool_upload(file) as spooled:
+        bytes_ingested.inc(spooled.size_bytes, "file")
+        file_obj, is_new = await get_or_create_file_from_stream_async(
+            db=db,
+            stream=spooled.file,
+            content_hash=spooled.content_hash,
+            size_bytes=spooled.size_bytes,
+            mime_type=file.content_type or "application/octet-stream",
+            original_filename=file.filename,
+        )
 
     return FileUploadResponse(
         file_id=file_obj.id,
@@ -37,3 +47,31 @@ async def upload_file(
         original_filename=file_obj.original_filename,
         reused=not is_new,
     )
+
+
+@router.post("/lookup", response_model=FileLookupResponse)
+async def lookup_files(
+    payload: FileLookupRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Hash-first dedup probe.
+    Clients hash locally and only upload the hashes reported as missing.
+    """
+    hashes = list(dict.fromkeys(h.strip().lower() for h in payload.hashes))
+    invalid = [h for h in hashes if not SHA256_HEX.match(h)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid SHA-256 hash: {invalid[0]}")
+
+    rows = (
+        await db.execute(
+            select(FileModel.content_hash, FileModel.id).where(FileModel.content_hash.in_(hashes))
+        )
+    ).all()
+    found = {content_hash: file_id for content_hash, file_id in rows}
+
+    return FileLookupResponse(
+        existing=[FileLookupMatch(content_hash=h, file_id=found[h]) for h in hashes if h in found],
+        missing=[h for h in hashes if h not in found],
+    )
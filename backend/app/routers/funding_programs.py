@@ -1,22 +1,52 @@
 from __future__ import annotations
 
-from typing import List
-from fastapi import APIRouter, Depends, UploadFile, File as FastAPIFile, HTTPException
-from sqlalchemy.orm import Session
+import asyncio
+import base64
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, UploadFile, File as FastAPIFile, Header, HTTPException, Query, Response
+from sqlalchemy import func, select, tuple_
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from app.dependencies import get_db, get_current_user
-from app.models import User, FundingProgram, FundingProgramDocument
-from app.schemas import FundingProgramCreate, FundingProgramResponse, FundingProgramDocumentResponse
-from app.storage.file_service import get_or_create_file
-from app.extraction.pdf_text import extract_text_from_pdf_bytes
+from app.concurrency import run_blocking
+from app.config import GUIDELINE_MAX_BYTES, GUIDELINE_MAX_FILES
+from app.dependencies import get_async_db, get_db, get_current_user
+from app.models import User, FundingProgram, FundingProgramDocument, GuidelineExtractionJob, GuidelineExtractionText
+from app.schemas import (
+    FundingProgramCreate,
+    FundingProgramDocumentResponse,
+    FundingProgramResponse,
+    GuidelineExtractionJobResponse,
+    GuidelinePassageHit,
+    GuidelineSearchHit,
+    ResolvedTemplateResponse,
+)
+from app.guideline_search import find_guidelines, with_snippets
+from app.metrics import bytes_ingested, record_dedup, stage
+from app.retrieval.bm25 import passage_indexes
+from app.retrieval.section_context import resolve_template_with_context
+from app.storage.file_service import find_files_by_hash, insert_files, store_file_content
+from app.storage.upload_stream import SpooledUpload, spool_upload
+from app.extraction.jobs import JOB_FAILED, attach_guidelines, retry_job
+from app.extraction.text_store import iter_decompressed
+from app.extraction.worker import notify_extraction_workers
 
 router = APIRouter(prefix="/funding-programs", tags=["funding-programs"])
 
+# Page size of the listing when only a cursor is given
+LIST_PAGE_SIZE = 100
+
+# Bytes per chunk when streaming extracted text
+TEXT_STREAM_CHUNK_BYTES = 64 * 1024
+
 
 @router.post("", response_model=FundingProgramResponse)
-def create_funding_program(
+async def create_funding_program(
     payload: FundingProgramCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     # Global funding programs: do NOT filter by user
@@ -26,68 +56,404 @@ def create_funding_program(
         template_ref=payload.template_ref,
     )
     db.add(fp)
-    db.commit()
-    db.refresh(fp)
+    await db.commit()
+    await db.refresh(fp)
     return fp
 
 
+def _encode_cursor(created_at: datetime, funding_program_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{funding_program_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, funding_program_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(funding_program_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
+
+
 @router.get("", response_model=List[FundingProgramResponse])
-def list_funding_programs(
-    db: Session = Depends(get_db),
+async def list_funding_programs(
+    response: Response,
+    limit: Optional[int] = Query(
+        None, ge=1, le=500, description="Page size; without limit and cursor all programs are returned"
+    ),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    title_prefix: Optional[str] = Query(None, min_length=1, max_length=200),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Newest first. With `limit` (or a cursor) keyset-paginated on
+    (created_at, id): the next page's cursor is returned in the X-Next-Cursor
+    header (absent on the last page).
+    """
+    if cursor and limit is None:
+        limit = LIST_PAGE_SIZE
+
+    # Every insert or update moves max(updated_at) and every delete the count;
+    # both come from one query, checked before the page query is run
+    count, last_change = (
+        await db.execute(select(func.count(), func.max(FundingProgram.updated_at)).select_from(FundingProgram))
+    ).one()
+    validator = f"{count}:{last_change}:{limit}:{cursor}:{title_prefix}"
+    etag = f'W/"{hashlib.sha256(validator.encode()).hexdigest()[:32]}"'
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    query = select(
+        FundingProgram.id,
+        FundingProgram.title,
+        FundingProgram.template_source,
+        FundingProgram.template_ref,
+        FundingProgram.created_at,
+    )
+    if title_prefix:
+        query = query.where(FundingProgram.title.startswith(title_prefix, autoescape=True))
+    if cursor:
+        query = query.where(tuple_(FundingProgram.created_at, FundingProgram.id) < _decode_cursor(cursor))
+
+    query = query.order_by(FundingProgram.created_at.desc(), FundingProgram.id.desc())
+    if limit is not None:
+        # One extra row tells whether there is a next page
+        query = query.limit(limit + 1)
+    rows = (await db.execute(query)).all()
+
+    response.headers["ETag"] = etag
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return [
+        FundingProgramResponse(
+            id=row.id,
+            title=row.title,
+            template_source=row.template_source,
+            template_ref=row.template_ref,
+        )
+        for row in rows
+    ]
+
+
+@router.get("/search", response_model=List[GuidelineSearchHit])
+async def search_funding_program_guidelines(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    # Global view for internal users
-    return db.query(FundingProgram).order_by(FundingProgram.created_at.desc()).all()
+    """
+    Full-text search over all guideline documents, best matches first.
+    """
+    with stage("search"):
+        matches = await db.run_sync(find_guidelines, q, limit)
+        # Decompressing the hits and cutting snippets is CPU work: keep it off the event loop
+        rows = await run_blocking(with_snippets, matches)
+    return [
+        GuidelineSearchHit(
+            funding_program_id=row.funding_program_id,
+            funding_program_title=row.funding_program_title,
+            document_id=row.document_id,
+            file_id=row.file_id,
+            original_filename=row.original_filename,
+            rank=row.rank,
+            snippet=row.snippet,
+        )
+        for row in rows
+    ]
 
 
-@router.post("/{funding_program_id}/guidelines/upload", response_model=List[FundingProgramDocumentResponse])
+@router.post(
+    "/{funding_program_id}/guidelines/upload",
+    response_model=List[GuidelineExtractionJobResponse],
+    status_code=202,
+)
 async def upload_guidelines(
     funding_program_id: int,
     files: List[UploadFile] = FastAPIFile(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Store a batch of guideline PDFs and queue their text extraction.
+
+    The batch is all-or-nothing: every file is validated before anything is
+    stored, new content goes to storage concurrently, and all rows are written
+    in one transaction. Returns right away with one job per file; poll
+    /guidelines/jobs for progress.
+    """
+    if len(files) > GUIDELINE_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {GUIDELINE_MAX_FILES} files per upload")
+    for upload in files:
+        if upload.content_type != "application/pdf":
+            raise HTTPException(status_code=400, detail=f"Only PDF allowed. Got: {upload.content_type}")
+        if upload.size is not None and upload.size > GUIDELINE_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"File too large: {upload.filename}")
+
+    fp = await db.get(FundingProgram, funding_program_id)
+    if not fp:
+        raise HTTPException(status_code=404, detail="Funding program not found")
+
+    spooled: list[SpooledUpload] = []
+    try:
+        for upload in files:
+            spooled.append(await spool_upload(upload))
+            if spooled[-1].size_bytes == 0:
+                raise HTTPException(status_code=400, detail=f"Empty file: {upload.filename}")
+            if spooled[-1].size_bytes > GUIDELINE_MAX_BYTES:
+                raise HTTPException(status_code=413, detail=f"File too large: {upload.filename}")
+
+        bytes_ingested.inc(sum(s.size_bytes for s in spooled), "guideline")
+        with stage("db_lookup"):
+            existing = await db.run_sync(find_files_by_hash, [s.content_hash for s in spooled])
+
+        # spine rule: content is stored once per hash, under its content-addressed path
+        new_content: Dict[str, Tuple[SpooledUpload, Optional[str]]] = {}
+        for upload, spool in zip(files, spooled):
+            if spool.content_hash not in existing:
+                new_content.setdefault(spool.content_hash, (spool, upload.filename))
+        record_dedup(True, len(spooled) - len(new_content))
+        record_dedup(False, len(new_content))
+
+        await _store_new_content(new_content)
+
+        with stage("db_write"):
+            jobs = await db.run_sync(_record_guidelines, funding_program_id, spooled, new_content)
+    finally:
+        for spool in spooled:
+            spool.close()
+
+    notify_extraction_workers()
+    return jobs
+
+
+async def _store_new_content(new_content: Dict[str, Tuple[SpooledUpload, Optional[str]]]) -> None:
+    """
+    Store the new files concurrently and raise the first failure once all
+    have finished. The stores read the spools from worker threads that can't
+    be interrupted, so this only returns (or passes on a cancellation) when
+    none of them is still running and the spools are safe to close.
+    """
+    stores = [
+        asyncio.ensure_future(run_blocking(store_file_content, spool.file, content_hash, "application/pdf"))
+        for content_hash, (spool, _filename) in new_content.items()
+    ]
+    if not stores:
+        return
+    try:
+        await asyncio.wait(stores)
+    except asyncio.CancelledError:
+        await asyncio.wait(stores)
+        raise
+    for store in stores:
+        if store.exception() is not None:
+            raise store.exception()
+
+
+def _record_guidelines(
+    db: Session,
+    funding_program_id: int,
+    spooled: List[SpooledUpload],
+    new_content: Dict[str, Tuple[SpooledUpload, Optional[str]]],
+) -> List[GuidelineExtractionJobResponse]:
+    """
+    Write File rows, documents for already-extracted content and jobs in one
+    transaction (one INSERT per table).
+    """
+    insert_files(
+        db,
+        [
+            {
+                "content_hash": content_hash,
+                "size_bytes": spool.size_bytes,
+                "mime_type": "application/pdf",
+                "original_filename": filename,
+            }
+            for content_hash, (spool, filename) in new_content.items()
+        ],
+    )
+    files_by_hash = find_files_by_hash(db, [s.content_hash for s in spooled])
+
+    rows = attach_guidelines(db, funding_program_id, [files_by_hash[s.content_hash] for s in spooled])
+    db.commit()
+
+    return [
+        GuidelineExtractionJobResponse(
+            id=row.id,
+            funding_program_id=row.funding_program_id,
+            file_id=row.file_id,
+            status=row.status,
+            attempts=row.attempts,
+            error=row.error,
+            document_id=row.document_id,
+        )
+        for row in rows
+    ]
+
+
+@router.get("/{funding_program_id}/passages", response_model=List[GuidelinePassageHit])
+def search_guideline_passages(
+    funding_program_id: int,
+    q: str = Query(..., min_length=2, max_length=500),
+    k: int = Query(5, ge=1, le=50),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    """
+    Top-k guideline passages of one funding program for a query (BM25).
+    Stays on the sync session: building an index is CPU-bound, so the
+    endpoint runs in the threadpool rather than on the event loop.
+    """
+    exists = db.query(FundingProgram.id).filter(FundingProgram.id == funding_program_id).first()
+    if not exists:
+        raise HTTPException(status_code=404, detail="Funding program not found")
+
+    with stage("passage_search"):
+        hits = passage_indexes.get_index(db, funding_program_id).search(q, k)
+    return [
+        GuidelinePassageHit(
+            document_id=passage.document_id,
+            passage_index=passage.ordinal,
+            score=score,
+            text=passage.text,
+        )
+        for score, passage in hits
+    ]
+
+
+@router.get("/{funding_program_id}/template", response_model=ResolvedTemplateResponse)
+def get_funding_program_template(
+    funding_program_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    The program's template with the most relevant guideline passages per section.
+    Sync (threadpool) like /passages: materializing contexts scores every section.
+    """
     fp = db.query(FundingProgram).filter(FundingProgram.id == funding_program_id).first()
     if not fp:
         raise HTTPException(status_code=404, detail="Funding program not found")
 
-    responses: list[FundingProgramDocumentResponse] = []
+    template = resolve_template_with_context(db, fp)
+    return ResolvedTemplateResponse(
+        funding_program_id=fp.id,
+        template_source=fp.template_source,
+        template_ref=fp.template_ref,
+        sections=template["sections"],
+    )
 
-    for upload in files:
-        if upload.content_type != "application/pdf":
-            raise HTTPException(status_code=400, detail=f"Only PDF allowed. Got: {upload.content_type}")
 
-        pdf_bytes = await upload.read()
+@router.get("/{funding_program_id}/documents", response_model=List[FundingProgramDocumentResponse])
+async def list_funding_program_documents(
+    funding_program_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Guideline documents with their file metadata; the extracted text is not loaded.
+    """
+    docs = (
+        await db.execute(
+            select(FundingProgramDocument)
+            .where(FundingProgramDocument.funding_program_id == funding_program_id)
+            .options(selectinload(FundingProgramDocument.file))
+            .order_by(FundingProgramDocument.id)
+        )
+    ).scalars().all()
+    return [
+        FundingProgramDocumentResponse(
+            id=doc.id,
+            funding_program_id=doc.funding_program_id,
+            file_id=doc.file_id,
+            storage_path=doc.file.storage_path,
+            size_bytes=doc.file.size_bytes,
+            original_filename=doc.file.original_filename,
+        )
+        for doc in docs
+    ]
 
-        # spine rule: always go through get_or_create_file()
-        file_obj, _is_new = get_or_create_file(
-            db=db,
-            file_bytes=pdf_bytes,
-            mime_type=upload.content_type or "application/pdf",
-            original_filename=upload.filename,
+
+@router.get("/{funding_program_id}/documents/{document_id}/text")
+async def stream_funding_program_document_text(
+    funding_program_id: int,
+    document_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    The document's extracted text as text/plain, decompressed chunk by chunk
+    as it is sent.
+    """
+    stored = (
+        await db.execute(
+            select(GuidelineExtractionText.codec, GuidelineExtractionText.data, GuidelineExtractionText.raw_size)
+            .join(FundingProgramDocument, FundingProgramDocument.extraction_id == GuidelineExtractionText.extraction_id)
+            .where(
+                FundingProgramDocument.id == document_id,
+                FundingProgramDocument.funding_program_id == funding_program_id,
+            )
         )
+    ).first()
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    return StreamingResponse(
+        iter_decompressed(stored.codec, stored.data, TEXT_STREAM_CHUNK_BYTES),
+        media_type="text/plain; charset=utf-8",
+        headers={"Content-Length": str(stored.raw_size)},
+    )
 
-        extracted_text = extract_text_from_pdf_bytes(pdf_bytes)
-        if not extracted_text.strip():
-            raise HTTPException(status_code=400, detail=f"Could not extract text from PDF: {upload.filename}")
 
-        doc = FundingProgramDocument(
-            funding_program_id=fp.id,
-            file_id=file_obj.id,
-            extracted_text=extracted_text,
+@router.get("/{funding_program_id}/guidelines/jobs", response_model=List[GuidelineExtractionJobResponse])
+async def list_guideline_jobs(
+    funding_program_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    return (
+        await db.execute(
+            select(GuidelineExtractionJob)
+            .where(GuidelineExtractionJob.funding_program_id == funding_program_id)
+            .order_by(GuidelineExtractionJob.id)
         )
-        db.add(doc)
-        db.commit()
-        db.refresh(doc)
-
-        responses.append(
-            FundingProgramDocumentResponse(
-                id=doc.id,
-                funding_program_id=doc.funding_program_id,
-                file_id=file_obj.id,
-                storage_path=file_obj.storage_path,
-                size_bytes=file_obj.size_bytes,
+    ).scalars().all()
+
+
+@router.post(
+    "/{funding_program_id}/guidelines/jobs/{job_id}/retry",
+    response_model=GuidelineExtractionJobResponse,
+)
+async def retry_guideline_job(
+    funding_program_id: int,
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    job = (
+        await db.execute(
+            select(GuidelineExtractionJob).where(
+                GuidelineExtractionJob.id == job_id,
+                GuidelineExtractionJob.funding_program_id == funding_program_id,
             )
         )
+    ).scalars().first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Extraction job not found")
+    if job.status != JOB_FAILED:
+        raise HTTPException(status_code=409, detail=f"Only failed jobs can be retried. Job is {job.status}")
 
-    return responses
+    await db.run_sync(retry_job, job)
+    await db.refresh(job)
+    notify_extraction_workers()
+    return job
@@ -1,22 +1,30 @@
 import json
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db, get_current_user
-from app.models import User, UserTemplate
+from app.dependencies import get_async_db, get_current_user
+from app.models import FundingProgram, User, UserTemplate
 from app.schemas import (
+    FundingProgramTemplateRef,
+    TemplateResolveBatchRequest,
+    TemplateResolveBatchResponse,
     UserTemplateCreate,
     UserTemplateUpdate,
     UserTemplateResponse,
 )
-from app.templates.system_templates import SYSTEM_TEMPLATES
+from app.templates.list_cache import SYSTEM_TEMPLATE_LIST, template_list_cache
+from app.templates.template_cache import FROZEN_SYSTEM_TEMPLATES, copy_template, get_user_templates
 
 router = APIRouter(prefix="/templates", tags=["templates"])
+
 @router.post("/user", response_model=UserTemplateResponse, status_code=201)
-def create_user_template(
+async def create_user_template(
     payload: UserTemplateCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     if not payload.sections:
@@ -30,37 +38,168 @@ def create_user_template(
     )
 
     db.add(template)
-    db.commit()
-    db.refresh(template)
+    await db.commit()
+    await db.refresh(template)
+
+    return _user_template_response(template)
 
+
+def _user_template_response(template: UserTemplate) -> UserTemplateResponse:
     return UserTemplateResponse(
         id=template.id,
         name=template.name,
         description=template.description,
-        sections=payload.sections,
+        sections=json.loads(template.sections),
     )
 
+
+async def _get_own_template(db: AsyncSession, template_id: UUID, current_user: User) -> UserTemplate:
+    template = (
+        await db.execute(
+            select(UserTemplate).where(
+                UserTemplate.id == template_id,
+                UserTemplate.user_email == current_user.email,
+            )
+        )
+    ).scalars().first()
+    if not template:
+        raise HTTPException(404, "User template not found")
+    return template
+
+
+@router.put("/user/{template_id}", response_model=UserTemplateResponse)
+async def update_user_template(
+    template_id: UUID,
+    payload: UserTemplateUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    template = await _get_own_template(db, template_id, current_user)
+
+    if payload.sections is not None:
+        if not payload.sections:
+            raise HTTPException(400, "Template must have at least one section")
+        template.sections = json.dumps(payload.sections)
+    if payload.name is not None:
+        template.name = payload.name.strip()
+    if payload.description is not None:
+        template.description = payload.description
+
+    await db.commit()
+    await db.refresh(template)
+    return _user_template_response(template)
+
+
+@router.delete("/user/{template_id}", status_code=204)
+async def delete_user_template(
+    template_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    template = await _get_own_template(db, template_id, current_user)
+
+    in_use = (
+        await db.execute(
+            select(FundingProgram.id).where(
+                FundingProgram.template_source == "user",
+                FundingProgram.template_ref == str(template.id),
+            )
+        )
+    ).first()
+    if in_use:
+        raise HTTPException(409, "Template is used by a funding program")
+
+    await db.delete(template)
+    await db.commit()
+    return Response(status_code=204)
+
+
 @router.get("/list")
-def list_templates(
-    db: Session = Depends(get_db),
+async def list_templates(
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    user_templates = db.query(UserTemplate).filter(
-        UserTemplate.user_email == current_user.email
+    """
+    System and own templates. Served from a per-user cache of the encoded
+    body; clients revalidate with If-None-Match and get 304 while the
+    user's templates are unchanged.
+    """
+    def build_body(session: Session) -> bytes:
+        user_templates = session.query(
+            UserTemplate.id,
+            UserTemplate.name,
+            UserTemplate.description,
+        ).filter(
+            UserTemplate.user_email == current_user.email
+        ).all()
+
+        return json.dumps({
+            "system": SYSTEM_TEMPLATE_LIST,
+            "user": [
+                {
+                    "id": str(t.id),
+                    "name": t.name,
+                    "description": t.description,
+                    "source": "user",
+                }
+                for t in user_templates
+            ],
+        }).encode("utf-8")
+
+    def cached_list(session: Session):
+        return template_list_cache.get(session, current_user.email, lambda: build_body(session))
+
+    cached = await db.run_sync(cached_list)
+    headers = {"ETag": cached.etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and cached.etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+@router.post("/resolve-batch", response_model=TemplateResolveBatchResponse)
+async def resolve_templates_batch(
+    payload: TemplateResolveBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Resolve the templates of many funding programs at once: one query for the
+    programs, one for their user templates. Each template appears once in
+    "templates", however many programs use it.
+    """
+    programs = (
+        await db.execute(
+            select(
+                FundingProgram.id,
+                FundingProgram.template_source,
+                FundingProgram.template_ref,
+            ).where(FundingProgram.id.in_(set(payload.funding_program_ids)))
+        )
     ).all()
 
-    return {
-        "system": [
-            {"id": name, "name": name, "source": "system"}
-            for name in SYSTEM_TEMPLATES.keys()
-        ],
-        "user": [
-            {
-                "id": str(t.id),
-                "name": t.name,
-                "description": t.description,
-                "source": "user",
-            }
-            for t in user_templates
-        ],
-    }
+    user_templates = await db.run_sync(
+        get_user_templates, {p.template_ref for p in programs if p.template_source == "user"}
+    )
+
+    templates = {}
+    refs = []
+    for program in sorted(programs, key=lambda p: p.id):
+        if program.template_source == "system":
+            frozen = FROZEN_SYSTEM_TEMPLATES.get(program.template_ref)
+        elif program.template_source == "user":
+            frozen = user_templates.get(program.template_ref)
+        else:
+            frozen = None
+
+        key = f"{program.template_source}:{program.template_ref}" if frozen else None
+        if key and key not in templates:
+            templates[key] = copy_template(frozen)
+        refs.append(FundingProgramTemplateRef(funding_program_id=program.id, template_key=key))
+
+    found = {p.id for p in programs}
+    return TemplateResolveBatchResponse(
+        templates=templates,
+        funding_programs=refs,
+        missing=sorted(set(payload.funding_program_ids) - found),
+    )
@@ -2,7 +2,7 @@ from pydantic import BaseModel, EmailStr, Field
 from pydantic import BaseModel
 from uuid import UUID
 from typing import Optional
-from typing import List, Literal
+from typing import Any, Dict, List, Literal
 from pydantic import BaseModel, Field
 
 
@@ -33,6 +33,20 @@ class FileUploadResponse(BaseModel):
     reused: bool  # True if dedup reused existing file
 
 
+class FileLookupRequest(BaseModel):
+    hashes: List[str] = Field(min_length=1, max_length=500)  # SHA-256 hex digests
+
+
+class FileLookupMatch(BaseModel):
+    content_hash: str
+    file_id: UUID
+
+
+class FileLookupResponse(BaseModel):
+    existing: List[FileLookupMatch]
+    missing: List[str]
+
+
 class FundingProgramCreate(BaseModel):
     title: str = Field(min_length=1)
     template_source: Literal["system", "user"]
@@ -55,9 +69,48 @@ class FundingProgramDocumentResponse(BaseModel):
     file_id: UUID
     storage_path: str
     size_bytes: int
+    original_filename: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+
+class GuidelineExtractionJobResponse(BaseModel):
+    id: int
+    funding_program_id: int
+    file_id: UUID
+    status: str  # "queued" | "running" | "succeeded" | "failed"
+    attempts: int
+    error: Optional[str]
+    document_id: Optional[int]
 
     class Config:
         orm_mode = True
+
+
+class GuidelineSearchHit(BaseModel):
+    funding_program_id: int
+    funding_program_title: str
+    document_id: int
+    file_id: UUID
+    original_filename: Optional[str]
+    rank: float
+    snippet: str  # matches wrapped in <b>...</b>
+
+
+class GuidelinePassageHit(BaseModel):
+    document_id: int
+    passage_index: int  # position of the passage within its document
+    score: float
+    text: str
+
+
+class ResolvedTemplateResponse(BaseModel):
+    funding_program_id: int
+    template_source: str
+    template_ref: str
+    # Template sections as resolved, each with a "guideline_context" list of passages
+    sections: List[Dict[str, Any]]
 from typing import List, Optional
 from uuid import UUID
 
@@ -82,3 +135,20 @@ class UserTemplateResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class TemplateResolveBatchRequest(BaseModel):
+    funding_program_ids: List[int] = Field(min_length=1, max_length=500)
+
+
+class FundingProgramTemplateRef(BaseModel):
+    funding_program_id: int
+    # Key into TemplateResolveBatchResponse.templates; None if the template is missing
+    template_key: Optional[str]
+
+
+class TemplateResolveBatchResponse(BaseModel):
+    # "system:<name>" / "user:<uuid>" -> resolved template, once per template
+    templates: Dict[str, Dict[str, Any]]
+    funding_programs: List[FundingProgramTemplateRef]
+    missing: List[int]  # requested ids that do not exist
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+from app.config import LOCAL_STORAGE_ROOT, STORAGE_BACKEND, SUPABASE_STORAGE_BUCKET, UPLOAD_CHUNK_SIZE
+
+
+def build_storage_path(file_type: str, content_hash: str) -> str:
+    """
+    Sharded, content-addressed object path: file_type/prefix/hash
+    """
+    return f"{file_type}/{content_hash[:2]}/{content_hash}"
+
+
+class StorageBackend(ABC):
+    """
+    Where file bytes live. Paths come from build_storage_path().
+    """
+
+    name: str
+
+    @abstractmethod
+    def upload(self, path: str, stream: BinaryIO, content_type: str) -> None:
+        ...
+
+    @abstractmethod
+    def download(self, path: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def exists(self, path: str) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, path: str) -> None:
+        ...
+
+
+class SupabaseStorageBackend(StorageBackend):
+    name = "supabase"
+
+    def __init__(self, bucket: str = SUPABASE_STORAGE_BUCKET):
+        self.bucket = bucket
+
+    def _bucket(self):
+        from app.storage.supabase_client import get_supabase_client
+
+        return get_supabase_client().storage.from_(self.bucket)
+
+    def upload(self, path: str, stream: BinaryIO, content_type: str) -> None:
+        from app.storage.supabase_client import upload_latency
+
+        bucket = self._bucket()
+        stream_path = getattr(stream, "name", None)
+        # Paths are content-addressed, so overwriting an existing object is harmless
+        file_options = {"content-type": content_type, "upsert": "true"}
+
+        with upload_latency.measure():
+            if isinstance(stream_path, str):
+                # storage3 only streams real file handles, so reopen spooled temp files
+                with open(stream_path, "rb") as fh:
+                    bucket.upload(path=path, file=fh, file_options=file_options)
+            else:
+                bucket.upload(path=path, file=stream.read(), file_options=file_options)
+
+    def download(self, path: str) -> bytes:
+        return self._bucket().download(path)
+
+    def exists(self, path: str) -> bool:
+        return self._bucket().exists(path)
+
+    def delete(self, path: str) -> None:
+        self._bucket().remove([path])
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Plain files under a root directory, same layout as the bucket.
+    Writes go to a temp file first and are renamed into place.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str = LOCAL_STORAGE_ROOT):
+        self.root = Path(root).resolve()
+
+    def _full_path(self, path: str) -> Path:
+        full_path = (self.root / path).resolve()
+        if self.root not in full_path.parents:
+            raise ValueError(f"Storage path escapes root: {path}")
+        return full_path
+
+    def upload(self, path: str, stream: BinaryIO, content_type: str) -> None:
+        target = self._full_path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                shutil.copyfileobj(stream, out, UPLOAD_CHUNK_SIZE)
+            os.replace(tmp_name, target)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    def download(self, path: str) -> bytes:
+        return self._full_path(path).read_bytes()
+
+    def exists(self, path: str) -> bool:
+        return self._full_path(path).is_file()
+
+    def delete(self, path: str) -> None:
+        self._full_path(path).unlink(missing_ok=True)
+
+
+class InMemoryStorageBackend(StorageBackend):
+    """
+    Dict-backed store for load tests and benchmarks. Not persistent.
+    """
+
+    name = "memory"
+
+    def __init__(self) -> None:
+        self._objects: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def upload(self, path: str, stream: BinaryIO, content_type: str) -> None:
+        data = stream.read()
+        with self._lock:
+            self._objects[path] = data
+
+    def download(self, path: str) -> bytes:
+        with self._lock:
+            if path not in self._objects:
+                raise FileNotFoundError(path)
+            return self._objects[path]
+
+    def exists(self, path: str) -> bool:
+        with self._lock:
+            return path in self._objects
+
+    def delete(self, path: str) -> None:
+        with self._lock:
+            self._objects.pop(path, None)
+
+
+STORAGE_BACKENDS = {
+    "supabase": SupabaseStorageBackend,
+    "local": LocalStorageBackend,
+    "memory": InMemoryStorageBackend,
+}
+
+_backend: Optional[StorageBackend] = None
+_backend_lock = threading.Lock()
+
+
+def create_storage_backend(name: str = STORAGE_BACKEND) -> StorageBackend:
+    backend_cls = STORAGE_BACKENDS.get(name)
+    if backend_cls is None:
+        raise RuntimeError(f"Unknown STORAGE_BACKEND '{name}'. Expected one of: {', '.join(STORAGE_BACKENDS)}")
+    return backend_cls()
+
+
+def get_storage_backend() -> StorageBackend:
+    """
+    Process-wide storage backend selected by STORAGE_BACKEND.
+    """
+    global _backend
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_storage_backend()
+    return _backend
+
+
+def set_storage_backend(backend: StorageBackend) -> None:
+    """
+    Swap the process-wide backend (benchmarks, load tests).
+    """
+    global _backend
+
+    with _backend_lock:
+        _backend = backend
@@ -1,8 +1,19 @@
 import hashlib
 
+
+def create_file_hasher():
+    """
+    Return a fresh SHA-256 hasher for incremental hashing.
+    Feed it chunks with .update() and read the result with .hexdigest().
+    """
+    return hashlib.sha256()
+
+
 def compute_file_hash(data: bytes) -> str:
     """
     Compute SHA-256 hash (hex string) for file content.
     Used for deduplication.
     """
-    return hashlib.sha256(data).hexdigest()
+    hasher = create_file_hasher()
+    hasher.update(data)
+    return hasher.hexdigest()
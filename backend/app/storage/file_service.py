@@ -1,14 +1,35 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Tuple
+from typing import BinaryIO, Dict, Iterable, List, Tuple
 from fastapi import HTTPException
 from typing import Optional
+import io
+import uuid
 
+from app.concurrency import run_blocking
+from app.metrics import record_dedup, stage
 from app.models import File
+from app.storage.backends import build_storage_path, get_storage_backend
 from app.storage.file_hash import compute_file_hash
-from app.storage.supabase_client import get_supabase_client
-import os
 
-BUCKET = os.getenv("SUPABASE_STORAGE_BUCKET", "files")
+
+def file_type_for_mime(mime_type: str) -> str:
+    """
+    Small categorization used as the top-level storage folder.
+    """
+    if mime_type.startswith("audio/"):
+        return "audio"
+    if mime_type == "application/pdf":
+        return "pdf"
+    if mime_type in {
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        "application/msword",
+    }:
+        return "docx"
+    return "binary"
 
 
 def get_or_create_file(
@@ -20,48 +41,149 @@ def get_or_create_file(
     """
     GLOBAL FILE INGESTION SPINE
     """
+    return get_or_create_file_from_stream(
+        db=db,
+        stream=io.BytesIO(file_bytes),
+        content_hash=compute_file_hash(file_bytes),
+        size_bytes=len(file_bytes),
+        mime_type=mime_type,
+        original_filename=original_filename,
+    )
 
-    content_hash = compute_file_hash(file_bytes)
-    size_bytes = len(file_bytes)
 
-    existing = db.query(File).filter(File.content_hash == content_hash).first()
+def get_or_create_file_from_stream(
+    db: Session,
+    stream: BinaryIO,
+    content_hash: str,
+    size_bytes: int,
+    mime_type: str,
+    original_filename: Optional[str] = None,
+) -> Tuple[File, bool]:
+    """
+    Streaming variant of the ingestion spine.
+    The caller has already hashed the content (see spool_upload);
+    the stream is only read if the file is new.
+    """
+    with stage("db_lookup"):
+        existing = db.query(File).filter(File.content_hash == content_hash).first()
+    record_dedup(existing is not None)
     if existing:
         return existing, False
 
-    # Derive file_type from mime_type
-    if mime_type.startswith("audio/"):
-        file_type = "audio"
-    elif mime_type == "application/pdf":
-        file_type = "pdf"
-    elif mime_type in {
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        "application/msword",
-    }:
-        file_type = "docx"
-    else:
-        file_type = "binary"
-
-    prefix = content_hash[:2]
-    storage_path = f"{file_type}/{prefix}/{content_hash}"
+    file_type = file_type_for_mime(mime_type)
+    storage_path = store_file_content(stream, content_hash, mime_type)
 
-    supabase = get_supabase_client()
-    supabase.storage.from_(BUCKET).upload(
-        path=storage_path,
-        file=file_bytes,
-        file_options={"content-type": mime_type},
+    new_file = File(
+        content_hash=content_hash,
+        file_type=file_type,
+        mime_type=mime_type,
+        storage_path=storage_path,
+        size_bytes=size_bytes,
+        original_filename=original_filename,
     )
 
+    with stage("db_write"):
+        db.add(new_file)
+        try:
+            db.commit()
+        except IntegrityError:
+            # The same content was uploaded concurrently and committed first
+            db.rollback()
+            return db.query(File).filter(File.content_hash == content_hash).one(), False
+        db.refresh(new_file)
+
+    return new_file, True
+
+
+async def get_or_create_file_from_stream_async(
+    db: AsyncSession,
+    stream: BinaryIO,
+    content_hash: str,
+    size_bytes: int,
+    mime_type: str,
+    original_filename: Optional[str] = None,
+) -> Tuple[File, bool]:
+    """
+    get_or_create_file_from_stream for async endpoints: the DB calls are
+    awaited, only the storage upload goes to a worker thread.
+    """
+    with stage("db_lookup"):
+        existing = (await db.execute(select(File).where(File.content_hash == content_hash))).scalars().first()
+    record_dedup(existing is not None)
+    if existing:
+        return existing, False
+
+    storage_path = await run_blocking(store_file_content, stream, content_hash, mime_type)
+
     new_file = File(
         content_hash=content_hash,
-        file_type=file_type,
+        file_type=file_type_for_mime(mime_type),
         mime_type=mime_type,
         storage_path=storage_path,
         size_bytes=size_bytes,
         original_filename=original_filename,
     )
 
-    db.add(new_file)
-    db.commit()
-    db.refresh(new_file)
+    with stage("db_write"):
+        db.add(new_file)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # The same content was uploaded concurrently and committed first
+            await db.rollback()
+            existing = (await db.execute(select(File).where(File.content_hash == content_hash))).scalars().one()
+            return existing, False
+        await db.refresh(new_file)
 
     return new_file, True
+
+
+# -------------------------
+# Batch ingestion (used by guideline uploads)
+# -------------------------
+
+def store_file_content(stream: BinaryIO, content_hash: str, mime_type: str) -> str:
+    """
+    Upload content to the storage backend only (no DB row). Returns the storage path.
+    Safe to run concurrently for different files.
+    """
+    storage_path = build_storage_path(file_type_for_mime(mime_type), content_hash)
+    with stage("storage_upload"):
+        get_storage_backend().upload(storage_path, stream, mime_type)
+    return storage_path
+
+
+def find_files_by_hash(db: Session, content_hashes: Iterable[str]) -> Dict[str, File]:
+    hashes = list(set(content_hashes))
+    if not hashes:
+        return {}
+    return {f.content_hash: f for f in db.query(File).filter(File.content_hash.in_(hashes)).all()}
+
+
+def insert_files(db: Session, files: List[dict]) -> None:
+    """
+    Insert File rows (dicts of column values, content already stored) in one
+    statement. Hashes inserted concurrently by another request are skipped.
+    The caller commits.
+    """
+    if not files:
+        return
+
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "file_type": file_type_for_mime(f["mime_type"]),
+            "storage_path": build_storage_path(file_type_for_mime(f["mime_type"]), f["content_hash"]),
+            **f,
+        }
+        for f in files
+    ]
+
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(File.__table__).values(rows).on_conflict_do_nothing(index_elements=["content_hash"])
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(File.__table__).values(rows).on_conflict_do_nothing(index_elements=["content_hash"])
+    else:
+        stmt = File.__table__.insert().values(rows)
+    db.execute(stmt)
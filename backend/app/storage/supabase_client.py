@@ -1,19 +1,157 @@
 from __future__ import annotations
 
-from supabase import Client, create_client
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterator, Optional
 
-from app.config import SUPABASE_SERVICE_ROLE_KEY, SUPABASE_STORAGE_BUCKET, SUPABASE_URL
+from app.config import (
+    STORAGE_HTTP_CONNECT_TIMEOUT,
+    STORAGE_HTTP_KEEPALIVE_EXPIRY,
+    STORAGE_HTTP_POOL_SIZE,
+    STORAGE_HTTP_TIMEOUT,
+    SUPABASE_SERVICE_ROLE_KEY,
+    SUPABASE_STORAGE_BUCKET,
+    SUPABASE_URL,
+)
 
+# supabase (with its httpx/gotrue/postgrest stack) is imported on first use,
+# not at app startup; see app/warmup.py
+if TYPE_CHECKING:
+    import httpx
+    from supabase import Client
 
-def get_supabase_client() -> Client:
+_client: Optional[Client] = None
+_http_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+
+class LatencyStats:
+    """
+    Running count / total / max of call durations (seconds).
+    Thread-safe; cheap enough to sit on every storage call.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.count = 0
+            self.total_seconds = 0.0
+            self.max_seconds = 0.0
+            self.last_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            self.last_seconds = seconds
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            mean = self.total_seconds / self.count if self.count else 0.0
+            return {
+                "count": self.count,
+                "mean_ms": mean * 1000,
+                "max_ms": self.max_seconds * 1000,
+                "last_ms": self.last_seconds * 1000,
+            }
+
+
+# Latency of storage uploads made through the shared client
+upload_latency = LatencyStats()
+
+
+def build_http_client(
+    pool_size: int = STORAGE_HTTP_POOL_SIZE,
+    timeout: float = STORAGE_HTTP_TIMEOUT,
+    connect_timeout: float = STORAGE_HTTP_CONNECT_TIMEOUT,
+    keepalive_expiry: float = STORAGE_HTTP_KEEPALIVE_EXPIRY,
+) -> httpx.Client:
+    """
+    Keep-alive connection pool shared by every storage call in this process.
+    Redirects and HTTP/2 as in the clients supabase builds for itself.
+    """
+    import httpx
+
+    return httpx.Client(
+        follow_redirects=True,
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(timeout, connect=connect_timeout),
+    )
+
+
+def create_supabase_client(
+    url: Optional[str] = SUPABASE_URL,
+    key: Optional[str] = SUPABASE_SERVICE_ROLE_KEY,
+    http_client: Optional[httpx.Client] = None,
+) -> Client:
     """
     Backend-only Supabase client.
     Uses SERVICE ROLE key -> never expose to frontend.
     """
-    if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
+    if not url or not key:
         raise RuntimeError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in environment.")
 
-    return create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    # ClientOptions(httpx_client=...) needs supabase>=2.16
+    from supabase import ClientOptions, create_client
+
+    options = ClientOptions(httpx_client=http_client) if http_client is not None else None
+    return create_client(url, key, options=options)
+
+
+def init_supabase_client() -> Client:
+    """
+    Build the process-wide client. Called once at app startup;
+    safe to call again (returns the existing client).
+    """
+    global _client, _http_client
+
+    with _client_lock:
+        if _client is None:
+            http_client = build_http_client()
+            try:
+                _client = create_supabase_client(http_client=http_client)
+            except Exception:
+                http_client.close()
+                raise
+            _http_client = http_client
+        return _client
+
+
+def close_supabase_client() -> None:
+    global _client, _http_client
+
+    with _client_lock:
+        if _http_client is not None:
+            _http_client.close()
+        _client = None
+        _http_client = None
+
+
+def get_supabase_client() -> Client:
+    """
+    Shared Supabase client (built on first use if startup did not).
+    """
+    if _client is not None:
+        return _client
+    return init_supabase_client()
 
 
 def get_bucket_name() -> str:
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from fastapi import UploadFile
+
+from app.concurrency import run_blocking
+from app.config import UPLOAD_CHUNK_SIZE
+from app.metrics import stage
+from app.storage.file_hash import create_file_hasher
+
+
+@dataclass
+class SpooledUpload:
+    """
+    An upload that has been hashed and written to a temp file.
+    The temp file is removed when the upload is closed.
+    """
+
+    file: BinaryIO
+    content_hash: str
+    size_bytes: int
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+async def spool_upload(upload: UploadFile, chunk_size: int = UPLOAD_CHUNK_SIZE) -> SpooledUpload:
+    """
+    Read an UploadFile chunk by chunk, hashing as we go and writing each
+    chunk to a named temp file. Memory use stays at about one chunk
+    regardless of the upload size. Hashing and disk writes run off the
+    event loop.
+    """
+    with stage("spool_hash"):
+        return await _spool(upload, chunk_size)
+
+
+async def _spool(upload: UploadFile, chunk_size: int) -> SpooledUpload:
+    hasher = create_file_hasher()
+    size_bytes = 0
+    spool = await run_blocking(tempfile.NamedTemporaryFile, prefix="innovo-upload-")
+
+    def consume(chunk: bytes) -> None:
+        hasher.update(chunk)
+        spool.write(chunk)
+
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            await run_blocking(consume, chunk)
+            size_bytes += len(chunk)
+
+        await run_blocking(spool.flush)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+
+    return SpooledUpload(file=spool, content_hash=hasher.hexdigest(), size_bytes=size_bytes)
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-import json
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
-from app.models import FundingProgram, UserTemplate
-from app.templates.system_templates import SYSTEM_TEMPLATES
+from app.models import FundingProgram
+from app.templates.template_cache import FROZEN_SYSTEM_TEMPLATES, copy_template, get_user_template
 
 
 def resolve_template_for_funding_program(
@@ -15,30 +14,28 @@ def resolve_template_for_funding_program(
     """
     Returns a FULL template structure with 'sections',
     regardless of system or user template.
+    Built from cached structures; the result is the caller's to modify.
     """
 
     # -------------------------
     # System templates
     # -------------------------
     if funding_program.template_source == "system":
-        template_fn = SYSTEM_TEMPLATES.get(funding_program.template_ref)
+        template = FROZEN_SYSTEM_TEMPLATES.get(funding_program.template_ref)
 
-        if not template_fn:
+        if not template:
             raise HTTPException(
                 status_code=500,
                 detail=f"Unknown system template '{funding_program.template_ref}'",
             )
 
-        # Call the registered system template function
-        return template_fn()
+        return copy_template(template)
 
     # -------------------------
     # User templates
     # -------------------------
     if funding_program.template_source == "user":
-        template = db.query(UserTemplate).filter(
-            UserTemplate.id == funding_program.template_ref
-        ).first()
+        template = get_user_template(db, funding_program.template_ref)
 
         if not template:
             raise HTTPException(
@@ -46,20 +43,7 @@ def resolve_template_for_funding_program(
                 detail="User template not found",
             )
 
-        headings = json.loads(template.sections)
-
-        sections = []
-        for idx, title in enumerate(headings, start=1):
-            sections.append(
-                {
-                    "id": str(idx),
-                    "title": title,
-                    "content": "",
-                    "type": "text",
-                }
-            )
-
-        return {"sections": sections}
+        return copy_template(template)
 
     # -------------------------
     # Safety fallback
@@ -0,0 +1,99 @@
+"""
+Serialized /templates/list responses, cached per user.
+
+users.template_version is bumped (by the mapper events below) in the same
+transaction as every create, update or delete of one of the user's
+templates. A cached body is served without touching the database for
+TEMPLATE_LIST_CACHE_SECONDS; after that one version lookup revalidates it.
+Writes made by this process drop the entry right away. The system templates
+only change with a deploy, which leaves every version as it was, so their
+digest is part of the ETag as well.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app.config import TEMPLATE_LIST_CACHE_SECONDS, TEMPLATE_LIST_CACHE_SIZE
+from app.models import User, UserTemplate
+from app.templates.system_templates import SYSTEM_TEMPLATES
+
+SYSTEM_TEMPLATE_LIST = [
+    {"id": name, "name": name, "source": "system"}
+    for name in SYSTEM_TEMPLATES.keys()
+]
+SYSTEM_TEMPLATE_LIST_DIGEST = hashlib.sha256(
+    json.dumps(SYSTEM_TEMPLATE_LIST, sort_keys=True).encode("utf-8")
+).hexdigest()[:16]
+
+
+@dataclass
+class CachedTemplateList:
+    version: int
+    etag: str
+    body: bytes
+    checked_at: float  # time.monotonic() of the last version check
+
+
+def template_list_etag(email: str, version: int) -> str:
+    digest = hashlib.sha256(f"{SYSTEM_TEMPLATE_LIST_DIGEST}:{email}:{version}".encode("utf-8")).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+class TemplateListCache:
+    def __init__(self, max_entries: int = TEMPLATE_LIST_CACHE_SIZE, fresh_seconds: float = TEMPLATE_LIST_CACHE_SECONDS):
+        self.max_entries = max_entries
+        self.fresh_seconds = fresh_seconds
+        self._entries: "OrderedDict[str, CachedTemplateList]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, email: str, build_body: Callable[[], bytes]) -> CachedTemplateList:
+        """
+        The user's cached list; build_body() runs only when it is missing or stale.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(email)
+        if entry is not None and now - entry.checked_at < self.fresh_seconds:
+            return entry
+
+        version = db.query(User.template_version).filter(User.email == email).scalar() or 0
+        if entry is None or entry.version != version:
+            entry = CachedTemplateList(version, template_list_etag(email, version), build_body(), now)
+        else:
+            entry.checked_at = now
+
+        with self._lock:
+            self._entries[email] = entry
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, email: str) -> None:
+        with self._lock:
+            self._entries.pop(email, None)
+
+
+template_list_cache = TemplateListCache()
+
+
+@event.listens_for(UserTemplate, "after_insert")
+@event.listens_for(UserTemplate, "after_update")
+@event.listens_for(UserTemplate, "after_delete")
+def _bump_template_version(mapper, connection, target: UserTemplate) -> None:
+    connection.execute(
+        update(User.__table__)
+        .where(User.__table__.c.email == target.user_email)
+        .values(template_version=User.__table__.c.template_version + 1)
+    )
+    template_list_cache.invalidate(target.user_email)
@@ -0,0 +1,157 @@
+"""
+Template structures built once and shared read-only.
+
+System templates are frozen at import time. User templates are parsed once
+per (id, version) where the version is updated_at (or created_at if never
+updated), and dropped from the cache as soon as they are written. Callers get
+cheap copies: a fresh list of fresh section dicts whose values are shared
+immutable strings, so they may edit sections without touching the cache.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import USER_TEMPLATE_CACHE_SIZE
+from app.models import UserTemplate
+from app.templates.system_templates import SYSTEM_TEMPLATES
+
+FrozenTemplate = Mapping[str, Any]
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def copy_template(template: FrozenTemplate) -> Dict[str, Any]:
+    """
+    A mutable template: new section dicts over the shared frozen values
+    (nested values stay frozen).
+    """
+    copy = dict(template)
+    copy["sections"] = [dict(section) for section in template["sections"]]
+    return copy
+
+
+FROZEN_SYSTEM_TEMPLATES: Dict[str, FrozenTemplate] = {
+    name: freeze(build_template()) for name, build_template in SYSTEM_TEMPLATES.items()
+}
+
+
+def sections_from_headings(headings) -> list:
+    return [
+        {
+            "id": str(idx),
+            "title": title,
+            "content": "",
+            "type": "text",
+        }
+        for idx, title in enumerate(headings, start=1)
+    ]
+
+
+class UserTemplateCache:
+    def __init__(self, max_entries: int = USER_TEMPLATE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[datetime, FrozenTemplate]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, template_id: str, version: datetime) -> Optional[FrozenTemplate]:
+        with self._lock:
+            entry = self._entries.get(template_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(template_id)
+            return entry[1]
+
+    def put(self, template_id: str, version: datetime, template: FrozenTemplate) -> None:
+        with self._lock:
+            self._entries[template_id] = (version, template)
+            self._entries.move_to_end(template_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, template_id: str) -> None:
+        with self._lock:
+            self._entries.pop(template_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_template_cache = UserTemplateCache()
+
+
+def get_user_template(db: Session, template_id: str) -> Optional[FrozenTemplate]:
+    """
+    The frozen template, or None if it does not exist. Only the version
+    columns are queried when the cached copy is current.
+    """
+    row = (
+        db.query(UserTemplate.created_at, UserTemplate.updated_at)
+        .filter(UserTemplate.id == template_id)
+        .first()
+    )
+    if row is None:
+        return None
+
+    version = row.updated_at or row.created_at
+    template = user_template_cache.get(template_id, version)
+    if template is None:
+        sections = db.query(UserTemplate.sections).filter(UserTemplate.id == template_id).scalar()
+        template = freeze({"sections": sections_from_headings(json.loads(sections))})
+        user_template_cache.put(template_id, version, template)
+    return template
+
+
+def get_user_templates(db: Session, template_ids: Iterable[str]) -> Dict[str, FrozenTemplate]:
+    """
+    Frozen templates keyed by the given ids (those that exist), in one query.
+    """
+    requested: Dict[uuid.UUID, list] = {}
+    for template_id in template_ids:
+        try:
+            requested.setdefault(uuid.UUID(template_id), []).append(template_id)
+        except ValueError:
+            continue
+    if not requested:
+        return {}
+
+    rows = db.query(
+        UserTemplate.id,
+        UserTemplate.created_at,
+        UserTemplate.updated_at,
+        UserTemplate.sections,
+    ).filter(UserTemplate.id.in_(requested))
+
+    templates = {}
+    for row in rows:
+        template_id = str(row.id)
+        version = row.updated_at or row.created_at
+        template = user_template_cache.get(template_id, version)
+        if template is None:
+            template = freeze({"sections": sections_from_headings(json.loads(row.sections))})
+            user_template_cache.put(template_id, version, template)
+        for requested_id in requested[row.id]:
+            templates[requested_id] = template
+    return templates
+
+
+@event.listens_for(UserTemplate, "after_update")
+@event.listens_for(UserTemplate, "after_delete")
+def _user_template_written(mapper, connection, target: UserTemplate) -> None:
+    user_template_cache.invalidate(str(target.id))
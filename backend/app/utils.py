@@ -1,8 +1,10 @@
 import bcrypt
 
+from app.config import BCRYPT_ROUNDS
+
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -10,3 +12,11 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         plain_password.encode(),
         hashed_password.encode(),
     )
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    # bcrypt hashes look like "$2b$12$<salt+hash>"; the middle part is the cost
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
@@ -0,0 +1,75 @@
+"""
+Background warm-up of the heavy, lazily imported libraries.
+
+supabase (with httpx, gotrue, postgrest, storage3) and pypdf are imported on
+first use so the app answers /health as soon as the routes are mounted. With
+STARTUP_WARMUP=1 a daemon thread imports them (and builds the shared storage
+client) right after startup, so the first upload does not pay for it either.
+
+    python -m benchmarks.bench_startup   # import-time breakdown, time to first response
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from app.config import STARTUP_WARMUP, STORAGE_BACKEND, SUPABASE_SERVICE_ROLE_KEY, SUPABASE_URL
+
+logger = logging.getLogger(__name__)
+
+WARMUP_MODULES = ("pypdf",)
+
+# step -> seconds, filled in by the warm-up thread
+warmup_timings: Dict[str, float] = {}
+
+_thread: Optional[threading.Thread] = None
+
+
+def _storage_client_configured() -> bool:
+    return STORAGE_BACKEND == "supabase" and bool(SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY)
+
+
+def warm_up() -> None:
+    """
+    Import the lazy libraries and build the storage client. Failures are only
+    logged: the same work happens again on first use.
+    """
+    started = time.perf_counter()
+
+    for module in WARMUP_MODULES:
+        step_started = time.perf_counter()
+        try:
+            importlib.import_module(module)
+        except Exception:
+            logger.exception("Warm-up import of %s failed", module)
+        warmup_timings[module] = time.perf_counter() - step_started
+
+    # One pooled storage client per process, reused by every upload
+    if _storage_client_configured():
+        step_started = time.perf_counter()
+        try:
+            from app.storage.supabase_client import init_supabase_client
+
+            init_supabase_client()
+        except Exception:
+            logger.exception("Warm-up of the storage client failed")
+        warmup_timings["supabase_client"] = time.perf_counter() - step_started
+
+    warmup_timings["total"] = time.perf_counter() - started
+    logger.info(
+        "Warm-up finished in %.0f ms (%s)",
+        warmup_timings["total"] * 1000,
+        ", ".join(f"{step} {seconds * 1000:.0f} ms" for step, seconds in warmup_timings.items() if step != "total"),
+    )
+
+
+def start_warmup() -> None:
+    global _thread
+    if not STARTUP_WARMUP or _thread is not None:
+        return
+    _thread = threading.Thread(target=warm_up, name="startup-warmup", daemon=True)
+    _thread.start()
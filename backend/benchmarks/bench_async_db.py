@@ -0,0 +1,120 @@
+"""
+Requests per second of the same DB-bound endpoint on the sync and the async
+session, at increasing concurrency.
+
+The sync variant is a plain `def` endpoint on get_db (FastAPI runs it in its
+threadpool, 40 threads by default); the async variant awaits get_async_db on
+the event loop. Both run the listing queries of GET /funding-programs.
+
+    cd backend
+    python -m benchmarks.bench_async_db --concurrency 16,64,256 --requests 2000
+
+Numbers against SQLite mostly measure driver overhead (aiosqlite runs each
+connection on its own thread). Point DATABASE_URL at Postgres for the
+comparison that matters; --db-latency-ms adds a pg_sleep per request there
+to stand in for network round trips.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from benchmarks.common import create_schema, serve_in_thread
+from benchmarks.load_test import run_scenario
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, async_engine, engine
+from app.dependencies import get_async_db, get_db
+from app.models import FundingProgram
+
+PAGE_SIZE = 100
+
+
+def _listing_queries():
+    validator = select(func.max(FundingProgram.updated_at))
+    page = (
+        select(FundingProgram.id, FundingProgram.title, FundingProgram.created_at)
+        .order_by(FundingProgram.created_at.desc(), FundingProgram.id.desc())
+        .limit(PAGE_SIZE)
+    )
+    return validator, page
+
+
+def build_app(db_latency_ms: float) -> FastAPI:
+    app = FastAPI()
+    validator_query, page_query = _listing_queries()
+    sleep = text("SELECT pg_sleep(:seconds)").bindparams(seconds=db_latency_ms / 1000) if db_latency_ms else None
+
+    @app.get("/sync")
+    def list_sync(db: Session = Depends(get_db)):
+        if sleep is not None:
+            db.execute(sleep)
+        db.execute(validator_query).scalar()
+        return [row.id for row in db.execute(page_query).all()]
+
+    @app.get("/async")
+    async def list_async(db: AsyncSession = Depends(get_async_db)):
+        if sleep is not None:
+            await db.execute(sleep)
+        (await db.execute(validator_query)).scalar()
+        return [row.id for row in (await db.execute(page_query)).all()]
+
+    return app
+
+
+def seed(programs: int) -> None:
+    db = SessionLocal()
+    try:
+        if db.query(FundingProgram.id).count() < programs:
+            db.add_all(
+                FundingProgram(title=f"Förderprogramm {i}", template_source="system", template_ref="wtt_v1")
+                for i in range(programs)
+            )
+            db.commit()
+    finally:
+        db.close()
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    create_schema()
+    seed(args.programs)
+    if args.db_latency_ms and engine.dialect.name != "postgresql":
+        raise SystemExit("--db-latency-ms needs a Postgres DATABASE_URL")
+
+    base_url, server = serve_in_thread(build_app(args.db_latency_ms))
+    client = httpx.AsyncClient(base_url=base_url, timeout=None, limits=httpx.Limits(max_connections=None))
+    try:
+        print(f"database: {engine.dialect.name} (async: {async_engine.dialect.driver}), {args.requests} requests per run")
+        for concurrency in args.concurrency:
+            for path in ("/sync", "/async"):
+                # Warm both pools before timing
+                await run_scenario(min(args.requests, 50), concurrency, lambda i: client.get(path))
+                result = await run_scenario(args.requests, concurrency, lambda i: client.get(path))
+                print(
+                    f"concurrency {concurrency:4d}  {path:<7} {result.throughput_rps:8.1f} req/s"
+                    f"   p50 {result.p50_ms:8.2f} ms   p99 {result.p99_ms:8.2f} ms   errors {result.errors}"
+                )
+    finally:
+        await client.aclose()
+        server.should_exit = True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="16,64,256", help="comma-separated levels")
+    parser.add_argument("--requests", type=int, default=2000, help="per endpoint and level")
+    parser.add_argument("--programs", type=int, default=500, help="funding programs seeded")
+    parser.add_argument("--db-latency-ms", type=float, default=0, help="pg_sleep per request (Postgres only)")
+    args = parser.parse_args()
+    args.concurrency = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Latency of an unrelated endpoint (/health) while large uploads are in flight.
+
+Blocking work on the event loop shows up directly as /health tail latency.
+Run once normally and once with --baseline, which executes the blocking
+steps inline on the loop the way the endpoints used to.
+
+    cd backend
+    python -m benchmarks.bench_event_loop --uploads 4 --size-mb 32 --storage-latency-ms 200
+    python -m benchmarks.bench_event_loop --uploads 4 --size-mb 32 --storage-latency-ms 200 --baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.common import authenticated_client, create_schema, percentile, serve_in_thread
+
+from app.main import app  # noqa: E402
+from app.storage.backends import InMemoryStorageBackend, set_storage_backend  # noqa: E402
+
+
+class SlowInMemoryStorageBackend(InMemoryStorageBackend):
+    """
+    In-memory backend with a fixed blocking delay per upload, standing in
+    for the network round trip of a real storage upload.
+    """
+
+    def __init__(self, latency_seconds: float):
+        super().__init__()
+        self.latency_seconds = latency_seconds
+
+    def upload(self, path, stream, content_type):
+        time.sleep(self.latency_seconds)
+        super().upload(path, stream, content_type)
+
+
+def _run_blocking_inline() -> None:
+    import app.routers.funding_programs
+    import app.storage.file_service
+    import app.storage.upload_stream
+
+    async def run_inline(func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    for module in (app.storage.file_service, app.routers.funding_programs, app.storage.upload_stream):
+        module.run_blocking = run_inline
+
+
+async def _probe(client, stop: asyncio.Event, interval: float, samples: list[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get("/health")
+        response.raise_for_status()
+        samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def _upload(client, payload: bytes) -> None:
+    response = await client.post("/files/upload", files={"file": ("recording.wav", payload, "audio/wav")})
+    response.raise_for_status()
+
+
+async def main_async(args) -> None:
+    create_schema()
+    set_storage_backend(SlowInMemoryStorageBackend(args.storage_latency_ms / 1000))
+    if args.baseline:
+        _run_blocking_inline()
+
+    base_url, server = serve_in_thread(app)
+    client = await authenticated_client(base_url)
+    payloads = [os.urandom(args.size_mb * 1024 * 1024) for _ in range(args.uploads)]
+
+    idle: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(client, stop, args.probe_interval_ms / 1000, idle))
+    await asyncio.sleep(1)
+    stop.set()
+    await probe
+
+    busy: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(client, stop, args.probe_interval_ms / 1000, busy))
+    started = time.perf_counter()
+    await asyncio.gather(*(_upload(client, payload) for payload in payloads))
+    upload_seconds = time.perf_counter() - started
+    stop.set()
+    await probe
+    await client.aclose()
+    server.should_exit = True
+
+    mode = "baseline (blocking inline)" if args.baseline else "bounded executor"
+    print(f"{mode}: {args.uploads} concurrent uploads of {args.size_mb} MiB in {upload_seconds:.2f}s")
+    for label, samples in (("/health idle", idle), ("/health during uploads", busy)):
+        print(
+            f"{label:<24} n={len(samples):<5} p50 {statistics.median(samples):8.2f} ms"
+            f"   p99 {percentile(samples, 99):8.2f} ms   max {max(samples):8.2f} ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=4)
+    parser.add_argument("--size-mb", type=int, default=32)
+    parser.add_argument("--storage-latency-ms", type=float, default=200)
+    parser.add_argument("--probe-interval-ms", type=float, default=10)
+    parser.add_argument("--baseline", action="store_true", help="run blocking steps inline on the event loop")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
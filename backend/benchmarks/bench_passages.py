@@ -0,0 +1,66 @@
+"""
+BM25 passage retrieval for one funding program with dozens of long guidelines.
+
+Reports the cold index build (load texts, split, index) and the latency of
+a warm lookup as the passages endpoint does it: sync the document ids, then
+score the query.
+
+    cd backend
+    python -m benchmarks.bench_passages --documents 48 --paragraphs 600 --target-p95-ms 25
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from benchmarks.bench_search import QUERIES, seed
+from benchmarks.common import create_schema, percentile
+
+from app.database import SessionLocal  # noqa: E402
+from app.retrieval.bm25 import PassageIndexRegistry  # noqa: E402
+
+PASSAGE_QUERIES = QUERIES + ["2.3 Arbeitspaket Meilenstein", "zuwendungsfähigen Ausgaben Personalausgaben Sachausgaben"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=48)
+    parser.add_argument("--paragraphs", type=int, default=600, help="~330 characters each")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--target-p95-ms", type=float, default=25)
+    args = parser.parse_args()
+
+    create_schema()
+    seed(args.documents, 1, args.paragraphs)
+
+    db = SessionLocal()
+    registry = PassageIndexRegistry()
+
+    started = time.perf_counter()
+    index = registry.get_index(db, 1)
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"indexed {args.documents} documents / {len(index)} passages in {build_ms:.0f} ms")
+
+    timings = []
+    for _ in range(args.rounds):
+        for q in PASSAGE_QUERIES:
+            started = time.perf_counter()
+            hits = registry.get_index(db, 1).search(q, args.k)
+            timings.append((time.perf_counter() - started) * 1000)
+            assert hits, f"no hits for {q!r}"
+    db.close()
+
+    p95 = percentile(timings, 95)
+    print(
+        f"{len(timings)} queries (k={args.k})   p50 {percentile(timings, 50):.2f} ms"
+        f"   p95 {p95:.2f} ms   max {max(timings):.2f} ms   (target p95 {args.target_p95_ms} ms)"
+    )
+    if p95 > args.target_p95_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Serial vs process-pool PDF text extraction on generated multi-page PDFs.
+
+    cd backend
+    python -m benchmarks.bench_pdf_extraction --pages 50 200 --processes 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ["PDF_EXTRACTION_PROCESSES"] = str(args.processes)
+
+    from benchmarks.common import make_pdf
+    from app.extraction.pdf_text import _get_pool, extract_text_from_pdf_bytes, shutdown_extraction_pool
+
+    # Start the worker processes before timing
+    pool = _get_pool()
+    list(pool.map(abs, range(args.processes)))
+
+    print(f"{args.processes} processes, best of {args.repeat}")
+    for pages in args.pages:
+        pdf_bytes = make_pdf(pages)
+        results = {}
+        for label, parallel in (("serial", False), ("parallel", True)):
+            best = float("inf")
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                text = extract_text_from_pdf_bytes(pdf_bytes, parallel=parallel)
+                best = min(best, time.perf_counter() - started)
+            results[label] = (best, text)
+
+        assert results["serial"][1] == results["parallel"][1], "parallel output differs from serial"
+        serial, parallel = results["serial"][0], results["parallel"][0]
+        print(
+            f"{pages:>5} pages ({len(pdf_bytes) / 1024:7.0f} KiB): serial {serial:6.2f}s"
+            f"   parallel {parallel:6.2f}s   speedup {serial / parallel:4.2f}x"
+        )
+
+    shutdown_extraction_pool()
+
+
+if __name__ == "__main__":
+    main()
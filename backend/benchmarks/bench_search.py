@@ -0,0 +1,120 @@
+"""
+Guideline full-text search latency over a few thousand documents.
+
+Uses SQLite FTS5 by default. For Postgres, point DATABASE_URL at an empty
+database migrated with `alembic upgrade head` (the tsvector column and GIN
+index come from the migration).
+
+    cd backend
+    python -m benchmarks.bench_search --documents 3000 --target-p95-ms 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+import uuid
+
+from benchmarks.common import create_schema, percentile
+
+from app.database import SessionLocal  # noqa: E402
+from app.guideline_search import index_extraction_text, search_guidelines  # noqa: E402
+from app.models import File, FundingProgram, FundingProgramDocument, GuidelineExtraction  # noqa: E402
+
+VOCABULARY = (
+    "Antrag Zuwendung Förderquote Unternehmen Vorhaben Projektlaufzeit Eigenanteil Kosten "
+    "Personalausgaben Sachausgaben Verwendungsnachweis Bewilligung Innovation Forschung "
+    "Entwicklung Markteinführung Kooperation Hochschule Beratung Digitalisierung Nachhaltigkeit "
+    "Antragsteller Zuwendungsempfänger Bemessungsgrundlage Beihilfe Gruppenfreistellungsverordnung "
+    "Mittelstand Wertschöpfungskette Wissenstransfer Meilenstein Arbeitspaket Technologie"
+).split()
+
+RULES = [
+    "Antragsberechtigt sind kleine und mittlere Unternehmen mit Sitz in Deutschland.",
+    "Die Förderquote beträgt bis zu 50 Prozent der zuwendungsfähigen Ausgaben.",
+    "Beratungsleistungen externer Dienstleister sind bis zu einer Höhe von 20.000 Euro förderfähig.",
+    "Vorhaben mit einer Laufzeit von mehr als 36 Monaten sind ausgeschlossen.",
+]
+
+QUERIES = ["Antragsberechtigt Unternehmen", "Förderquote", "Beratungsleistungen Dienstleister", "Laufzeit Monaten", "Digitalisierung Kooperation"]
+
+
+def _document_text(rng: random.Random, paragraphs: int) -> str:
+    parts = []
+    for _ in range(paragraphs):
+        sentence = " ".join(rng.choice(VOCABULARY) for _ in range(40))
+        if rng.random() < 0.1:
+            sentence += " " + rng.choice(RULES)
+        parts.append(sentence + ".")
+    return "\n\n".join(parts)
+
+
+def seed(documents: int, programs: int, paragraphs: int) -> None:
+    rng = random.Random(42)
+    db = SessionLocal()
+    fps = [FundingProgram(title=f"Förderprogramm {i}", template_source="system", template_ref="wtt_v1") for i in range(programs)]
+    db.add_all(fps)
+    db.flush()
+
+    for i in range(documents):
+        content_hash = uuid.uuid4().hex * 2
+        f = File(
+            content_hash=content_hash,
+            file_type="pdf",
+            storage_path=f"pdf/{content_hash[:2]}/{content_hash}",
+            size_bytes=0,
+            mime_type="application/pdf",
+            original_filename=f"richtlinie-{i}.pdf",
+        )
+        text = _document_text(rng, paragraphs)
+        e = GuidelineExtraction(content_hash=content_hash, extractor_version="bench", text=text)
+        db.add_all([f, e])
+        db.flush()
+        index_extraction_text(db, e.id, text)
+        db.add(FundingProgramDocument(funding_program_id=fps[i % programs].id, file_id=f.id, extraction_id=e.id))
+        if i % 500 == 0:
+            db.commit()
+    db.commit()
+    db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=3000)
+    parser.add_argument("--programs", type=int, default=100)
+    parser.add_argument("--paragraphs", type=int, default=30)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--target-p95-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    create_schema()
+    started = time.perf_counter()
+    seed(args.documents, args.programs, args.paragraphs)
+    print(f"seeded {args.documents} documents in {time.perf_counter() - started:.1f}s")
+
+    db = SessionLocal()
+    search_guidelines(db, QUERIES[0], args.limit)  # builds the SQLite index, warms caches
+
+    timings = []
+    for _ in range(args.rounds):
+        for q in QUERIES:
+            started = time.perf_counter()
+            rows = search_guidelines(db, q, args.limit)
+            timings.append((time.perf_counter() - started) * 1000)
+            assert rows or q == QUERIES[-1], f"no hits for {q!r}"
+    db.close()
+
+    p95 = percentile(timings, 95)
+    print(
+        f"{db.bind.dialect.name}: {len(timings)} searches   p50 {percentile(timings, 50):.2f} ms"
+        f"   p95 {p95:.2f} ms   max {max(timings):.2f} ms   (target p95 {args.target_p95_ms} ms)"
+    )
+    if p95 > args.target_p95_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Startup report: where import time goes and how long until /health answers.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter and
+prints the total, the slowest top-level imports (cumulative) and the modules
+with the most time of their own. Then starts uvicorn in a subprocess a few
+times and measures process start -> first 200 from /health.
+
+    cd backend
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 5 --top 20 --output benchmarks/results/startup.json
+
+Track the numbers across versions; a library that shows up in the import
+list should be imported on first use (see app/warmup.py).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import List
+
+from benchmarks.common import create_schema
+
+import httpx
+
+# "import time:       905 |      85801 |   sqlalchemy.engine"
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass
+class ImportEntry:
+    module: str
+    depth: int
+    self_ms: float
+    cumulative_ms: float
+
+
+def import_times(module: str = "app.main") -> List[ImportEntry]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=os.environ,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append(ImportEntry(name, len(indent) // 2, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return entries
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_response(timeout: float = 60) -> float:
+    """
+    Seconds from spawning uvicorn to the first 200 from /health.
+    """
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=os.environ,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {server.returncode}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.005)
+        raise RuntimeError(f"/health did not answer within {timeout:.0f} s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="uvicorn starts to time")
+    parser.add_argument("--top", type=int, default=15, help="modules listed per table")
+    parser.add_argument("--output", help="write the report JSON here")
+    args = parser.parse_args()
+
+    # The lifespan (extraction workers) expects the schema to exist
+    create_schema()
+
+    entries = import_times()
+    # importtime lists children before their parent: app.main's subtree is
+    # everything between the previous top-level import and app.main itself
+    end = max(i for i, entry in enumerate(entries) if entry.depth == 0 and entry.module == "app.main")
+    start = max((i for i, entry in enumerate(entries[:end]) if entry.depth == 0), default=-1) + 1
+    root, entries = entries[end], entries[start:end]
+    top_level = [entry for entry in entries if entry.depth == 1]
+
+    print(f"import app.main: {root.cumulative_ms:.0f} ms\n")
+    print("slowest imports under app.main (cumulative):")
+    for entry in sorted(top_level, key=lambda e: e.cumulative_ms, reverse=True)[: args.top]:
+        print(f"  {entry.cumulative_ms:8.1f} ms  {entry.module}")
+    print("\nmost self time:")
+    for entry in sorted(entries, key=lambda e: e.self_ms, reverse=True)[: args.top]:
+        print(f"  {entry.self_ms:8.1f} ms  {entry.module}")
+
+    heavy = [name for name in ("supabase", "httpx", "pypdf") if any(entry.module == name for entry in entries)]
+    if heavy:
+        print(f"\nimported eagerly (should load on first use): {', '.join(heavy)}")
+
+    first_response = [time_to_first_response() for _ in range(args.runs)]
+    print(
+        f"\ntime to first /health response: median {statistics.median(first_response) * 1000:.0f} ms"
+        f"  (runs: {', '.join(f'{seconds * 1000:.0f}' for seconds in first_response)} ms)"
+    )
+
+    if args.output:
+        report = {
+            "import_app_main_ms": round(root.cumulative_ms, 1),
+            "time_to_first_response_ms": [round(seconds * 1000, 1) for seconds in first_response],
+            "eager_heavy_imports": heavy,
+            "imports": [asdict(entry) for entry in top_level],
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nwrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
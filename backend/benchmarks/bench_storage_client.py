@@ -0,0 +1,94 @@
+"""
+Per-upload latency: fresh Supabase client per upload vs the shared pooled client.
+
+Runs against a local HTTP stand-in for the Supabase Storage API, so it needs
+no credentials and measures client/connection overhead only.
+
+    cd backend
+    python -m benchmarks.bench_storage_client --uploads 200 --size-kb 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-only-secret-key-0123456789abcdef")
+
+from app.storage.supabase_client import build_http_client, create_supabase_client  # noqa: E402
+
+FAKE_KEY = "bench.service.role"
+BUCKET = "bench"
+
+
+class StorageStandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        body = json.dumps({"Key": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _time_uploads(get_client, uploads: int, payload: bytes) -> list[float]:
+    timings = []
+    for i in range(uploads):
+        started = time.perf_counter()
+        client = get_client()
+        client.storage.from_(BUCKET).upload(
+            path=f"binary/{i % 256:02x}/{i}",
+            file=payload,
+            file_options={"content-type": "application/octet-stream"},
+        )
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def _report(label: str, timings: list[float]) -> None:
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(f"{label:<22} mean {statistics.mean(ms):7.2f} ms   p50 {statistics.median(ms):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=256)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StorageStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    payload = os.urandom(args.size_kb * 1024)
+
+    fresh = _time_uploads(lambda: create_supabase_client(url, FAKE_KEY), args.uploads, payload)
+
+    http_client = build_http_client()
+    shared = create_supabase_client(url, FAKE_KEY, http_client=http_client)
+    pooled = _time_uploads(lambda: shared, args.uploads, payload)
+    http_client.close()
+    server.shutdown()
+
+    print(f"{args.uploads} uploads of {args.size_kb} KiB against {url}")
+    _report("client per upload", fresh)
+    _report("shared pooled client", pooled)
+    print(f"mean latency drop: {(1 - statistics.mean(pooled) / statistics.mean(fresh)) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
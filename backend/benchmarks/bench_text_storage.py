@@ -0,0 +1,195 @@
+"""
+Storage saved by compressing extracted guideline text, and what it costs to read.
+
+For each codec: bytes stored vs raw UTF-8, compression and decompression
+throughput, and latency of GET /funding-programs/{id}/documents/{id}/text
+(time to first byte and to the full body). Texts come from the PDFs in
+--pdf-dir when given, otherwise from generated German guideline-like text.
+
+    cd backend
+    python -m benchmarks.bench_text_storage --documents 50 --paragraphs 300
+    python -m benchmarks.bench_text_storage --pdf-dir ~/richtlinien
+
+--from-db only reports what the configured database already stores:
+
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_text_storage --from-db
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+from typing import List
+
+from benchmarks.bench_search import RULES, VOCABULARY
+from benchmarks.common import authenticated_client, create_schema, percentile, serve_in_thread
+
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.extraction.text_store import CODEC_ZLIB, CODEC_ZSTD, compress_text, decompress_text, zstandard
+from app.models import File, FundingProgram, FundingProgramDocument, GuidelineExtraction, GuidelineExtractionText
+
+
+def generated_texts(count: int, paragraphs: int) -> List[str]:
+    rng = random.Random(7)
+    texts = []
+    for _ in range(count):
+        parts = []
+        for number in range(paragraphs):
+            sentence = " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(20, 60)))
+            if rng.random() < 0.3:
+                sentence += " " + rng.choice(RULES)
+            parts.append(f"{number + 1}. {sentence}.")
+        texts.append("\n\n".join(parts))
+    return texts
+
+
+def pdf_texts(directory: str) -> List[str]:
+    from app.extraction.pdf_text import extract_text_from_pdf_bytes
+
+    texts = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith(".pdf"):
+            with open(os.path.join(directory, name), "rb") as f:
+                text = extract_text_from_pdf_bytes(f.read())
+            if text:
+                texts.append(text)
+    return texts
+
+
+def seed(texts: List[str], codec: str) -> List[tuple]:
+    """
+    One funding program with a document per text, stored with `codec`.
+    Returns (funding_program_id, document_id) pairs.
+    """
+    db = SessionLocal()
+    fp = FundingProgram(title=f"Textspeicher {codec}", template_source="system", template_ref="wtt_v1")
+    db.add(fp)
+    db.flush()
+    documents = []
+    for text in texts:
+        content_hash = uuid.uuid4().hex * 2
+        file_obj = File(
+            content_hash=content_hash,
+            file_type="pdf",
+            storage_path=f"pdf/{content_hash[:2]}/{content_hash}",
+            size_bytes=0,
+            mime_type="application/pdf",
+        )
+        stored_codec, data = compress_text(text, codec)
+        extraction = GuidelineExtraction(content_hash=content_hash, extractor_version="bench")
+        extraction.stored_text = GuidelineExtractionText(
+            codec=stored_codec, raw_size=len(text.encode("utf-8")), data=data
+        )
+        db.add_all([file_obj, extraction])
+        db.flush()
+        doc = FundingProgramDocument(funding_program_id=fp.id, file_id=file_obj.id, extraction_id=extraction.id)
+        db.add(doc)
+        db.flush()
+        documents.append((fp.id, doc.id))
+    db.commit()
+    db.close()
+    return documents
+
+
+async def read_latencies(base_url: str, documents: List[tuple], rounds: int):
+    client = await authenticated_client(base_url)
+    first_byte, full = [], []
+    try:
+        for _ in range(rounds):
+            for funding_program_id, document_id in documents:
+                started = time.perf_counter()
+                async with client.stream("GET", f"/funding-programs/{funding_program_id}/documents/{document_id}/text") as response:
+                    response.raise_for_status()
+                    first = True
+                    async for _chunk in response.aiter_bytes():
+                        if first:
+                            first_byte.append((time.perf_counter() - started) * 1000)
+                            first = False
+                full.append((time.perf_counter() - started) * 1000)
+    finally:
+        await client.aclose()
+    return first_byte, full
+
+
+def report_stored() -> None:
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            GuidelineExtractionText.codec,
+            func.count(),
+            func.sum(GuidelineExtractionText.raw_size),
+            func.sum(func.length(GuidelineExtractionText.data)),
+        ).group_by(GuidelineExtractionText.codec).all()
+    finally:
+        db.close()
+    if not rows:
+        print("no stored texts")
+    for codec, count, raw, stored in rows:
+        print(
+            f"{codec:<5} {count:6d} texts   raw {raw / 1e6:9.2f} MB   stored {stored / 1e6:9.2f} MB"
+            f"   saved {(1 - stored / raw) * 100:5.1f}%   ratio {raw / stored:5.1f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=50, help="generated texts (ignored with --pdf-dir)")
+    parser.add_argument("--paragraphs", type=int, default=300, help="per generated text")
+    parser.add_argument("--pdf-dir", help="use the text of these PDFs instead")
+    parser.add_argument("--rounds", type=int, default=5, help="reads of every document through the API")
+    parser.add_argument("--from-db", action="store_true", help="only report what the database stores")
+    args = parser.parse_args()
+
+    create_schema()
+    if args.from_db:
+        report_stored()
+        return
+
+    texts = pdf_texts(args.pdf_dir) if args.pdf_dir else generated_texts(args.documents, args.paragraphs)
+    raw = [text.encode("utf-8") for text in texts]
+    raw_bytes = sum(len(r) for r in raw)
+    print(f"{len(texts)} texts, {raw_bytes / 1e6:.2f} MB raw UTF-8\n")
+
+    from app.main import app
+
+    base_url, server = serve_in_thread(app)
+    try:
+        for codec in (CODEC_ZSTD, CODEC_ZLIB):
+            if codec == CODEC_ZSTD and zstandard is None:
+                print("zstd   skipped (zstandard not installed)")
+                continue
+
+            started = time.perf_counter()
+            compressed = [compress_text(text, codec)[1] for text in texts]
+            compress_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            for data in compressed:
+                decompress_text(codec, data)
+            decompress_seconds = time.perf_counter() - started
+            stored_bytes = sum(len(data) for data in compressed)
+
+            documents = seed(texts, codec)
+            first_byte, full = asyncio.run(read_latencies(base_url, documents, args.rounds))
+
+            print(
+                f"{codec:<5}  stored {stored_bytes / 1e6:8.2f} MB   saved {(1 - stored_bytes / raw_bytes) * 100:5.1f}%"
+                f"   ratio {raw_bytes / stored_bytes:5.1f}x   compress {raw_bytes / 1e6 / compress_seconds:7.1f} MB/s"
+                f"   decompress {raw_bytes / 1e6 / decompress_seconds:7.1f} MB/s"
+            )
+            print(
+                f"       GET .../text   first byte p50 {percentile(first_byte, 50):6.2f} ms p99 {percentile(first_byte, 99):6.2f} ms"
+                f"   full body p50 {percentile(full, 50):6.2f} ms p99 {percentile(full, 99):6.2f} ms"
+                f"   ({raw_bytes / len(texts) / 1e3:.0f} KB avg)"
+            )
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
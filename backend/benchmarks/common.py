@@ -0,0 +1,119 @@
+"""
+Shared setup for the offline benchmarks.
+
+Importing this module sets up the app the way the test suite does (see
+tests/support.py): a throwaway SQLite database and the in-memory storage
+backend unless DATABASE_URL / STORAGE_BACKEND are already set, so benchmarks
+need no Postgres, Supabase or credentials.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+
+import tests.support  # noqa: F401 (SQLite database and shims)
+from tests.support import make_pdf  # noqa: F401 (re-exported for the benchmarks)
+
+BENCH_EMAIL = "benchmark@innovo-consulting.de"
+BENCH_PASSWORD = "benchmark-password"
+
+
+def create_schema() -> None:
+    from app import models  # noqa: F401 (registers tables)
+    from app.database import Base, engine
+
+    Base.metadata.create_all(engine)
+
+
+def serve_in_thread(app):
+    """
+    Run the app under uvicorn on a free local port in a background thread.
+    The server gets its own event loop, so client-side work does not skew it.
+    Returns (base_url, server); call server.should_exit = True to stop.
+    """
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}", server
+
+
+def serve_in_subprocess(app_path: str = "app.main:app"):
+    """
+    Run the app under uvicorn in a child process (lifespan on: extraction
+    workers and warm-up start as in production), so its memory and CPU are
+    measured apart from the client. The child inherits this environment and
+    imports this module for the SQLite shims. Returns (base_url, process); call
+    process.terminate() to stop.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    code = (
+        "import benchmarks.common, uvicorn; "
+        f"uvicorn.run({app_path!r}, host='127.0.0.1', port={port}, log_level='warning')"
+    )
+    process = subprocess.Popen([sys.executable, "-c", code], cwd=os.path.dirname(os.path.dirname(__file__)))
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health").status_code == 200:
+                return base_url, process
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            process.terminate()
+            raise RuntimeError("server did not start within 60s")
+        time.sleep(0.05)
+
+
+def process_rss_mb(pid: int) -> float:
+    """
+    Current resident set size of a process (Linux /proc, ps elsewhere).
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    rss_kib = subprocess.run(["ps", "-o", "rss=", "-p", str(pid)], capture_output=True, text=True).stdout
+    return int(rss_kib.strip() or 0) / 1024
+
+
+async def authenticated_client(base_url: str) -> httpx.AsyncClient:
+    """
+    HTTP client logged in as the benchmark user.
+    """
+    client = httpx.AsyncClient(base_url=base_url, timeout=None, limits=httpx.Limits(max_connections=None))
+    await client.post("/auth/register", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+    response = await client.post("/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+    return client
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
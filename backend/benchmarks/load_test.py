@@ -0,0 +1,373 @@
+"""
+API load test: throughput, latency percentiles and server memory per scenario.
+
+Runs the app under uvicorn in a child process, lifespan on (so extraction
+workers run as in production), against SQLite (or the Postgres in
+DATABASE_URL, migrated with `alembic upgrade head`) and in-memory storage.
+Drives each scenario at the given concurrency and writes the results as JSON.
+Compare a run against an earlier one to spot regressions between versions:
+
+    cd backend
+    python -m benchmarks.load_test --concurrency 8 --output benchmarks/results/main.json
+    python -m benchmarks.load_test --concurrency 8 --compare benchmarks/results/main.json --max-regression 20
+
+Scenarios: login, upload_small, upload_large, upload_duplicate,
+guidelines_upload, list_funding_programs, list_templates. guidelines_upload
+also waits for the queued extractions to finish (drain_seconds).
+
+The server's RSS is sampled while each scenario runs: rss_start_mb before it,
+rss_peak_mb the highest sample, rss_growth_mb the difference. The client runs
+in this process, so its payloads are not counted. Compare runs made on the
+same machine with the same flags.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# Logins are the point of one scenario; keep the throttle out of the way
+os.environ.setdefault("LOGIN_IP_MAX_ATTEMPTS", "1000000")
+os.environ.setdefault("PASSWORD_HASH_QUEUE_SIZE", "1000")
+
+from benchmarks.common import (  # noqa: E402
+    BENCH_EMAIL,
+    BENCH_PASSWORD,
+    authenticated_client,
+    create_schema,
+    make_pdf,
+    percentile,
+    process_rss_mb,
+    serve_in_subprocess,
+)
+
+import httpx  # noqa: E402
+
+SCENARIOS = (
+    "login",
+    "upload_small",
+    "upload_large",
+    "upload_duplicate",
+    "guidelines_upload",
+    "list_funding_programs",
+    "list_templates",
+)
+
+SMALL_UPLOAD_BYTES = 4 * 1024
+LARGE_UPLOAD_BYTES = 8 * 1024 * 1024
+
+RSS_SAMPLE_SECONDS = 0.05
+EXTRACTION_POLL_SECONDS = 0.2
+
+
+@dataclass
+class ScenarioResult:
+    requests: int
+    errors: int
+    seconds: float
+    throughput_rps: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+    # Server process memory; None when the server runs in this process
+    rss_start_mb: Optional[float] = None
+    rss_peak_mb: Optional[float] = None
+    rss_growth_mb: Optional[float] = None
+    # guidelines_upload: from the last response until every job finished
+    drain_seconds: Optional[float] = None
+    drain_failed: Optional[int] = None
+
+
+async def _sample_rss(pid: int, samples: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        samples.append(process_rss_mb(pid))
+        try:
+            await asyncio.wait_for(stop.wait(), RSS_SAMPLE_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_scenario(
+    count: int,
+    concurrency: int,
+    make_request: Callable[[int], Awaitable[httpx.Response]],
+    server_pid: Optional[int] = None,
+) -> ScenarioResult:
+    """
+    Send `count` requests from `concurrency` workers. With server_pid, that
+    process's RSS is sampled while they run.
+    """
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_index
+        while next_index < count:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                response = await make_request(index)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    rss_samples: List[float] = []
+    stop_sampling = asyncio.Event()
+    sampler = None
+    if server_pid is not None:
+        rss_samples.append(process_rss_mb(server_pid))
+        sampler = asyncio.ensure_future(_sample_rss(server_pid, rss_samples, stop_sampling))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, count))))
+    seconds = time.perf_counter() - started
+
+    rss = {}
+    if sampler is not None:
+        stop_sampling.set()
+        await sampler
+        rss_samples.append(process_rss_mb(server_pid))
+        peak = max(rss_samples)
+        rss = {
+            "rss_start_mb": round(rss_samples[0], 1),
+            "rss_peak_mb": round(peak, 1),
+            "rss_growth_mb": round(peak - rss_samples[0], 1),
+        }
+
+    return ScenarioResult(
+        requests=count,
+        errors=errors,
+        seconds=round(seconds, 3),
+        throughput_rps=round(count / seconds, 2),
+        p50_ms=round(percentile(latencies, 50), 2),
+        p90_ms=round(percentile(latencies, 90), 2),
+        p99_ms=round(percentile(latencies, 99), 2),
+        max_ms=round(max(latencies), 2),
+        **rss,
+    )
+
+
+def unique_payload(size: int) -> bytes:
+    # Random prefix so every payload hashes differently; the rest is cheap filler
+    return uuid.uuid4().bytes * 4 + b"\0" * (size - 64)
+
+
+def unique_pdf(template: bytes) -> bytes:
+    # Bytes after %%EOF are ignored by readers but change the content hash
+    return template + f"% {uuid.uuid4()}\n".encode()
+
+
+async def prepare(client: httpx.AsyncClient, programs: int) -> int:
+    """
+    Seed funding programs for the listing scenario; returns one program id.
+    """
+    first_id = None
+    for index in range(programs):
+        response = await client.post(
+            "/funding-programs",
+            json={"title": f"Förderprogramm {index}", "template_source": "system", "template_ref": "wtt_v1"},
+        )
+        response.raise_for_status()
+        first_id = first_id or response.json()["id"]
+    return first_id
+
+
+def build_requests(
+    client: httpx.AsyncClient,
+    anonymous: httpx.AsyncClient,
+    args: argparse.Namespace,
+    funding_program_id: int,
+) -> Dict[str, tuple]:
+    """
+    Scenario name -> (request count, request factory). Payloads are generated
+    up front so the timed loop only sends them.
+    """
+    small = [unique_payload(SMALL_UPLOAD_BYTES) for _ in range(args.requests)]
+    large_count = max(5, args.requests // 10)
+    duplicate = unique_payload(SMALL_UPLOAD_BYTES)
+    guideline_count = max(5, args.requests // 5)
+    pdf_template = make_pdf(args.pdf_pages)
+    guideline_batches = [
+        [unique_pdf(pdf_template) for _ in range(args.pdfs_per_upload)] for _ in range(guideline_count)
+    ]
+
+    def upload(payload: bytes) -> Awaitable[httpx.Response]:
+        return client.post("/files/upload", files={"file": ("bench.bin", payload, "application/octet-stream")})
+
+    return {
+        "login": (
+            args.requests,
+            lambda i: anonymous.post("/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD}),
+        ),
+        "upload_small": (args.requests, lambda i: upload(small[i])),
+        # Built per request: holding every 8 MiB payload at once would dominate RSS
+        "upload_large": (large_count, lambda i: upload(unique_payload(LARGE_UPLOAD_BYTES))),
+        "upload_duplicate": (args.requests, lambda i: upload(duplicate)),
+        "guidelines_upload": (
+            guideline_count,
+            lambda i: client.post(
+                f"/funding-programs/{funding_program_id}/guidelines/upload",
+                files=[("files", (f"richtlinie-{n}.pdf", pdf, "application/pdf")) for n, pdf in enumerate(guideline_batches[i])],
+            ),
+        ),
+        "list_funding_programs": (args.requests, lambda i: client.get("/funding-programs")),
+        "list_templates": (args.requests, lambda i: client.get("/templates/list")),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, dict], baseline_path: str, max_regression: Optional[float]) -> bool:
+    """
+    Print changes against an earlier results file. Returns False if any
+    p50/p99 latency or throughput got worse by more than max_regression percent.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)["scenarios"]
+
+    ok = True
+    print(f"\nchange vs {baseline_path}:")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        changes = {
+            "p50_ms": (result["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100 if before["p50_ms"] else 0.0,
+            "p99_ms": (result["p99_ms"] - before["p99_ms"]) / before["p99_ms"] * 100 if before["p99_ms"] else 0.0,
+            # Lower throughput is the regression, so flip the sign
+            "throughput_rps": (before["throughput_rps"] - result["throughput_rps"]) / before["throughput_rps"] * 100,
+        }
+        worst = max(changes.values())
+        flag = ""
+        if max_regression is not None and worst > max_regression:
+            ok = False
+            flag = "  REGRESSION"
+        print(
+            f"  {name:<22} p50 {changes['p50_ms']:+6.1f}%   p99 {changes['p99_ms']:+6.1f}%"
+            f"   throughput {-changes['throughput_rps']:+6.1f}%{flag}"
+        )
+    return ok
+
+
+async def wait_for_extraction(client: httpx.AsyncClient, funding_program_id: int, timeout: float) -> tuple:
+    """
+    Poll the program's jobs until none is queued or running.
+    Returns (seconds waited, failed jobs).
+    """
+    started = time.perf_counter()
+    while True:
+        response = await client.get(f"/funding-programs/{funding_program_id}/guidelines/jobs")
+        response.raise_for_status()
+        statuses = [job["status"] for job in response.json()]
+        if not any(status in ("queued", "running") for status in statuses):
+            return round(time.perf_counter() - started, 3), statuses.count("failed")
+        if time.perf_counter() - started > timeout:
+            raise RuntimeError(f"extraction jobs still pending after {timeout:.0f}s")
+        await asyncio.sleep(EXTRACTION_POLL_SECONDS)
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, dict]:
+    create_schema()
+
+    base_url, server = serve_in_subprocess()
+    client = await authenticated_client(base_url)
+    anonymous = httpx.AsyncClient(base_url=base_url, timeout=None, limits=httpx.Limits(max_connections=None))
+    try:
+        funding_program_id = await prepare(client, args.programs)
+        requests = build_requests(client, anonymous, args, funding_program_id)
+
+        results = {}
+        for name in args.scenarios:
+            count, make_request = requests[name]
+            result = await run_scenario(count, args.concurrency, make_request, server_pid=server.pid)
+            line = (
+                f"{name:<22} {result.requests:5d} req  {result.errors:3d} err  {result.throughput_rps:8.1f} req/s"
+                f"   p50 {result.p50_ms:8.2f} ms   p90 {result.p90_ms:8.2f} ms   p99 {result.p99_ms:8.2f} ms"
+                f"   RSS {result.rss_peak_mb:7.1f} MB (+{result.rss_growth_mb:.1f})"
+            )
+            if name == "guidelines_upload":
+                result.drain_seconds, result.drain_failed = await wait_for_extraction(
+                    client, funding_program_id, args.drain_timeout
+                )
+                line += f"   extracted after +{result.drain_seconds:.2f} s ({result.drain_failed} failed)"
+            results[name] = asdict(result)
+            print(line)
+        return results
+    finally:
+        await client.aclose()
+        await anonymous.aclose()
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="per scenario (large/guideline uploads run fewer)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset")
+    parser.add_argument("--programs", type=int, default=200, help="funding programs seeded for the listing")
+    parser.add_argument("--pdf-pages", type=int, default=20)
+    parser.add_argument("--pdfs-per-upload", type=int, default=3)
+    parser.add_argument("--drain-timeout", type=float, default=600, help="seconds to wait for guideline extraction")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, help="exit 1 if any metric is this many percent worse")
+    args = parser.parse_args()
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = asyncio.run(main_async(args))
+
+    from app.database import engine
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "database": engine.dialect.name,
+            "storage_backend": os.environ.get("STORAGE_BACKEND"),
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "pdf_pages": args.pdf_pages,
+            "pdfs_per_upload": args.pdfs_per_upload,
+            "cpus": os.cpu_count(),
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nwrote {args.output}")
+
+    if args.compare and not compare(results, args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Shared fixtures: the app runs against a throwaway SQLite database and the
+in-memory storage backend (tests/support.py sets both up), with the
+background extraction workers and warm-up off.
+"""
+
+import os
+
+os.environ.setdefault("EXTRACTION_WORKERS", "0")
+os.environ.setdefault("STARTUP_WARMUP", "0")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import tests.support  # noqa: E402,F401 (SQLite database and shims)
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app import guideline_search  # noqa: E402
+from app import models  # noqa: E402,F401 (registers tables)
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.login_throttle import email_failures, ip_attempts  # noqa: E402
+from app.main import app  # noqa: E402
+from app.principal_cache import principal_cache  # noqa: E402
+from app.retrieval.bm25 import passage_indexes  # noqa: E402
+from app.storage.backends import InMemoryStorageBackend, set_storage_backend  # noqa: E402
+from app.templates.list_cache import template_list_cache  # noqa: E402
+from app.templates.template_cache import user_template_cache  # noqa: E402
+
+TEST_EMAIL = "tester@innovo-consulting.de"
+TEST_PASSWORD = "tester-password"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    """
+    Empty schema, caches and limiters, and a new in-memory store per test.
+    """
+    Base.metadata.drop_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS guideline_texts_fts"))
+    Base.metadata.create_all(engine)
+    guideline_search._sqlite_ready = False
+
+    principal_cache.clear()
+    user_template_cache.clear()
+    template_list_cache._entries.clear()
+    passage_indexes._indexes.clear()
+    ip_attempts._attempts.clear()
+    email_failures._attempts.clear()
+
+    storage = InMemoryStorageBackend()
+    set_storage_backend(storage)
+    yield storage
+
+
+@pytest.fixture
+def storage(fresh_state):
+    return fresh_state
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client):
+    client.post("/auth/register", json={"email": TEST_EMAIL, "password": TEST_PASSWORD})
+    response = client.post("/auth/login", json={"email": TEST_EMAIL, "password": TEST_PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def funding_program(client, auth_headers):
+    response = client.post(
+        "/funding-programs",
+        json={"title": "Innovationsförderung", "template_source": "system", "template_ref": "wtt_v1"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+@pytest.fixture
+def upload_guidelines(client, auth_headers):
+    """
+    POST PDFs (name -> bytes) as one guideline batch; returns the response.
+    """
+
+    def upload(funding_program_id, pdfs):
+        return client.post(
+            f"/funding-programs/{funding_program_id}/guidelines/upload",
+            files=[("files", (name, data, "application/pdf")) for name, data in pdfs.items()],
+            headers=auth_headers,
+        )
+
+    return upload
+
+
+@pytest.fixture
+def create_user_template(client, auth_headers):
+    """
+    Create a template of the test user from section headings; returns its id.
+    """
+
+    def create(name, sections):
+        response = client.post("/templates/user", json={"name": name, "sections": sections}, headers=auth_headers)
+        assert response.status_code == 201, response.text
+        return response.json()["id"]
+
+    return create
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
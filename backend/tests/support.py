@@ -0,0 +1,79 @@
+"""
+Test support: importing this module points the app at a throwaway SQLite
+database and the in-memory storage backend (unless DATABASE_URL /
+STORAGE_BACKEND are already set) and teaches SQLite the Postgres-only bits
+of the schema, so tests need no Postgres, Supabase or credentials.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix="innovo-test-")
+
+# Generous busy timeout: background threads write while requests do
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_DIR}/test.db?check_same_thread=false&timeout=30")
+os.environ.setdefault("JWT_SECRET_KEY", "test-only-secret-key-0123456789abcdef")
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+from sqlalchemy.dialects.postgresql import UUID  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from sqlalchemy.sql import functions  # noqa: E402
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_for_sqlite(type_, compiler, **kw):
+    # models use the Postgres UUID type; SQLite stores it as text
+    return "CHAR(36)"
+
+
+@compiles(functions.now, "sqlite")
+def _compile_now_for_sqlite(element, compiler, **kw):
+    # CURRENT_TIMESTAMP drops the microseconds SQLAlchemy writes for bound
+    # datetimes, which breaks (created_at, id) keyset comparisons
+    return "(strftime('%Y-%m-%d %H:%M:%f000', 'now'))"
+
+
+def make_pdf(pages: int, lines_per_page: int = 40) -> bytes:
+    """
+    Generate a text PDF with the given number of pages (no extra dependencies).
+    Each line reads like a guideline sentence so extraction does real work.
+    """
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # page tree, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+
+    for page in range(1, pages + 1):
+        lines = " ".join(
+            f"(Seite {page}, Absatz {line}: Antragsberechtigt sind kleine und mittlere Unternehmen "
+            f"mit Sitz in Deutschland.) '"
+            for line in range(1, lines_per_page + 1)
+        )
+        content = f"BT /F1 9 Tf 40 800 Td 11 TL {lines} ET".encode()
+        page_id = len(objects) + 1
+        page_ids.append(page_id)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n".encode() + content + b"\nendstream")
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return bytes(out)
@@ -0,0 +1,59 @@
+import threading
+import time
+
+import anyio
+import pytest
+from anyio import CapacityLimiter
+
+from app import concurrency
+from app.concurrency import run_blocking
+
+
+@pytest.mark.anyio
+async def test_run_blocking_runs_in_a_worker_thread():
+    loop_thread = threading.get_ident()
+
+    thread, value = await run_blocking(lambda x, y=0: (threading.get_ident(), x + y), 1, y=2)
+
+    assert thread != loop_thread
+    assert value == 3
+
+
+@pytest.mark.anyio
+async def test_event_loop_keeps_running_during_blocking_calls():
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await anyio.sleep(0.01)
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(ticker)
+        await run_blocking(time.sleep, 0.2)
+        tg.cancel_scope.cancel()
+
+    assert ticks >= 5
+
+
+@pytest.mark.anyio
+async def test_run_blocking_is_bounded(monkeypatch):
+    monkeypatch.setattr(concurrency, "_limiter", CapacityLimiter(2))
+    lock = threading.Lock()
+    running = peak = 0
+
+    def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(6):
+            tg.start_soon(run_blocking, work)
+
+    assert peak == 2
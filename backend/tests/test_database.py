@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config import DB_POOL_SIZE
+from app.database import AsyncSessionLocal, async_database_url, async_engine, insert_many_returning, pool_options
+from app.models import FundingProgram
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("postgresql://u:p@db:5432/innovo", "postgresql+asyncpg://u:p@db:5432/innovo"),
+        ("postgresql://u:p@db/innovo?sslmode=require", "postgresql+asyncpg://u:p@db/innovo?ssl=require"),
+        ("sqlite:///app.db?check_same_thread=false", "sqlite+aiosqlite:///app.db?check_same_thread=false"),
+    ],
+)
+def test_async_database_url(url, expected):
+    assert async_database_url(url) == expected
+
+
+def test_async_database_url_needs_a_known_driver():
+    with pytest.raises(RuntimeError):
+        async_database_url("mysql://u:p@db/innovo")
+
+
+def test_pool_options():
+    assert pool_options("postgresql+asyncpg://u:p@db/innovo")["pool_size"] == DB_POOL_SIZE
+    assert pool_options("sqlite+aiosqlite:///app.db")["poolclass"] is AsyncAdaptedQueuePool
+    assert pool_options("sqlite+aiosqlite://") == {}
+    assert pool_options("sqlite:///app.db") == {}
+
+
+@pytest.mark.anyio
+async def test_async_session_sees_committed_rows(db):
+    db.add(FundingProgram(title="Async", template_source="system", template_ref="wtt_v1"))
+    db.commit()
+
+    try:
+        async with AsyncSessionLocal() as session:
+            titles = (await session.execute(select(FundingProgram.title))).scalars().all()
+    finally:
+        # as the app lifespan does: pooled aiosqlite connections keep a thread each
+        await async_engine.dispose()
+
+    assert titles == ["Async"]
+
+
+def test_insert_many_returning(db):
+    rows = insert_many_returning(
+        db,
+        FundingProgram.__table__,
+        [{"title": title, "template_source": "system", "template_ref": "wtt_v1"} for title in ("A", "B")],
+        returning=[FundingProgram.id, FundingProgram.title],
+    )
+    db.commit()
+
+    assert [row.title for row in rows] == ["A", "B"]
+    assert rows[0].id < rows[1].id
+    assert insert_many_returning(db, FundingProgram.__table__, [], returning=[FundingProgram.id]) == []
@@ -0,0 +1,61 @@
+import re
+
+from app.extraction import cache
+from app.extraction.cache import find_extraction, get_or_create_extraction
+from app.extraction.pdf_text import EXTRACTOR_VERSION
+from app.extraction.worker import ExtractionWorkerPool
+from app.models import File, FundingProgramDocument, GuidelineExtraction
+from tests.support import make_pdf
+
+
+def _drain():
+    while ExtractionWorkerPool(workers=0).run_once():
+        pass
+
+
+def test_extractor_version_names_pypdf_and_revision():
+    assert re.fullmatch(r"pypdf-[\w.]+-r\d+", EXTRACTOR_VERSION)
+
+
+def test_same_pdf_is_extracted_once(client, auth_headers, upload_guidelines, db, monkeypatch):
+    calls = []
+    extract = cache.extract_text_from_pdf_bytes
+    monkeypatch.setattr(cache, "extract_text_from_pdf_bytes", lambda data: calls.append(data) or extract(data))
+    pdf = make_pdf(2)
+    programs = [
+        client.post(
+            "/funding-programs",
+            json={"title": f"Programm {n}", "template_source": "system", "template_ref": "wtt_v1"},
+            headers=auth_headers,
+        ).json()["id"]
+        for n in range(2)
+    ]
+
+    upload_guidelines(programs[0], {"richtlinie.pdf": pdf})
+    _drain()
+    (job,) = upload_guidelines(programs[1], {"kopie.pdf": pdf}).json()
+
+    # already extracted: the second program's document exists without a worker run
+    assert job["status"] == "succeeded"
+    assert len(calls) == 1
+    assert db.query(GuidelineExtraction).count() == 1
+    documents = db.query(FundingProgramDocument).order_by(FundingProgramDocument.id).all()
+    assert [d.funding_program_id for d in documents] == programs
+    assert documents[0].extraction_id == documents[1].extraction_id
+
+
+def test_other_extractor_versions_are_not_reused(funding_program, upload_guidelines, db, monkeypatch):
+    upload_guidelines(funding_program, {"richtlinie.pdf": make_pdf(1)})
+    file_obj = db.query(File).one()
+    stale = GuidelineExtraction(content_hash=file_obj.content_hash, extractor_version="pypdf-0.0.0-r0", text="alt")
+    db.add(stale)
+    db.commit()
+
+    assert find_extraction(db, file_obj.content_hash) is None
+    extraction = get_or_create_extraction(db, file_obj)
+    db.commit()
+
+    assert extraction.id != stale.id
+    assert extraction.extractor_version == EXTRACTOR_VERSION
+    assert "Antragsberechtigt" in extraction.text
+    assert get_or_create_extraction(db, file_obj).id == extraction.id
@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config import EXTRACTION_MAX_ATTEMPTS, EXTRACTION_RETRY_BACKOFF_SECONDS
+from app.database import SessionLocal
+from app.extraction import jobs
+from app.extraction.jobs import (
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    _add_document,
+    claim_next_job,
+    complete_job,
+    fail_job,
+    requeue_stale_jobs,
+    run_extraction_job,
+)
+from app.extraction.worker import ExtractionWorkerPool
+from app.models import FundingProgramDocument, GuidelineExtractionJob
+from tests.support import make_pdf
+
+
+def _job(db, job_id):
+    db.expire_all()
+    return db.get(GuidelineExtractionJob, job_id)
+
+
+@pytest.fixture
+def queued_job(funding_program, upload_guidelines):
+    response = upload_guidelines(funding_program, {"richtlinie.pdf": make_pdf(2)})
+    assert response.status_code == 202, response.text
+    (job,) = response.json()
+    assert job["status"] == JOB_QUEUED
+    return job["id"]
+
+
+def test_upload_queues_a_job_and_the_worker_runs_it(client, auth_headers, funding_program, queued_job, db):
+    assert ExtractionWorkerPool(workers=0).run_once() is True
+    assert ExtractionWorkerPool(workers=0).run_once() is False
+
+    job = _job(db, queued_job)
+    assert job.status == JOB_SUCCEEDED
+    assert job.attempts == 1
+    assert db.get(FundingProgramDocument, job.document_id).funding_program_id == funding_program
+
+    listed = client.get(f"/funding-programs/{funding_program}/guidelines/jobs", headers=auth_headers).json()
+    assert [(j["id"], j["status"]) for j in listed] == [(queued_job, JOB_SUCCEEDED)]
+
+
+def test_claim_is_exclusive(queued_job, db):
+    claimed = claim_next_job(db)
+
+    assert claimed.id == queued_job
+    assert claimed.status == JOB_RUNNING
+    assert claim_next_job(db) is None
+
+
+def test_failures_back_off_then_fail(queued_job, db):
+    for attempt in range(1, EXTRACTION_MAX_ATTEMPTS + 1):
+        job = _job(db, queued_job)
+        job.available_at = datetime.now(timezone.utc)
+        db.commit()
+
+        job = claim_next_job(db)
+        assert job.attempts == attempt
+        before = datetime.now(timezone.utc)
+        fail_job(db, job, "storage timeout")
+
+        job = _job(db, queued_job)
+        if attempt < EXTRACTION_MAX_ATTEMPTS:
+            assert job.status == JOB_QUEUED
+            backoff = EXTRACTION_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+            available_at = job.available_at.replace(tzinfo=timezone.utc)
+            assert available_at >= before.replace(microsecond=0) + timedelta(seconds=backoff - 1)
+            assert claim_next_job(db) is None
+        else:
+            assert job.status == JOB_FAILED
+            assert job.error == "storage timeout"
+
+
+def test_permanent_failure_and_manual_retry(client, auth_headers, funding_program, upload_guidelines, db):
+    (job,) = upload_guidelines(funding_program, {"scan.pdf": make_pdf(1, lines_per_page=0)}).json()
+
+    ExtractionWorkerPool(workers=0).run_once()
+    assert _job(db, job["id"]).status == JOB_FAILED
+
+    url = f"/funding-programs/{funding_program}/guidelines/jobs/{job['id']}/retry"
+    retried = client.post(url, headers=auth_headers)
+    assert retried.status_code == 200
+    assert retried.json()["status"] == JOB_QUEUED
+    assert retried.json()["attempts"] == 0
+    assert client.post(url, headers=auth_headers).status_code == 409
+
+
+def test_stale_running_jobs_are_requeued(queued_job, db, monkeypatch):
+    claim_next_job(db)
+    assert requeue_stale_jobs(db) == 0
+
+    monkeypatch.setattr(jobs, "EXTRACTION_STALE_SECONDS", -1)
+    assert requeue_stale_jobs(db) == 1
+    assert _job(db, queued_job).status == JOB_QUEUED
+
+
+def test_stale_jobs_out_of_attempts_fail(queued_job, db, monkeypatch):
+    job = claim_next_job(db)
+    job.attempts = EXTRACTION_MAX_ATTEMPTS
+    db.commit()
+
+    monkeypatch.setattr(jobs, "EXTRACTION_STALE_SECONDS", -1)
+    assert requeue_stale_jobs(db) == 0
+
+    job = _job(db, queued_job)
+    assert job.status == JOB_FAILED
+    assert job.finished_at is not None
+    assert "did not finish" in job.error
+    assert claim_next_job(db) is None
+
+
+def test_requeued_claim_cannot_complete(queued_job, db, monkeypatch):
+    # Worker A runs past the stale timeout; the job is requeued and
+    # worker B claims it while A is still running
+    job = claim_next_job(db)
+    monkeypatch.setattr(jobs, "EXTRACTION_STALE_SECONDS", -1)
+    other = SessionLocal()
+    try:
+        assert requeue_stale_jobs(other) == 1
+        reclaimed = claim_next_job(other)
+        assert reclaimed.attempts == 2
+
+        assert complete_job(db, job, run_extraction_job(db, job)) is False
+        assert fail_job(db, job, "too late") is False
+        assert _job(db, queued_job).status == JOB_RUNNING
+
+        assert complete_job(other, reclaimed, run_extraction_job(other, reclaimed)) is True
+    finally:
+        other.close()
+
+    job = _job(db, queued_job)
+    assert job.status == JOB_SUCCEEDED
+    assert job.error is None
+    assert db.query(FundingProgramDocument).count() == 1
+
+
+def test_same_file_attached_once(client, auth_headers, funding_program, upload_guidelines, db):
+    pdf = make_pdf(2)
+    (first,) = upload_guidelines(funding_program, {"richtlinie.pdf": pdf}).json()
+    ExtractionWorkerPool(workers=0).run_once()
+
+    first = _job(db, first["id"])
+    assert _add_document(db, first, db.get(FundingProgramDocument, first.document_id).extraction).id == first.document_id
+    db.rollback()
+
+    again = upload_guidelines(funding_program, {"kopie.pdf": pdf, "nochmal.pdf": pdf}).json()
+    assert [job["document_id"] for job in again] == [first.document_id] * 2
+    assert db.query(FundingProgramDocument).count() == 1
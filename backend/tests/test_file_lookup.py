@@ -0,0 +1,26 @@
+import hashlib
+
+
+def test_lookup_reports_existing_and_missing_hashes(client, auth_headers):
+    data = b"%PDF-1.4 guideline"
+    uploaded = client.post("/files/upload", files={"file": ("r.pdf", data, "application/pdf")}, headers=auth_headers)
+    known = hashlib.sha256(data).hexdigest()
+    unknown = hashlib.sha256(b"never uploaded").hexdigest()
+
+    response = client.post(
+        "/files/lookup",
+        json={"hashes": [known.upper(), unknown, f" {known} "]},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "existing": [{"content_hash": known, "file_id": uploaded.json()["file_id"]}],
+        "missing": [unknown],
+    }
+
+
+def test_lookup_rejects_invalid_hashes(client, auth_headers):
+    response = client.post("/files/lookup", json={"hashes": ["not-a-hash"]}, headers=auth_headers)
+    assert response.status_code == 400
+    assert "not-a-hash" in response.json()["detail"]
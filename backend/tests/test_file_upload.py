@@ -0,0 +1,50 @@
+import hashlib
+import io
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from app.models import File
+from app.storage.upload_stream import spool_upload
+
+
+@pytest.mark.anyio
+async def test_spool_upload_hashes_and_spools_in_chunks():
+    data = bytes(range(256)) * 1000
+    upload = UploadFile(file=io.BytesIO(data), filename="recording.wav")
+
+    with await spool_upload(upload, chunk_size=4096) as spooled:
+        assert spooled.content_hash == hashlib.sha256(data).hexdigest()
+        assert spooled.size_bytes == len(data)
+        assert spooled.file.read() == data
+    assert spooled.file.closed
+
+
+@pytest.mark.anyio
+async def test_spool_upload_of_empty_file():
+    with await spool_upload(UploadFile(file=io.BytesIO(b""), filename="empty.bin")) as spooled:
+        assert spooled.content_hash == hashlib.sha256(b"").hexdigest()
+        assert spooled.size_bytes == 0
+
+
+def test_upload_stores_content_once(client, auth_headers, storage, db):
+    data = b"RIFF" + b"\x00" * 300_000
+
+    first = client.post("/files/upload", files={"file": ("a.wav", data, "audio/wav")}, headers=auth_headers)
+    second = client.post("/files/upload", files={"file": ("b.wav", data, "audio/wav")}, headers=auth_headers)
+
+    assert first.status_code == 200 and second.status_code == 200
+    body = first.json()
+    assert body["content_hash"] == hashlib.sha256(data).hexdigest()
+    assert body["size_bytes"] == len(data)
+    assert body["file_type"] == "audio"
+    assert body["reused"] is False
+    assert second.json()["reused"] is True
+    assert second.json()["file_id"] == body["file_id"]
+    assert storage.download(body["storage_path"]) == data
+    assert db.query(File).count() == 1
+
+
+def test_upload_requires_authentication(client):
+    response = client.post("/files/upload", files={"file": ("a.wav", b"data", "audio/wav")})
+    assert response.status_code in (401, 403)
@@ -0,0 +1,53 @@
+import hashlib
+
+import pytest
+
+from app.db_profiler import profile_queries
+from app.models import File, FundingProgramDocument, GuidelineExtraction
+
+TEXT = "\n\n".join(f"{n}. Förderfähig sind Ausgaben für Beratungsleistungen – Stufe {n}." for n in range(2000))
+
+
+@pytest.fixture
+def document(db, funding_program):
+    content_hash = hashlib.sha256(TEXT.encode()).hexdigest()
+    file_obj = File(
+        content_hash=content_hash,
+        file_type="pdf",
+        storage_path=f"pdf/{content_hash[:2]}/{content_hash}",
+        size_bytes=1234,
+        mime_type="application/pdf",
+        original_filename="richtlinie.pdf",
+    )
+    extraction = GuidelineExtraction(content_hash=content_hash, extractor_version="test", text=TEXT)
+    db.add_all([file_obj, extraction])
+    db.flush()
+    doc = FundingProgramDocument(funding_program_id=funding_program, file_id=file_obj.id, extraction_id=extraction.id)
+    db.add(doc)
+    db.commit()
+    return doc.id
+
+
+def test_document_listing_does_not_load_text(client, auth_headers, funding_program, document):
+    with profile_queries() as profile:
+        response = client.get(f"/funding-programs/{funding_program}/documents", headers=auth_headers)
+
+    assert response.status_code == 200
+    (doc,) = response.json()
+    assert doc["id"] == document
+    assert doc["original_filename"] == "richtlinie.pdf"
+    assert doc["size_bytes"] == 1234
+    assert profile.count_matching(r"guideline_extraction") == 0, profile.report()
+
+
+def test_text_is_streamed(client, auth_headers, funding_program, document):
+    response = client.get(f"/funding-programs/{funding_program}/documents/{document}/text", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/plain; charset=utf-8"
+    assert int(response.headers["content-length"]) == len(TEXT.encode())
+    assert response.text == TEXT
+
+
+def test_text_of_another_programs_document(client, auth_headers, document):
+    assert client.get(f"/funding-programs/999/documents/{document}/text", headers=auth_headers).status_code == 404
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import FundingProgram
+
+
+@pytest.fixture
+def programs(db):
+    """
+    150 programs, several sharing a created_at so the keyset has ties to break.
+    """
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    db.add_all(
+        FundingProgram(
+            title=f"Programm {n:03d}",
+            template_source="system",
+            template_ref="wtt_v1",
+            created_at=base + timedelta(minutes=n // 4),
+        )
+        for n in range(150)
+    )
+    db.commit()
+    rows = db.query(FundingProgram.id).order_by(FundingProgram.created_at.desc(), FundingProgram.id.desc())
+    return [row.id for row in rows]
+
+
+def test_full_list_without_limit(client, auth_headers, programs):
+    response = client.get("/funding-programs", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert [p["id"] for p in response.json()] == programs
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_keyset_pages_cover_the_list_once(client, auth_headers, programs):
+    seen, params = [], {"limit": 40}
+    while True:
+        response = client.get("/funding-programs", params=params, headers=auth_headers)
+        page = [p["id"] for p in response.json()]
+        assert len(page) <= 40
+        seen += page
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": 40, "cursor": cursor}
+
+    assert seen == programs
+
+
+def test_cursor_alone_uses_the_default_page_size(client, auth_headers, programs):
+    first = client.get("/funding-programs", params={"limit": 10}, headers=auth_headers)
+    rest = client.get("/funding-programs", params={"cursor": first.headers["X-Next-Cursor"]}, headers=auth_headers)
+
+    assert [p["id"] for p in rest.json()] == programs[10:110]
+    assert "X-Next-Cursor" in rest.headers
+
+
+def test_invalid_cursor(client, auth_headers):
+    assert client.get("/funding-programs", params={"cursor": "bm9wZQ=="}, headers=auth_headers).status_code == 400
+
+
+def test_title_prefix_is_escaped(client, auth_headers, db, programs):
+    db.add(FundingProgram(title="100% Zuschuss", template_source="system", template_ref="wtt_v1"))
+    db.commit()
+
+    def titles(prefix):
+        response = client.get("/funding-programs", params={"title_prefix": prefix}, headers=auth_headers)
+        return [p["title"] for p in response.json()]
+
+    assert titles("100%") == ["100% Zuschuss"]
+    assert titles("Programm 14") == [f"Programm {n}" for n in range(149, 139, -1)]
+    assert titles("Programm_") == []
+
+
+def test_unchanged_listing_revalidates_with_304(client, auth_headers, programs):
+    first = client.get("/funding-programs", headers=auth_headers)
+    etag = first.headers["ETag"]
+
+    again = client.get("/funding-programs", headers={**auth_headers, "If-None-Match": etag})
+
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == etag
+    paged = client.get("/funding-programs", params={"limit": 10}, headers={**auth_headers, "If-None-Match": etag})
+    assert paged.status_code == 200
+
+
+@pytest.mark.parametrize("change", ["create", "update", "delete"])
+def test_changes_invalidate_the_etag(client, auth_headers, db, programs, change):
+    etag = client.get("/funding-programs", headers=auth_headers).headers["ETag"]
+
+    if change == "create":
+        client.post(
+            "/funding-programs",
+            json={"title": "Neu", "template_source": "system", "template_ref": "wtt_v1"},
+            headers=auth_headers,
+        )
+    elif change == "update":
+        # an older program, so neither count nor max(id) would notice
+        db.get(FundingProgram, programs[-1]).title = "Umbenannt"
+        db.commit()
+    else:
+        # also an older one, so max(updated_at) stays as it was
+        db.delete(db.get(FundingProgram, programs[-1]))
+        db.commit()
+
+    response = client.get("/funding-programs", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,71 @@
+import io
+import threading
+import time
+
+import pytest
+
+from app.models import File, GuidelineExtractionJob
+from app.routers import funding_programs
+from app.storage.upload_stream import SpooledUpload
+from tests.support import make_pdf
+
+
+def test_batch_stores_each_content_once(funding_program, upload_guidelines, storage, db):
+    first, second = make_pdf(1), make_pdf(2)
+
+    response = upload_guidelines(funding_program, {"a.pdf": first, "b.pdf": second, "a-kopie.pdf": first})
+
+    assert response.status_code == 202
+    jobs = response.json()
+    assert [job["status"] for job in jobs] == ["queued"] * 3
+    assert jobs[0]["file_id"] == jobs[2]["file_id"] != jobs[1]["file_id"]
+    assert db.query(File).count() == 2
+    assert len(storage._objects) == 2
+
+
+@pytest.mark.parametrize(
+    "invalid",
+    [("leer.pdf", b"", "application/pdf"), ("notizen.txt", b"text", "text/plain")],
+)
+def test_invalid_batch_stores_nothing(client, auth_headers, funding_program, storage, db, invalid):
+    files = [("files", ("a.pdf", make_pdf(1), "application/pdf")), ("files", invalid)]
+    response = client.post(f"/funding-programs/{funding_program}/guidelines/upload", files=files, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert storage._objects == {}
+    assert db.query(File).count() == 0
+    assert db.query(GuidelineExtractionJob).count() == 0
+
+
+def test_failed_store_rolls_back_the_batch(funding_program, upload_guidelines, storage, db, monkeypatch):
+    def failing_upload(path, stream, content_type):
+        raise ConnectionError("storage down")
+
+    monkeypatch.setattr(storage, "upload", failing_upload)
+    with pytest.raises(ConnectionError):
+        upload_guidelines(funding_program, {"a.pdf": make_pdf(1)})
+
+    assert db.query(File).count() == 0
+    assert db.query(GuidelineExtractionJob).count() == 0
+
+
+@pytest.mark.anyio
+async def test_spools_are_not_closed_while_a_store_still_reads(monkeypatch):
+    finished = threading.Event()
+
+    def store(stream, content_hash, mime_type):
+        if content_hash == "fails":
+            raise ConnectionError("storage down")
+        time.sleep(0.2)
+        stream.read()
+        finished.set()
+        return content_hash
+
+    monkeypatch.setattr(funding_programs, "store_file_content", store)
+    new_content = {
+        content_hash: (SpooledUpload(io.BytesIO(b"%PDF"), content_hash, 4), None) for content_hash in ("fails", "slow")
+    }
+
+    with pytest.raises(ConnectionError):
+        await funding_programs._store_new_content(new_content)
+    assert finished.is_set()
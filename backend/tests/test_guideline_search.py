@@ -0,0 +1,67 @@
+from app.extraction.worker import ExtractionWorkerPool
+from app.guideline_search import search_guidelines, snippet, term_pattern
+from tests.support import make_pdf
+
+TEXT = (
+    "Gegenstand der Förderung sind Vorhaben zur Digitalisierung. "
+    "Antragsberechtigt sind kleine und mittlere Unternehmen mit Sitz in Deutschland. "
+    "Die Zuwendung wird als nicht rückzahlbarer Zuschuss gewährt."
+)
+
+
+def test_search_finds_extracted_guidelines(client, auth_headers, funding_program, upload_guidelines):
+    upload_guidelines(funding_program, {"richtlinie.pdf": make_pdf(2)})
+    ExtractionWorkerPool(workers=0).run_once()
+
+    response = client.get("/funding-programs/search", params={"q": "antragsberechtigt"}, headers=auth_headers)
+
+    assert response.status_code == 200
+    (hit,) = response.json()
+    assert hit["funding_program_id"] == funding_program
+    assert hit["original_filename"] == "richtlinie.pdf"
+    assert "<b>Antragsberechtigt</b>" in hit["snippet"]
+
+
+def test_query_syntax_is_not_interpreted(client, auth_headers, funding_program):
+    for q in ('"Förderung', "Zuschuss OR (", "NEAR(a b)", "* -"):
+        response = client.get("/funding-programs/search", params={"q": q}, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json() == []
+
+
+def test_search_without_hits(db):
+    assert search_guidelines(db, "Zuschuss") == []
+
+
+def test_stems_match_inflections_and_umlauts():
+    terms = term_pattern(["forder", "zuwend"], prefix=True)
+
+    marked = snippet(TEXT, terms)
+
+    assert "<b>Förderung</b>" in marked
+    assert "<b>Zuwendung</b>" in marked
+    assert "<b>Vorhaben</b>" not in marked
+
+
+def test_whole_tokens_match_without_prefix():
+    terms = term_pattern(["gewahrt", "Zuschuss"], prefix=False)
+
+    assert terms.search("Zuschüsse") is None
+    assert terms.search("gewährt").group() == "gewährt"
+    assert terms.search("ZUSCHUSS")
+
+
+def test_snippet_window_around_the_first_match():
+    text = " ".join(f"wort{n}" for n in range(100)) + " Zuschuss " + " ".join(f"ende{n}" for n in range(100))
+
+    marked = snippet(text, term_pattern(["zuschuss"], prefix=False))
+
+    assert marked.startswith("…wort94 ")
+    assert marked.endswith("…")
+    assert "<b>Zuschuss</b>" in marked
+    assert len(marked.split()) == 24
+
+
+def test_snippet_without_match_starts_at_the_beginning():
+    assert snippet(TEXT, None).startswith("Gegenstand der Förderung")
+    assert snippet("", None) == ""
@@ -0,0 +1,75 @@
+import asyncio
+import hashlib
+import json
+import os
+
+import httpx
+import pytest
+
+from benchmarks.common import percentile
+from benchmarks.load_test import compare, run_scenario, unique_pdf
+
+from app.extraction.pdf_text import extract_text_from_pdf_bytes
+from tests.support import make_pdf
+
+
+@pytest.mark.anyio
+async def test_run_scenario_counts_errors_and_bounds_concurrency():
+    running = peak = 0
+
+    async def make_request(index):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        if index % 5 == 0:
+            raise httpx.ConnectError("refused")
+        return httpx.Response(404 if index % 5 == 1 else 200)
+
+    result = await run_scenario(20, 3, make_request)
+
+    assert result.requests == 20
+    assert result.errors == 8
+    assert peak == 3
+    assert result.p50_ms <= result.p99_ms <= result.max_ms
+    assert result.rss_peak_mb is None
+
+
+@pytest.mark.anyio
+async def test_run_scenario_samples_server_memory():
+    async def make_request(index):
+        await asyncio.sleep(0.02)
+        return httpx.Response(200)
+
+    result = await run_scenario(4, 2, make_request, server_pid=os.getpid())
+
+    assert 0 < result.rss_start_mb <= result.rss_peak_mb
+    assert result.rss_growth_mb == pytest.approx(result.rss_peak_mb - result.rss_start_mb, abs=0.11)
+
+
+def _scenario(p50, p99, throughput):
+    return {"p50_ms": p50, "p99_ms": p99, "throughput_rps": throughput}
+
+
+def test_compare_flags_regressions(tmp_path, capsys):
+    baseline = tmp_path / "main.json"
+    baseline.write_text(json.dumps({"scenarios": {"login": _scenario(10, 20, 100), "list_templates": _scenario(2, 4, 500)}}))
+
+    assert compare({"login": _scenario(11, 21, 95)}, str(baseline), max_regression=20) is True
+    assert compare({"list_templates": _scenario(2, 4, 300)}, str(baseline), max_regression=20) is False
+    assert "list_templates" in capsys.readouterr().out
+    assert compare({"new_scenario": _scenario(1, 1, 1)}, str(baseline), max_regression=0) is True
+
+
+def test_unique_pdfs_hash_differently_and_still_parse():
+    template = make_pdf(1)
+    first, second = unique_pdf(template), unique_pdf(template)
+
+    assert hashlib.sha256(first).digest() != hashlib.sha256(second).digest()
+    assert extract_text_from_pdf_bytes(first) == extract_text_from_pdf_bytes(template)
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert (percentile(values, 50), percentile(values, 99), percentile([], 50)) == (50, 99, 0.0)
@@ -0,0 +1,121 @@
+import time
+
+import bcrypt
+import pytest
+from starlette.requests import Request
+
+from app import login_throttle, password_hashing
+from app.config import PASSWORD_HASH_QUEUE_SIZE, PASSWORD_HASH_WORKERS
+from app.login_throttle import FailureBackoff, client_ip, email_failures, ip_attempts
+from app.models import User
+
+from tests.conftest import TEST_EMAIL, TEST_PASSWORD
+
+
+def _login(client, password=TEST_PASSWORD, email=TEST_EMAIL, headers=None):
+    return client.post("/auth/login", json={"email": email, "password": password}, headers=headers or {})
+
+
+def _request(peer, forwarded=None):
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded or []]
+    return Request({"type": "http", "headers": headers, "client": (peer, 50000)})
+
+
+def test_attempts_per_ip_are_limited(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(ip_attempts, "max_attempts", 3)
+    ip_attempts._attempts.clear()
+
+    statuses = [_login(client, email=f"user{n}@aiio.de").status_code for n in range(3)]
+    limited = _login(client)
+
+    assert statuses == [401, 401, 401]
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+
+
+def test_failures_slow_an_email_down_and_success_resets(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(email_failures, "max_attempts", 2)
+    monkeypatch.setattr(email_failures, "base_seconds", 30)
+
+    assert _login(client, "wrong").status_code == 401
+    assert _login(client).status_code == 200
+    assert TEST_EMAIL not in email_failures._attempts
+
+    assert [_login(client, "wrong").status_code for _ in range(2)] == [401, 401]
+    limited = _login(client)
+    assert limited.status_code == 429
+    assert 1 <= int(limited.headers["Retry-After"]) <= 30
+
+
+def test_backoff_doubles_up_to_the_maximum():
+    backoff = FailureBackoff(max_attempts=2, window_seconds=60, base_seconds=1, max_seconds=4)
+    waits = []
+    for _ in range(6):
+        waits.append(backoff.retry_after("victim@aiio.de"))
+        backoff.record("victim@aiio.de")
+
+    assert waits[:2] == [None, None]
+    assert [round(wait) for wait in waits[2:]] == [1, 2, 4, 4]
+    assert backoff.retry_after("other@aiio.de") is None
+
+
+def test_backoff_expires():
+    backoff = FailureBackoff(max_attempts=0, window_seconds=60, base_seconds=0.02, max_seconds=1)
+    backoff.record("victim@aiio.de")
+
+    assert backoff.retry_after("victim@aiio.de") is not None
+    time.sleep(0.06)
+    assert backoff.retry_after("victim@aiio.de") is None
+
+
+@pytest.mark.parametrize(
+    "hops, forwarded, expected",
+    [
+        (0, ["203.0.113.7"], "10.0.0.1"),
+        (1, [], "10.0.0.1"),
+        (1, ["203.0.113.7"], "203.0.113.7"),
+        (1, ["198.51.100.1, 203.0.113.7"], "203.0.113.7"),
+        (2, ["198.51.100.1, 203.0.113.7", "10.0.0.9"], "203.0.113.7"),
+        (3, ["203.0.113.7"], "203.0.113.7"),
+    ],
+)
+def test_client_ip_behind_trusted_proxies(monkeypatch, hops, forwarded, expected):
+    monkeypatch.setattr(login_throttle, "TRUSTED_PROXY_HOPS", hops)
+
+    assert client_ip(_request("10.0.0.1", forwarded)) == expected
+
+
+def test_clients_behind_the_proxy_are_limited_separately(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(login_throttle, "TRUSTED_PROXY_HOPS", 1)
+    monkeypatch.setattr(ip_attempts, "max_attempts", 2)
+    ip_attempts._attempts.clear()
+
+    for _ in range(2):
+        _login(client, "wrong", headers={"X-Forwarded-For": "203.0.113.7"})
+
+    assert _login(client, "wrong", headers={"X-Forwarded-For": "203.0.113.7"}).status_code == 429
+    # a spoofed left-most entry does not escape the limit
+    spoofed = {"X-Forwarded-For": "1.2.3.4, 203.0.113.7"}
+    assert _login(client, "wrong", headers=spoofed).status_code == 429
+    assert _login(client, headers={"X-Forwarded-For": "198.51.100.1"}).status_code == 200
+
+
+def test_busy_hashing_turns_logins_away(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(password_hashing, "_pending", PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE)
+
+    response = _login(client)
+
+    assert response.status_code == 429
+    assert response.json()["detail"] == "Server busy. Try again shortly."
+    assert email_failures.retry_after(TEST_EMAIL) is None
+
+
+def test_login_upgrades_the_hash_cost(client, auth_headers, db):
+    user = db.get(User, TEST_EMAIL)
+    user.password_hash = bcrypt.hashpw(TEST_PASSWORD.encode(), bcrypt.gensalt(rounds=5)).decode()
+    db.commit()
+
+    assert _login(client).status_code == 200
+
+    db.expire_all()
+    assert db.get(User, TEST_EMAIL).password_hash.startswith("$2b$04$")
@@ -0,0 +1,98 @@
+import re
+
+import pytest
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app import main
+from app.metrics import Histogram, TimingMiddleware, file_dedup, request_duration, server_timing
+
+
+def test_upload_reports_stages_in_server_timing(client, auth_headers):
+    response = client.post("/files/upload", files={"file": ("a.wav", b"RIFF" * 100, "audio/wav")}, headers=auth_headers)
+
+    entries = dict(re.findall(r"(\w+);dur=([\d.]+)", response.headers["Server-Timing"]))
+    assert {"spool_hash", "db_lookup", "storage_upload", "db_write", "total"} <= set(entries)
+    assert float(entries["total"]) >= float(entries["spool_hash"])
+
+
+def test_requests_are_recorded_by_route_template(client, auth_headers, funding_program):
+    client.get(f"/funding-programs/{funding_program}/documents", headers=auth_headers)
+    client.get("/funding-programs/12345/documents", headers=auth_headers)
+    client.get("/nirgends")
+
+    routes = {values[1] for values in request_duration._series}
+    assert "/funding-programs/{funding_program_id}/documents" in routes
+    assert "/auth/login" in routes
+    assert "unmatched" in routes
+    assert not any("12345" in route for route in routes)
+
+
+def test_mounted_routes_are_labelled_with_the_full_path():
+    router = APIRouter(prefix="/programs")
+    router.add_api_route("/{program_id}/items/{item_id}", lambda program_id, item_id: {})
+    inner = FastAPI()
+    inner.include_router(router, prefix="/bund")
+    outer = FastAPI()
+    outer.add_middleware(TimingMiddleware, routes=outer.routes)
+    outer.mount("/api/v2", inner)
+
+    TestClient(outer).get("/api/v2/bund/programs/7/items/7")
+
+    routes = {values[1] for values in request_duration._series}
+    assert "/api/v2/bund/programs/{program_id}/items/{item_id}" in routes
+    assert not any("/7" in route for route in routes)
+
+
+@pytest.fixture
+def metrics_token(monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", "scrape-secret")
+    return {"Authorization": "Bearer scrape-secret"}
+
+
+def test_metrics_endpoint_renders_prometheus_text(client, auth_headers, metrics_token):
+    hits = file_dedup.value("hit")
+    for _ in range(2):
+        client.post("/files/upload", files={"file": ("a.wav", b"same", "audio/wav")}, headers=auth_headers)
+
+    response = client.get("/metrics", headers=metrics_token)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE innovo_http_request_duration_seconds histogram" in response.text
+    assert f'innovo_file_dedup_total{{result="hit"}} {hits + 1}' in response.text
+    assert "innovo_http_requests_in_flight 1" in response.text
+
+
+def test_metrics_endpoint_requires_the_token(client, auth_headers, metrics_token):
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    # a user's login token is not a metrics token
+    response = client.get("/metrics", headers=auth_headers)
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+def test_metrics_endpoint_is_off_without_a_token(client, metrics_token, monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", "")
+    assert client.get("/metrics", headers=metrics_token).status_code == 404
+
+
+def test_server_timing_sums_repeated_stages():
+    assert server_timing([("db", 0.001), ("hash", 0.002), ("db", 0.003)], 0.01) == (
+        "db;dur=4.0, hash;dur=2.0, total;dur=10.0"
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Test", labels=("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "a")
+
+    lines = histogram.render()
+
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="a",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{stage="a"} 3' in lines
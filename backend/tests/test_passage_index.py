@@ -0,0 +1,74 @@
+from app.extraction.worker import ExtractionWorkerPool
+from app.retrieval.bm25 import PassageIndex, PassageIndexRegistry, tokenize
+from app.retrieval.passages import split_passages
+from tests.support import make_pdf
+
+ELIGIBILITY = "Antragsberechtigt sind kleine und mittlere Unternehmen mit Sitz in Deutschland."
+FUNDING = "Die Förderquote beträgt bis zu 50 Prozent der zuwendungsfähigen Ausgaben."
+DEADLINE = "Anträge sind bis zum 31. März einzureichen. Verspätete Anträge werden nicht berücksichtigt."
+
+
+def test_tokenize_drops_stopwords_keeps_section_numbers():
+    assert tokenize("Die Förderung nach 2.3 ist für KMU") == ["förderung", "2", "3", "kmu"]
+
+
+def test_split_passages_merges_short_and_splits_long_paragraphs():
+    text = "1. Zweck\n\n" + ELIGIBILITY + "\n\n" + " ".join([FUNDING] * 40)
+
+    passages = split_passages(text, max_chars=400, min_chars=100)
+
+    assert passages[0].startswith("1. Zweck\nAntragsberechtigt")
+    assert all(len(p) <= 400 for p in passages)
+    assert "".join(passages).count("Förderquote") == 40
+
+
+def test_best_passage_first():
+    # long enough that each paragraph stays a passage of its own
+    padding = " Weitere Angaben enthält die Anlage zu dieser Richtlinie." * 4
+    index = PassageIndex()
+    index.add_document(1, "\n\n".join(p + padding for p in (ELIGIBILITY, FUNDING, DEADLINE)))
+
+    (score, best), *rest = index.search("Wie hoch ist die Förderquote?", k=3)
+
+    assert "Förderquote" in best.text
+    assert all(other_score < score for other_score, _ in rest)
+    assert index.search("und die der", k=3) == []
+
+
+def test_documents_are_added_once_and_removed_completely():
+    index = PassageIndex()
+    index.add_document(1, ELIGIBILITY)
+    index.add_document(1, ELIGIBILITY)
+    index.add_document(2, FUNDING)
+    assert len(index) == 2
+
+    index.remove_document(1)
+
+    assert index.document_ids == {2}
+    assert index.search("Unternehmen") == []
+    assert [p.document_id for _, p in index.search("Förderquote")] == [2]
+
+
+def test_passage_endpoint_indexes_new_documents(client, auth_headers, funding_program, upload_guidelines):
+    url = f"/funding-programs/{funding_program}/passages"
+    assert client.get(url, params={"q": "Unternehmen"}, headers=auth_headers).json() == []
+
+    upload_guidelines(funding_program, {"richtlinie.pdf": make_pdf(2)})
+    ExtractionWorkerPool(workers=0).run_once()
+    hits = client.get(url, params={"q": "Unternehmen Deutschland", "k": 2}, headers=auth_headers).json()
+
+    assert len(hits) == 2
+    assert hits[0]["score"] >= hits[1]["score"] > 0
+    assert "Unternehmen" in hits[0]["text"]
+    assert client.get("/funding-programs/999/passages", params={"q": "x y"}, headers=auth_headers).status_code == 404
+
+
+def test_registry_keeps_the_most_recent_programs(db):
+    registry = PassageIndexRegistry(max_programs=2)
+    first = registry.get_index(db, 1)
+    registry.get_index(db, 2)
+    registry.get_index(db, 1)
+    registry.get_index(db, 3)
+
+    assert registry.get_index(db, 1) is first
+    assert set(registry._indexes) == {1, 3}
@@ -0,0 +1,39 @@
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.extraction import pdf_text
+from app.extraction.pdf_text import extract_text_from_pdf_bytes, shutdown_extraction_pool, split_page_ranges
+from tests.support import make_pdf
+
+
+@pytest.mark.parametrize("page_count, processes", [(1, 4), (7, 4), (40, 2), (100, 4), (333, 8)])
+def test_page_ranges_cover_every_page_in_order(page_count, processes):
+    ranges = split_page_ranges(page_count, processes)
+
+    assert ranges[0][0] == 0 and ranges[-1][1] == page_count
+    assert all(stop == next_start for (_, stop), (next_start, _) in zip(ranges, ranges[1:]))
+    assert len(ranges) <= processes * 2
+    assert max(stop - start for start, stop in ranges) - min(stop - start for start, stop in ranges) <= 1
+
+
+def test_parallel_extraction_matches_serial(monkeypatch):
+    monkeypatch.setattr(pdf_text, "PDF_EXTRACTION_PROCESSES", 2)
+    pdf = make_pdf(24, lines_per_page=5)
+    try:
+        parallel = extract_text_from_pdf_bytes(pdf, parallel=True)
+    finally:
+        shutdown_extraction_pool()
+
+    assert parallel == extract_text_from_pdf_bytes(pdf, parallel=False)
+    assert parallel.index("Seite 1,") < parallel.index("Seite 12,") < parallel.index("Seite 24,")
+
+
+def test_broken_pool_falls_back_to_serial(monkeypatch):
+    def broken(pdf_bytes, page_count):
+        raise BrokenProcessPool()
+
+    monkeypatch.setattr(pdf_text, "_extract_parallel", broken)
+    pdf = make_pdf(3, lines_per_page=2)
+
+    assert extract_text_from_pdf_bytes(pdf, parallel=True) == extract_text_from_pdf_bytes(pdf, parallel=False)
@@ -0,0 +1,67 @@
+import time
+
+from app.db_profiler import profile_queries
+from app.models import User
+from app.principal_cache import PrincipalCache, principal_cache
+
+from tests.conftest import TEST_EMAIL
+
+
+def _users_queries(client, headers):
+    with profile_queries() as profile:
+        response = client.get("/funding-programs", headers=headers)
+    assert response.status_code == 200
+    return profile.count_matching(r"FROM users\b")
+
+
+def test_authenticated_user_is_looked_up_once_per_token(client, auth_headers):
+    assert _users_queries(client, auth_headers) == 1
+    assert _users_queries(client, auth_headers) == 0
+    assert principal_cache.stats()["entries"] == 1
+
+
+def test_password_change_drops_cached_tokens(client, auth_headers, db):
+    _users_queries(client, auth_headers)
+
+    db.get(User, TEST_EMAIL).password_hash = "changed"
+    db.commit()
+
+    assert principal_cache.stats()["entries"] == 0
+    assert _users_queries(client, auth_headers) == 1
+
+
+def test_deleted_user_is_rejected(client, auth_headers, db):
+    _users_queries(client, auth_headers)
+
+    db.delete(db.get(User, TEST_EMAIL))
+    db.commit()
+
+    response = client.get("/funding-programs", headers=auth_headers)
+    assert response.status_code == 401
+
+
+def test_entries_expire_with_ttl_or_token():
+    user = User(email="a@innovo-consulting.de", password_hash="x")
+    cache = PrincipalCache(max_entries=10, ttl_seconds=0.05)
+
+    cache.put("token", user)
+    assert cache.get("token") is user
+    time.sleep(0.06)
+    assert cache.get("token") is None
+
+    cache.put("expired", user, token_expires_at=time.time() - 1)
+    assert cache.get("expired") is None
+
+
+def test_least_recently_used_are_evicted():
+    cache = PrincipalCache(max_entries=2, ttl_seconds=60)
+    users = [User(email=f"{n}@aiio.de", password_hash="x") for n in range(3)]
+
+    cache.put("t0", users[0])
+    cache.put("t1", users[1])
+    cache.get("t0")
+    cache.put("t2", users[2])
+
+    assert cache.get("t1") is None
+    assert cache.get("t0") is users[0]
+    assert cache.stats() == {"hits": 2, "misses": 1, "entries": 2}
@@ -0,0 +1,90 @@
+"""
+Statement counts of the hot endpoints, independent of how much data they return.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db_profiler import QueryProfile, QueryProfilerMiddleware, parameter_shape, profile_queries, statement_shape
+from app.extraction.worker import ExtractionWorkerPool
+from app.main import app
+from app.models import FundingProgram
+from tests.support import make_pdf
+
+
+@pytest.fixture(params=[1, 12], ids=["few", "many"])
+def size(request):
+    return request.param
+
+
+def _profile(client, method, url, headers, **kwargs):
+    # The first authenticated request also looks the user up; measure the rest
+    client.get("/templates/list", headers=headers)
+    with profile_queries() as profile:
+        response = client.request(method, url, headers=headers, **kwargs)
+    assert response.status_code == 200, response.text
+    return profile
+
+
+def test_listing(client, auth_headers, db, size):
+    db.add_all(FundingProgram(title=f"P{n}", template_source="system", template_ref="wtt_v1") for n in range(size))
+    db.commit()
+
+    profile = _profile(client, "GET", "/funding-programs", auth_headers)
+    assert profile.count == 2, profile.report()
+
+    etag = client.get("/funding-programs", headers=auth_headers).headers["ETag"]
+    with profile_queries() as revalidation:
+        assert client.get("/funding-programs", headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+    assert revalidation.count == 1, revalidation.report()
+
+
+def test_documents_load_files_in_one_query(client, auth_headers, funding_program, upload_guidelines, size):
+    upload_guidelines(funding_program, {f"{n}.pdf": make_pdf(1, lines_per_page=n + 1) for n in range(size)})
+    while ExtractionWorkerPool(workers=0).run_once():
+        pass
+
+    profile = _profile(client, "GET", f"/funding-programs/{funding_program}/documents", auth_headers)
+
+    assert profile.count == 2, profile.report()
+    assert profile.count_matching(r"FROM files WHERE files\.id IN") == 1
+
+
+def test_resolve_batch(client, auth_headers, create_user_template, db, size):
+    templates = [create_user_template(f"Vorlage {n}", ["Ziele", "Budget"]) for n in range(size)]
+    programs = [FundingProgram(title=f"S{n}", template_source="system", template_ref="wtt_v1") for n in range(size)]
+    programs += [FundingProgram(title=f"U{n}", template_source="user", template_ref=t) for n, t in enumerate(templates)]
+    db.add_all(programs)
+    db.commit()
+    payload = {"funding_program_ids": [p.id for p in programs]}
+
+    profile = _profile(client, "POST", "/templates/resolve-batch", auth_headers, json=payload)
+
+    assert profile.count == 2, profile.report()
+    assert profile.count_matching(r"FROM user_templates") == 1
+
+
+def test_statement_and_parameter_shapes():
+    assert statement_shape("SELECT *\n  FROM files WHERE id IN (?, ?, ?)") == "SELECT * FROM files WHERE id IN (...)"
+    assert statement_shape("WHERE id IN ($1, $2)") == statement_shape("WHERE id IN ($1, $2, $3, $4)")
+    assert parameter_shape({"email": "a@aiio.de", "n": 1}) == "{email: str, n: int}"
+    assert parameter_shape([("a", 1), ("b", 2)], executemany=True) == "2 x (str, int)"
+
+
+def test_middleware_reports_statement_counts(auth_headers):
+    with TestClient(QueryProfilerMiddleware(app)) as client:
+        client.get("/templates/list", headers=auth_headers)
+        response = client.get("/funding-programs", headers=auth_headers)
+
+    assert response.headers["X-DB-Statements"] == "2"
+    assert float(response.headers["X-DB-Time-Ms"]) >= 0
+
+
+def test_repeated_shapes_are_flagged():
+    profile = QueryProfile()
+    for _ in range(5):
+        profile.record(statement_shape("SELECT * FROM users WHERE id = ?"), 0.001, None)
+    profile.record("SELECT * FROM files", 0.001, None)
+
+    assert profile.repeated(threshold=5) == [("SELECT * FROM users WHERE id = ?", 5)]
+    assert profile.count_matching(r"FROM users\b") == 5
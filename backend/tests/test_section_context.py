@@ -0,0 +1,52 @@
+from app.extraction.worker import ExtractionWorkerPool
+from app.models import FundingProgram, FundingProgramSectionContext
+from app.retrieval import section_context
+from app.retrieval.section_context import get_section_contexts, section_query, template_fingerprint
+from app.template_resolver import resolve_template_for_funding_program
+from tests.support import make_pdf
+
+
+def test_section_numbers_are_not_queried():
+    assert section_query("2.3. Aufgaben und Arbeitspakete") == "Aufgaben und Arbeitspakete"
+    assert section_query("1 Angaben") == "Angaben"
+    assert section_query("Anlage 2") == "Anlage 2"
+
+
+def test_template_sections_carry_guideline_context(client, auth_headers, funding_program, upload_guidelines, monkeypatch):
+    url = f"/funding-programs/{funding_program}/template"
+    empty = client.get(url, headers=auth_headers).json()
+    assert all(section["guideline_context"] == [] for section in empty["sections"])
+
+    upload_guidelines(funding_program, {"richtlinie.pdf": make_pdf(2)})
+    ExtractionWorkerPool(workers=0).run_once()
+    # the worker rematerialized the contexts after attaching the document;
+    # reading the template only loads them
+    materialized = []
+    materialize = section_context.materialize_section_contexts
+    monkeypatch.setattr(
+        section_context, "materialize_section_contexts", lambda *args: materialized.append(1) or materialize(*args)
+    )
+
+    sections = client.get(url, headers=auth_headers).json()["sections"]
+    company = next(section for section in sections if section["id"] == "1")
+    assert company["guideline_context"]
+    assert "Unternehmen" in company["guideline_context"][0]["text"]
+    assert materialized == []
+
+
+def test_new_documents_and_template_changes_invalidate(funding_program, upload_guidelines, db):
+    fp = db.get(FundingProgram, funding_program)
+    template = resolve_template_for_funding_program(db, fp)
+    assert all(passages == [] for passages in get_section_contexts(db, fp, template).values())
+
+    upload_guidelines(funding_program, {"richtlinie.pdf": make_pdf(1)})
+    ExtractionWorkerPool(workers=0).run_once()
+    db.expire_all()
+    assert get_section_contexts(db, fp, template)["1"]
+
+    renamed = {**template, "sections": [{**template["sections"][0], "title": "Neuer Titel"}, *template["sections"][1:]]}
+    assert get_section_contexts(db, fp, renamed)["1"] == []
+    db.expire_all()
+    assert {row.template_fingerprint for row in db.query(FundingProgramSectionContext)} == {
+        template_fingerprint(renamed)
+    }
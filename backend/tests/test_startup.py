@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+from app import warmup
+
+
+def test_app_import_leaves_heavy_libraries_unloaded():
+    code = (
+        "import sys, tests.support, app.main; "
+        "print(sorted(m for m in ('supabase', 'storage3', 'pypdf', 'httpx') if m in sys.modules))"
+    )
+    env = {**os.environ, "STORAGE_BACKEND": "supabase"}
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env,
+        cwd=os.path.dirname(os.path.dirname(__file__)),
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_warm_up_imports_the_lazy_libraries(monkeypatch):
+    monkeypatch.setattr(warmup, "warmup_timings", {})
+
+    warmup.warm_up()
+
+    assert "pypdf" in sys.modules
+    assert set(warmup.warmup_timings) == {"pypdf", "total"}
+    assert warmup.warmup_timings["total"] >= warmup.warmup_timings["pypdf"]
+
+
+def test_warm_up_is_off_when_disabled(monkeypatch):
+    monkeypatch.setattr(warmup, "STARTUP_WARMUP", False)
+    monkeypatch.setattr(warmup, "_thread", None)
+
+    warmup.start_warmup()
+
+    assert warmup._thread is None
@@ -0,0 +1,69 @@
+import io
+
+import pytest
+
+from app.storage.backends import (
+    InMemoryStorageBackend,
+    LocalStorageBackend,
+    build_storage_path,
+    create_storage_backend,
+    get_storage_backend,
+    set_storage_backend,
+)
+
+HASH = "ab" + "0" * 62
+
+
+@pytest.fixture(params=["local", "memory"])
+def backend(request, tmp_path):
+    if request.param == "local":
+        return LocalStorageBackend(str(tmp_path))
+    return InMemoryStorageBackend()
+
+
+def test_storage_path_is_sharded_by_hash():
+    assert build_storage_path("pdf", HASH) == f"pdf/ab/{HASH}"
+
+
+def test_round_trip(backend):
+    path = build_storage_path("pdf", HASH)
+    assert not backend.exists(path)
+
+    backend.upload(path, io.BytesIO(b"guideline"), "application/pdf")
+    assert backend.exists(path)
+    assert backend.download(path) == b"guideline"
+
+    backend.upload(path, io.BytesIO(b"same path again"), "application/pdf")
+    assert backend.download(path) == b"same path again"
+
+    backend.delete(path)
+    assert not backend.exists(path)
+    backend.delete(path)
+
+
+def test_download_of_missing_object(backend):
+    with pytest.raises(FileNotFoundError):
+        backend.download(build_storage_path("pdf", HASH))
+
+
+def test_local_backend_leaves_no_temp_files(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path))
+    backend.upload(build_storage_path("audio", HASH), io.BytesIO(b"x" * 100_000), "audio/wav")
+
+    assert [p.name for p in (tmp_path / "audio" / "ab").iterdir()] == [HASH]
+
+
+def test_local_backend_rejects_paths_outside_root(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path / "root"))
+    with pytest.raises(ValueError):
+        backend.upload("../outside", io.BytesIO(b"x"), "application/pdf")
+
+
+def test_backend_selection():
+    assert isinstance(create_storage_backend("memory"), InMemoryStorageBackend)
+    with pytest.raises(RuntimeError):
+        create_storage_backend("s3")
+
+    backend = InMemoryStorageBackend()
+    set_storage_backend(backend)
+    assert get_storage_backend() is backend
@@ -0,0 +1,69 @@
+import pytest
+
+from app.storage import supabase_client
+from app.storage.supabase_client import LatencyStats, build_http_client, create_supabase_client
+
+SUPABASE_URL = "https://example.supabase.co"
+SUPABASE_KEY = "service-role-key-" + "0" * 32
+
+
+@pytest.fixture
+def shared_client(monkeypatch):
+    monkeypatch.setattr(
+        supabase_client,
+        "create_supabase_client",
+        lambda http_client: create_supabase_client(SUPABASE_URL, SUPABASE_KEY, http_client=http_client),
+    )
+    supabase_client.close_supabase_client()
+    yield
+    supabase_client.close_supabase_client()
+
+
+def test_http_client_matches_supabase_defaults():
+    http_client = build_http_client(pool_size=3)
+    try:
+        assert http_client.follow_redirects is True
+        assert http_client._transport._pool._max_connections == 3
+    finally:
+        http_client.close()
+
+
+def test_storage_uses_the_pooled_http_client():
+    http_client = build_http_client()
+    try:
+        client = create_supabase_client(SUPABASE_URL, SUPABASE_KEY, http_client=http_client)
+        assert client.storage.session is http_client
+        assert client.storage.from_("innovo-files")._client is http_client
+    finally:
+        http_client.close()
+
+
+def test_one_client_per_process(shared_client):
+    client = supabase_client.get_supabase_client()
+    http_client = supabase_client._http_client
+
+    assert supabase_client.init_supabase_client() is client
+    assert supabase_client.get_supabase_client() is client
+
+    supabase_client.close_supabase_client()
+    assert http_client.is_closed
+    assert supabase_client.get_supabase_client() is not client
+
+
+def test_missing_credentials_fail_fast():
+    with pytest.raises(RuntimeError):
+        create_supabase_client(None, None)
+
+
+def test_latency_stats():
+    stats = LatencyStats()
+    stats.record(0.01)
+    stats.record(0.03)
+    with stats.measure():
+        pass
+
+    snapshot = stats.snapshot()
+    assert snapshot["count"] == 3
+    assert snapshot["max_ms"] == pytest.approx(30)
+    stats.reset()
+    assert stats.snapshot()["count"] == 0
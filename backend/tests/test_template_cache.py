@@ -0,0 +1,64 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.db_profiler import profile_queries
+from app.models import FundingProgram, UserTemplate
+from app.template_resolver import resolve_template_for_funding_program
+from app.templates.template_cache import FROZEN_SYSTEM_TEMPLATES, copy_template, freeze, get_user_template
+
+
+def test_frozen_templates_are_read_only():
+    frozen = freeze({"sections": [{"id": "1", "title": "Ziel", "meta": {"tags": ["a"]}}]})
+
+    with pytest.raises(TypeError):
+        frozen["sections"] = []
+    with pytest.raises(TypeError):
+        frozen["sections"][0]["title"] = "Anders"
+    assert frozen["sections"][0]["meta"]["tags"] == ("a",)
+
+
+def test_resolved_templates_are_the_callers_to_edit(db):
+    program = FundingProgram(title="P", template_source="system", template_ref="wtt_v1")
+    original_title = FROZEN_SYSTEM_TEMPLATES["wtt_v1"]["sections"][0]["title"]
+
+    resolved = resolve_template_for_funding_program(db, program)
+    resolved["sections"][0]["title"] = "Geändert"
+    resolved["sections"].append({"id": "99"})
+
+    assert FROZEN_SYSTEM_TEMPLATES["wtt_v1"]["sections"][0]["title"] == original_title
+    assert copy_template(FROZEN_SYSTEM_TEMPLATES["wtt_v1"])["sections"] != resolved["sections"]
+
+
+def test_unknown_templates(db):
+    with pytest.raises(HTTPException) as system:
+        resolve_template_for_funding_program(db, FundingProgram(template_source="system", template_ref="nope"))
+    with pytest.raises(HTTPException) as user:
+        resolve_template_for_funding_program(
+            db, FundingProgram(template_source="user", template_ref="00000000-0000-0000-0000-000000000000")
+        )
+    assert (system.value.status_code, user.value.status_code) == (500, 404)
+
+
+def test_user_template_is_parsed_once_per_version(create_user_template, db):
+    template_id = create_user_template("Eigene Vorlage", ["Ziele", "Budget"])
+
+    first = get_user_template(db, template_id)
+    with profile_queries() as profile:
+        again = get_user_template(db, template_id)
+
+    assert again is first
+    assert [s["title"] for s in first["sections"]] == ["Ziele", "Budget"]
+    assert profile.count_matching(r"user_templates\.sections") == 0, profile.report()
+
+    template = db.query(UserTemplate).filter(UserTemplate.id == template_id).one()
+    template.sections = json.dumps(["Ziele", "Zeitplan"])
+    db.commit()
+
+    updated = get_user_template(db, template_id)
+    assert [s["title"] for s in updated["sections"]] == ["Ziele", "Zeitplan"]
+
+    db.delete(template)
+    db.commit()
+    assert get_user_template(db, template_id) is None
@@ -0,0 +1,98 @@
+from sqlalchemy import update
+
+from app.db_profiler import profile_queries
+from app.models import User, UserTemplate
+from app.templates import list_cache
+from app.templates.list_cache import template_list_cache
+
+from tests.conftest import TEST_EMAIL
+
+
+def _list(client, headers, etag=None):
+    return client.get("/templates/list", headers={**headers, **({"If-None-Match": etag} if etag else {})})
+
+
+def test_list_revalidates_with_etag(client, auth_headers, create_user_template):
+    create_user_template("Eigene Vorlage", ["Ziele"])
+
+    response = _list(client, auth_headers)
+    etag = response.headers["ETag"]
+
+    assert response.status_code == 200
+    assert etag.startswith('"') and etag.endswith('"')
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert [t["name"] for t in response.json()["user"]] == ["Eigene Vorlage"]
+    assert {t["source"] for t in response.json()["system"]} == {"system"}
+
+    revalidated = _list(client, auth_headers, f'"other", {etag}')
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+
+
+def test_fresh_list_is_served_without_queries(client, auth_headers):
+    _list(client, auth_headers)
+
+    with profile_queries() as profile:
+        _list(client, auth_headers)
+
+    assert profile.count_matching(r"user_templates|template_version") == 0, profile.report()
+
+
+def test_own_writes_invalidate_right_away(client, auth_headers, create_user_template, db):
+    etag = _list(client, auth_headers).headers["ETag"]
+
+    template_id = create_user_template("Neu", ["Ziele"])
+    created = _list(client, auth_headers, etag)
+    assert created.status_code == 200
+    assert [t["id"] for t in created.json()["user"]] == [template_id]
+
+    template = db.query(UserTemplate).filter(UserTemplate.id == template_id).one()
+    template.name = "Umbenannt"
+    db.commit()
+    renamed = _list(client, auth_headers, created.headers["ETag"])
+    assert [t["name"] for t in renamed.json()["user"]] == ["Umbenannt"]
+
+    db.delete(template)
+    db.commit()
+    assert _list(client, auth_headers, renamed.headers["ETag"]).json()["user"] == []
+
+
+def test_stale_entries_check_the_version_only(client, auth_headers, db, monkeypatch):
+    monkeypatch.setattr(template_list_cache, "fresh_seconds", 0)
+    etag = _list(client, auth_headers).headers["ETag"]
+
+    with profile_queries() as profile:
+        assert _list(client, auth_headers, etag).status_code == 304
+    assert profile.count_matching(r"template_version") == 1
+    assert profile.count_matching(r"FROM user_templates") == 0, profile.report()
+
+    # a write by another process: only the version moves
+    db.execute(update(User).where(User.email == TEST_EMAIL).values(template_version=User.template_version + 1))
+    db.commit()
+    assert _list(client, auth_headers, etag).status_code == 200
+
+
+def test_lists_are_cached_per_user(client, auth_headers, create_user_template):
+    create_user_template("Meine", ["Ziele"])
+    other_email = "kollegin@aiio.de"
+    client.post("/auth/register", json={"email": other_email, "password": "password"})
+    token = client.post("/auth/login", json={"email": other_email, "password": "password"}).json()["access_token"]
+    other = {"Authorization": f"Bearer {token}"}
+
+    mine, theirs = _list(client, auth_headers), _list(client, other)
+
+    assert [t["name"] for t in mine.json()["user"]] == ["Meine"]
+    assert theirs.json()["user"] == []
+    assert mine.headers["ETag"] != theirs.headers["ETag"]
+
+
+def test_system_template_changes_move_the_etag(client, auth_headers, monkeypatch):
+    etag = _list(client, auth_headers).headers["ETag"]
+
+    # a deploy that changes the system templates, with the user's version unchanged
+    template_list_cache._entries.clear()
+    monkeypatch.setattr(list_cache, "SYSTEM_TEMPLATE_LIST_DIGEST", "redeployed")
+
+    response = _list(client, auth_headers, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,35 @@
+from app.models import FundingProgram
+from app.templates.template_cache import FROZEN_SYSTEM_TEMPLATES, copy_template
+
+
+def test_each_template_is_returned_once(client, auth_headers, create_user_template, db):
+    template_id = create_user_template("Eigene Vorlage", ["Ziele", "Budget"])
+    programs = [
+        FundingProgram(title="A", template_source="system", template_ref="wtt_v1"),
+        FundingProgram(title="B", template_source="user", template_ref=template_id),
+        FundingProgram(title="C", template_source="system", template_ref="wtt_v1"),
+        FundingProgram(title="D", template_source="user", template_ref="kein-uuid"),
+    ]
+    db.add_all(programs)
+    db.commit()
+    ids = [p.id for p in programs]
+
+    response = client.post("/templates/resolve-batch", json={"funding_program_ids": ids + [999]}, headers=auth_headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["missing"] == [999]
+    assert [(ref["funding_program_id"], ref["template_key"]) for ref in body["funding_programs"]] == [
+        (ids[0], "system:wtt_v1"),
+        (ids[1], f"user:{template_id}"),
+        (ids[2], "system:wtt_v1"),
+        (ids[3], None),
+    ]
+    assert body["templates"]["system:wtt_v1"] == copy_template(FROZEN_SYSTEM_TEMPLATES["wtt_v1"])
+    assert [s["title"] for s in body["templates"][f"user:{template_id}"]["sections"]] == ["Ziele", "Budget"]
+
+
+def test_batch_size_is_bounded(client, auth_headers):
+    assert client.post("/templates/resolve-batch", json={"funding_program_ids": []}, headers=auth_headers).status_code == 422
+    too_many = {"funding_program_ids": list(range(501))}
+    assert client.post("/templates/resolve-batch", json=too_many, headers=auth_headers).status_code == 422
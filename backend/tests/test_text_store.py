@@ -0,0 +1,125 @@
+import hashlib
+import importlib.util
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.extraction import text_store
+from app.extraction.text_store import CODEC_ZLIB, CODEC_ZSTD, compress_text, decompress_text, default_codec, iter_decompressed
+from app.guideline_search import index_extraction_text, search_guidelines
+from app.models import File, FundingProgram, FundingProgramDocument, GuidelineExtraction, GuidelineExtractionText
+
+TEXT = "\n\n".join(f"§ {n} Zuwendungsfähig sind Ausgaben für Beratung, Schulung und Geräte (ä ö ü ß €)." for n in range(3000))
+
+codecs = pytest.mark.parametrize("codec", [CODEC_ZSTD, CODEC_ZLIB])
+
+
+@codecs
+def test_round_trip(codec):
+    stored_codec, data = compress_text(TEXT, codec)
+
+    assert stored_codec == codec
+    assert len(data) < len(TEXT.encode()) / 10
+    assert decompress_text(codec, data) == TEXT
+    assert decompress_text(*compress_text("", codec)) == ""
+
+
+@codecs
+def test_chunks_are_bounded_and_reassemble(codec):
+    _, data = compress_text(TEXT, codec)
+
+    chunks = list(iter_decompressed(codec, data, 4096))
+
+    assert len(chunks) > 1
+    assert max(len(chunk) for chunk in chunks) <= 4096
+    assert b"".join(chunks).decode() == TEXT
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        compress_text(TEXT, "lz4")
+    with pytest.raises(ValueError):
+        decompress_text("lz4", b"")
+    with pytest.raises(ValueError):
+        list(iter_decompressed("lz4", b"", 1024))
+
+
+def test_zlib_without_zstandard(monkeypatch):
+    monkeypatch.setattr(text_store, "zstandard", None)
+
+    assert default_codec() == CODEC_ZLIB
+    with pytest.raises(RuntimeError):
+        decompress_text(CODEC_ZSTD, b"")
+
+
+def test_migration_compresses_like_the_app(monkeypatch):
+    path = Path(__file__).parents[1] / "alembic" / "versions" / "6d2f9b4e8a17_compress_guideline_extraction_texts.py"
+    spec = importlib.util.spec_from_file_location("compress_texts_migration", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    monkeypatch.setattr(migration, "BATCH_SIZE", 2)
+
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE guideline_extractions (id INTEGER PRIMARY KEY, text TEXT)"))
+        connection.execute(text(
+            "CREATE TABLE guideline_extraction_texts "
+            "(extraction_id INTEGER PRIMARY KEY, codec TEXT, raw_size INTEGER, data BLOB)"
+        ))
+        texts = {n: f"Richtlinie {n}: {TEXT[:n * 1000]}" for n in range(1, 6)}
+        connection.execute(
+            text("INSERT INTO guideline_extractions (id, text) VALUES (:id, :text)"),
+            [{"id": n, "text": t} for n, t in texts.items()],
+        )
+
+        migration.compress_existing_texts(connection)
+        rows = connection.execute(text("SELECT extraction_id, codec, raw_size, data FROM guideline_extraction_texts")).all()
+        assert {row.codec for row in rows} == {default_codec()}
+        assert {row.extraction_id: decompress_text(row.codec, row.data) for row in rows} == texts
+        assert all(row.raw_size == len(texts[row.extraction_id].encode()) for row in rows)
+
+        connection.execute(text("UPDATE guideline_extractions SET text = NULL"))
+        migration.restore_texts(connection)
+        assert dict(connection.execute(text("SELECT id, text FROM guideline_extractions")).all()) == texts
+
+
+def test_extraction_text_is_stored_compressed(db):
+    extraction = GuidelineExtraction(content_hash="a" * 64, extractor_version="test", text=TEXT)
+    db.add(extraction)
+    db.commit()
+    db.expire_all()
+
+    stored = db.get(GuidelineExtractionText, extraction.id)
+    assert stored.raw_size == len(TEXT.encode())
+    assert len(stored.data) < stored.raw_size / 10
+    assert db.get(GuidelineExtraction, extraction.id).text == TEXT
+
+
+def _attach(db, text, index):
+    content_hash = hashlib.sha256(text.encode()).hexdigest()
+    program = FundingProgram(title="Programm", template_source="system", template_ref="wtt_v1")
+    file_obj = File(
+        content_hash=content_hash, file_type="pdf", storage_path=content_hash, size_bytes=1, mime_type="application/pdf"
+    )
+    extraction = GuidelineExtraction(content_hash=content_hash, extractor_version="test", text=text)
+    db.add_all([program, file_obj, extraction])
+    db.flush()
+    if index:
+        index_extraction_text(db, extraction.id, text)
+    db.add(FundingProgramDocument(funding_program_id=program.id, file_id=file_obj.id, extraction_id=extraction.id))
+    db.commit()
+
+
+def test_search_index_covers_texts_it_was_not_written_for(db):
+    _attach(db, "Gefördert werden Beratungsleistungen.", index=True)
+    # e.g. stored by a migration, or before the index table existed
+    _attach(db, "Gefördert werden Schulungen.", index=False)
+
+    hits = search_guidelines(db, "gefordert werden")
+
+    assert sorted(hit.snippet for hit in hits) == [
+        "<b>Gefördert</b> <b>werden</b> Beratungsleistungen.",
+        "<b>Gefördert</b> <b>werden</b> Schulungen.",
+    ]
+    assert len(search_guidelines(db, "Beratungsleistungen")) == 1
@@ -0,0 +1,50 @@
+from app.models import FundingProgram
+
+
+def test_update_own_template(client, auth_headers, create_user_template):
+    template_id = create_user_template("Eigene Vorlage", ["Ziele"])
+
+    response = client.put(
+        f"/templates/user/{template_id}",
+        json={"name": " Umbenannt ", "sections": ["Ziele", "Budget"]},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "Umbenannt"
+    assert response.json()["sections"] == ["Ziele", "Budget"]
+    listed = client.get("/templates/list", headers=auth_headers).json()["user"]
+    assert [t["name"] for t in listed] == ["Umbenannt"]
+
+
+def test_update_rejects_empty_sections(client, auth_headers, create_user_template):
+    template_id = create_user_template("Eigene Vorlage", ["Ziele"])
+
+    response = client.put(f"/templates/user/{template_id}", json={"sections": []}, headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+def test_templates_of_other_users_are_not_found(client, auth_headers, create_user_template):
+    template_id = create_user_template("Eigene Vorlage", ["Ziele"])
+    credentials = {"email": "kollegin@aiio.de", "password": "password"}
+    client.post("/auth/register", json=credentials)
+    token = client.post("/auth/login", json=credentials).json()["access_token"]
+    other = {"Authorization": f"Bearer {token}"}
+
+    assert client.put(f"/templates/user/{template_id}", json={"name": "X"}, headers=other).status_code == 404
+    assert client.delete(f"/templates/user/{template_id}", headers=other).status_code == 404
+
+
+def test_delete_refuses_templates_in_use(client, auth_headers, create_user_template, db):
+    template_id = create_user_template("Eigene Vorlage", ["Ziele"])
+    program = FundingProgram(title="P", template_source="user", template_ref=template_id)
+    db.add(program)
+    db.commit()
+
+    assert client.delete(f"/templates/user/{template_id}", headers=auth_headers).status_code == 409
+
+    db.delete(program)
+    db.commit()
+    assert client.delete(f"/templates/user/{template_id}", headers=auth_headers).status_code == 204
+    assert client.get("/templates/list", headers=auth_headers).json()["user"] == []